@@ -0,0 +1,146 @@
+"""Measure makespan and tail latency of batch scheduling on a skewed corpus.
+
+The corpus is many small specifications followed by a few giant ones, the
+worst case for submitting in the order given. Per-item latency is the time
+from the start of the batch to the item's completion.
+
+Each schedule is run on a warm pool. Since the result depends on having as
+many cores as workers, each schedule is also simulated: the conversion
+time of every item and the per-task overhead of the pool are measured,
+and tasks are handed in order to the first free of --workers workers.
+
+Usage::
+
+    % python benchmarks/batch_scheduling.py --small 2000 --giants 3 --workers 8
+"""
+import argparse
+import heapq
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from oastodcat.batch import (
+    convert,
+    convert_chunk,
+    schedule,
+    Specification,
+    specification_size,
+)
+from oastodcat.pool import ConversionPool
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+PATH = """
+  /items{j}:
+    get:
+      responses:
+        '200':
+          description: OK
+          content:
+            application/json: {{}}
+"""
+
+
+def spec(i: int, paths: int) -> str:
+    """Creates a specification with paths paths."""
+    return (
+        f"openapi: 3.0.3\ninfo:\n  title: Spec {i}\n  version: 1.0.0\n"
+        f"servers:\n  - url: http://example.com/{i}\npaths:"
+        + "".join(PATH.format(j=j) for j in range(paths))
+    )
+
+
+def run(
+    pool: ConversionPool,
+    items: List[Tuple[str, Specification]],
+    longest_first: bool,
+    chunk_cost: Optional[int],
+) -> Tuple[float, float, int]:
+    """Runs a schedule, returns makespan, p99 latency and number of tasks."""
+    start = time.perf_counter()
+    costs = [specification_size(specification) for _, specification in items]
+    tasks = schedule(costs, longest_first, chunk_cost)
+    args: List[Tuple] = [([items[i] for i in task], IDENTIFIER, {}) for task in tasks]
+    latencies = []
+    for task, ok, payload in pool.imap_unordered(convert_chunk, args):
+        if not ok or any(result.error for result in payload):
+            raise RuntimeError(f"Task {task} failed")
+        latencies.extend([time.perf_counter() - start] * len(tasks[task]))
+    latencies.sort()
+    return latencies[-1], latencies[int(len(latencies) * 0.99)], len(tasks)
+
+
+def simulate(
+    tasks: List[List[int]], durations: Sequence[float], overhead: float, workers: int
+) -> Tuple[float, float]:
+    """Simulates a schedule, returns makespan and p99 latency."""
+    free = [0.0] * workers
+    latencies = []
+    for task in tasks:
+        done = heapq.heappop(free) + overhead + sum(durations[i] for i in task)
+        heapq.heappush(free, done)
+        latencies.extend([done] * len(task))
+    latencies.sort()
+    return latencies[-1], latencies[int(len(latencies) * 0.99)]
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small", type=int, default=2000)
+    parser.add_argument("--giants", type=int, default=3)
+    parser.add_argument("--giant-paths", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--chunk-cost", type=int, default=8 * 1024)
+    args = parser.parse_args()
+
+    items: List[Tuple[str, Specification]] = [
+        (f"http://example.com/specifications/{i}", spec(i, 2))
+        for i in range(args.small)
+    ]
+    items += [
+        (f"http://example.com/specifications/giant/{i}", spec(i, args.giant_paths))
+        for i in range(args.giants)
+    ]
+    total = sum(specification_size(specification) for _, specification in items)
+    print(f"{len(items)} specs, {total / 1024**2:.1f} MiB, {args.workers} workers")
+
+    schedules = [
+        ("submission order", False, None),
+        ("longest first", True, None),
+        ("longest first, chunked", True, args.chunk_cost),
+    ]
+    with ConversionPool(args.workers) as pool:
+        run(pool, items[:100], False, None)  # warm up the workers
+        start = time.perf_counter()
+        for _ in pool.imap_unordered(convert_chunk, [([], IDENTIFIER, {})] * 1000):
+            pass
+        overhead = (time.perf_counter() - start) / 1000
+        print("measured on the pool:")
+        for name, longest_first, chunk_cost in schedules:
+            makespan, p99, tasks = run(pool, items, longest_first, chunk_cost)
+            print(
+                f"  {name:24} makespan {makespan:6.2f} s  p99 {p99:6.2f} s  "
+                f"{tasks:5} tasks"
+            )
+
+    durations = []
+    for url, specification in items:
+        start = time.perf_counter()
+        convert(url, specification, IDENTIFIER)
+        durations.append(time.perf_counter() - start)
+    costs = [specification_size(specification) for _, specification in items]
+    print(
+        f"simulated, {overhead * 1000:.2f} ms overhead per task, "
+        f"{sum(durations):.2f} s of work:"
+    )
+    for name, longest_first, chunk_cost in schedules:
+        order = schedule(costs, longest_first, chunk_cost)
+        makespan, p99 = simulate(order, durations, overhead, args.workers)
+        print(
+            f"  {name:24} makespan {makespan:6.2f} s  p99 {p99:6.2f} s  "
+            f"{len(order):5} tasks"
+        )
+
+
+if __name__ == "__main__":
+    main()
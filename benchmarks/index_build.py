@@ -0,0 +1,102 @@
+"""Measure the cost of building a CatalogIndex and of querying it.
+
+Converts a synthetic corpus once, then times adding the dataservices to an
+index on disk, and a few lookups against it, compared with parsing the
+serialized catalog and querying the graph.
+
+Usage::
+
+    % python benchmarks/index_build.py --specs 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Tuple
+
+from datacatalogtordf import Catalog, DataService
+from rdflib import Graph, URIRef
+
+from oastodcat import OASDataService
+from oastodcat.index import CatalogIndex
+
+
+def corpus(specs: int) -> List[Tuple[str, List[DataService]]]:
+    """Converts the synthetic specifications."""
+    converted = []
+    for i in range(specs):
+        spec = {
+            "openapi": "3.0.3",
+            "info": {
+                "title": f"Spec {i}",
+                "version": "1.0.0",
+                "license": {"name": "MIT", "url": f"https://example.com/l/{i % 3}"},
+            },
+            "servers": [{"url": f"http://example.com/{i}"}],
+            "paths": {
+                "/a": {
+                    "get": {
+                        "responses": {
+                            "200": {
+                                "content": {
+                                    ["application/json", "application/xml"][i % 2]: {}
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+        }
+        url = f"http://example.com/specifications/{i}"
+        oas_spec = OASDataService(url, spec, "http://example.com/dataservices/{id}")
+        for dataservice in oas_spec.dataservices:
+            dataservice.publisher = f"http://example.com/publishers/{i % 50}"
+        converted.append((url, oas_spec.dataservices))
+    return converted
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--specs", type=int, default=5000)
+    args = parser.parse_args()
+
+    converted = corpus(args.specs)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "catalog.sqlite")
+        start = time.perf_counter()
+        with CatalogIndex(path) as index:
+            for url, dataservices in converted:
+                index.add(url, dataservices)
+        build = time.perf_counter() - start
+        print(
+            f"build    {build:6.2f} s  {build / args.specs * 1e6:7.1f} us/spec  "
+            f"{os.path.getsize(path) / 1024:8.0f} KiB"
+        )
+
+        with CatalogIndex(path) as index:
+            start = time.perf_counter()
+            for _ in range(100):
+                xml = index.identifiers("media_type", "application/xml")
+                index.identifiers("publisher", "http://example.com/publishers/7")
+                index.source(xml[0])
+            query = (time.perf_counter() - start) / 300
+        print(f"query    {query * 1e6:9.1f} us  ({len(xml)} xml services)")
+
+    catalog = Catalog()
+    catalog.identifier = "http://example.com/catalogs/1"
+    for _, dataservices in converted:
+        catalog.services.extend(dataservices)
+    rdf = catalog.to_rdf(format="nt")
+    start = time.perf_counter()
+    graph = Graph().parse(data=rdf, format="nt")
+    xml_type = URIRef("https://www.iana.org/assignments/media-types/application/xml")
+    subjects = set(graph.subjects(object=xml_type))
+    print(
+        f"re-parse {time.perf_counter() - start:6.2f} s  "
+        f"({len(subjects)} xml services)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measure the JSON Lines export against the RDF round-trip.
+
+Converts a synthetic corpus once, then times turning the dataservices into
+JSON two ways: serializing the catalog, parsing it back and serializing
+the graph as JSON-LD, and writing JSON Lines straight from the objects.
+Then measures peak memory of a streaming run that converts and writes one
+specification at a time.
+
+Usage::
+
+    % python benchmarks/jsonl_export.py --specs 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Iterator, List
+
+from datacatalogtordf import Catalog, DataService
+from rdflib import Graph
+
+from oastodcat import OASDataService
+from oastodcat.jsonld import write_jsonl
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+def spec(i: int) -> dict:
+    """Creates a synthetic specification."""
+    return {
+        "openapi": "3.0.3",
+        "info": {
+            "title": f"Spec {i}",
+            "description": f"Description of spec {i}",
+            "version": "1.0.0",
+            "contact": {"name": f"Team {i % 20}", "email": f"team{i % 20}@ex.com"},
+            "license": {"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+        },
+        "servers": [{"url": f"http://example.com/{i}/{j}"} for j in range(2)],
+        "paths": {
+            f"/p{j}": {
+                "get": {
+                    "responses": {
+                        "200": {"content": {"application/json": {}, "text/csv": {}}}
+                    }
+                }
+            }
+            for j in range(5)
+        },
+    }
+
+
+def dataservices(specs: int) -> Iterator[DataService]:
+    """Converts the specifications one at a time."""
+    for i in range(specs):
+        url = f"http://example.com/specifications/{i}"
+        yield from OASDataService(url, spec(i), IDENTIFIER).dataservices
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--specs", type=int, default=2000)
+    args = parser.parse_args()
+
+    converted: List[DataService] = list(dataservices(args.specs))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        start = time.perf_counter()
+        catalog = Catalog()
+        catalog.identifier = "http://example.com/catalogs/1"
+        catalog.services = converted
+        graph = Graph().parse(data=catalog.to_rdf(), format="turtle")
+        with open(os.path.join(tmpdir, "catalog.jsonld"), "w") as f:
+            f.write(graph.serialize(format="json-ld"))
+        round_trip = time.perf_counter() - start
+        print(f"rdf round-trip  {round_trip:6.2f} s")
+
+        path = os.path.join(tmpdir, "dataservices.jsonl")
+        start = time.perf_counter()
+        with open(path, "w") as f:
+            count = write_jsonl(converted, f)
+        direct = time.perf_counter() - start
+        print(
+            f"json lines      {direct:6.2f} s  {count} documents  "
+            f"{os.path.getsize(path) / 1024**2:.1f} MiB  "
+            f"{round_trip / direct:.0f}x faster"
+        )
+        del converted, catalog, graph
+
+        for specs in [args.specs // 10, args.specs]:
+            tracemalloc.start()
+            with open(path, "w") as f:
+                write_jsonl(dataservices(specs), f)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"streaming {specs:6} specs  peak {peak / 1024**2:5.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Measure throughput and peak memory of merging N-Triples shards.
+
+Writes --shards sorted shards of about --shard-mb megabytes each, where
+every triple appears in --copies shards, and merges them with
+merge_ntriples in a child process, so its peak RSS is measured alone.
+
+Usage::
+
+    % python benchmarks/merge_shards.py --shards 16 --shard-mb 256 --copies 2
+"""
+import argparse
+import multiprocessing
+import os
+from pathlib import Path
+import resource
+import tempfile
+import time
+from typing import List
+
+from oastodcat.merge import merge_ntriples
+
+LINE = (
+    "<http://example.com/dataservices/{i:012}> "
+    "<http://www.w3.org/ns/dcat#endpointDescription> "
+    '"A fairly typical literal value for triple {i}"@en .\n'
+)
+
+
+def write_shards(directory: str, shards: int, shard_mb: int, copies: int) -> List[str]:
+    """Writes the sorted shards, returns their paths."""
+    per_shard = shard_mb * 1024**2 // len(LINE.format(i=0))
+    groups = max(shards // copies, 1)
+    paths = []
+    for shard in range(shards):
+        path = os.path.join(directory, f"shard-{shard}.nt")
+        with open(path, "w", encoding="utf-8") as f:
+            # Shards shard, shard + groups, ... hold the same triples:
+            for n in range(per_shard):
+                f.write(LINE.format(i=shard % groups + n * groups))
+        paths.append(path)
+    return paths
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--shard-mb", type=int, default=16)
+    parser.add_argument("--copies", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_shards(directory, args.shards, args.shard_mb, args.copies)
+        size = sum(os.path.getsize(path) for path in paths)
+        output = os.path.join(directory, "merged.nt")
+
+        start = time.perf_counter()
+        merge = multiprocessing.Process(target=merge_ntriples, args=(paths, output))
+        merge.start()
+        merge.join()
+        elapsed = time.perf_counter() - start
+        rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        merged = Path(output).stat().st_size
+
+    print(
+        f"input {size / 1024**2:8.0f} MB in {args.shards} shards, "
+        f"output {merged / 1024**2:8.0f} MB\n"
+        f"elapsed {elapsed:6.1f} s, {size / 1024**2 / elapsed:6.1f} MB/s, "
+        f"peak RSS {rss:6.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
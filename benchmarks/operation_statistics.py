@@ -0,0 +1,132 @@
+"""Measure the cost of collecting operation statistics.
+
+Times the walk for media types of a synthetic corpus alone, with the
+statistics collected on the way, and followed by a second walk of the
+paths that collects them separately. The three are run in turn, and
+each gets the best of --repeat runs, to keep noise out of the comparison.
+
+Usage::
+
+    % python benchmarks/operation_statistics.py --specs 200 --paths 50
+"""
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from oastodcat import OASDataService
+from oastodcat.stats import OperationStatistics
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+def operation(i: int, method: str) -> dict:
+    """Creates an operation with parameters, a request body and responses."""
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        },
+    }
+    return {
+        "operationId": f"{method}Item{i}",
+        "tags": ["items", f"group{i % 7}"],
+        "summary": f"{method} item {i}",
+        "parameters": [
+            {
+                "name": "id",
+                "in": "path",
+                "required": True,
+                "schema": {"type": "string"},
+            },
+            {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+        ],
+        "requestBody": {"content": {"application/json": {"schema": schema}}},
+        "responses": {
+            "200": {
+                "description": "OK",
+                "content": {
+                    "application/json": {"schema": schema},
+                    "application/xml": {"schema": schema},
+                },
+            },
+            "404": {"description": "Not found"},
+        },
+    }
+
+
+def spec(i: int, paths: int) -> dict:
+    """Creates a specification with paths paths of two operations each."""
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": f"Spec {i}", "version": "1.0.0"},
+        "paths": {
+            f"/items{j}/{{id}}": {
+                "get": operation(j, "get"),
+                "post": operation(j, "post"),
+            }
+            for j in range(paths)
+        },
+    }
+
+
+def walk(specification: dict) -> OperationStatistics:
+    """Collects the statistics in a second walk of the paths."""
+    statistics = OperationStatistics()
+    for path_item in specification.get("paths", {}).values():
+        statistics.paths += 1
+        for method, operation in path_item.items():
+            if method in METHODS and isinstance(operation, dict):
+                statistics.add_operation(method, operation)
+    return statistics
+
+
+def best(funcs: Dict[str, Callable[[], None]], repeat: int) -> Dict[str, float]:
+    """Runs the funcs in turn, returns the best time of each."""
+    times = {name: float("inf") for name in funcs}
+    for _ in range(repeat):
+        for name, func in funcs.items():
+            start = time.perf_counter()
+            func()
+            times[name] = min(times[name], time.perf_counter() - start)
+    return times
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--specs", type=int, default=200)
+    parser.add_argument("--paths", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    specs: List[dict] = [spec(i, args.paths) for i in range(args.specs)]
+    url = "http://example.com/specifications/1"
+
+    def convert(statistics: bool) -> None:
+        for specification in specs:
+            OASDataService(url, specification, IDENTIFIER, statistics=statistics)
+
+    def convert_and_walk() -> None:
+        for specification in specs:
+            OASDataService(url, specification, IDENTIFIER)
+            walk(specification)
+
+    times = best(
+        {
+            "media types alone": lambda: convert(False),
+            "in the same walk": lambda: convert(True),
+            "second walk": convert_and_walk,
+        },
+        args.repeat,
+    )
+    alone = times["media types alone"]
+    print(f"{args.specs} specs of {args.paths * 2} operations")
+    for name, seconds in times.items():
+        print(f"  {name:18} {seconds:6.3f} s  {seconds / alone - 1:+6.1%}")
+
+
+if __name__ == "__main__":
+    main()
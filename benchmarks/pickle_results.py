@@ -0,0 +1,104 @@
+"""Measure the pickled size and speed of converted dataservices.
+
+Converts a synthetic corpus, then pickles and unpickles the dataservices
+with their own __getstate__ and __setstate__, and with the default
+pickling of their slots and attributes, which takes the rdflib graphs
+along. Both are measured before and after the graphs are built.
+
+Usage::
+
+    % python benchmarks/pickle_results.py --specs 2000
+"""
+import argparse
+import pickle  # noqa: S403
+import time
+from typing import Callable, List, Tuple, TypeVar
+
+from datacatalogtordf import DataService
+
+from oastodcat import OASDataService
+from oastodcat.oas_dataservice import _DataService
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+T = TypeVar("T")
+
+
+def spec(i: int) -> dict:
+    """Creates a synthetic specification."""
+    return {
+        "openapi": "3.0.3",
+        "info": {
+            "title": f"Spec {i}",
+            "description": f"Description of spec {i}",
+            "version": "1.0.0",
+            "contact": {"name": f"Team {i % 20}", "email": f"team{i % 20}@ex.com"},
+            "license": {"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+        },
+        "servers": [{"url": f"http://example.com/{i}/{j}"} for j in range(2)],
+        "paths": {
+            f"/p{j}": {
+                "get": {
+                    "responses": {
+                        "200": {"content": {"application/json": {}, "text/csv": {}}}
+                    }
+                }
+            }
+            for j in range(5)
+        },
+    }
+
+
+def measure(dataservices: List[DataService]) -> Tuple[int, float, float]:
+    """Pickles and unpickles, returns size, encode and decode seconds."""
+    start = time.perf_counter()
+    data = pickle.dumps(dataservices, pickle.HIGHEST_PROTOCOL)
+    encode = time.perf_counter() - start
+    start = time.perf_counter()
+    pickle.loads(data)  # noqa: S301
+    decode = time.perf_counter() - start
+    return len(data), encode, decode
+
+
+def default_pickling(func: Callable[[], T]) -> T:
+    """Runs func with the default pickling of dataservices."""
+    getstate, setstate = _DataService.__getstate__, _DataService.__setstate__
+    del _DataService.__getstate__, _DataService.__setstate__
+    try:
+        return func()
+    finally:
+        _DataService.__getstate__ = getstate  # type: ignore
+        _DataService.__setstate__ = setstate  # type: ignore
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--specs", type=int, default=2000)
+    args = parser.parse_args()
+
+    dataservices: List[DataService] = []
+    for i in range(args.specs):
+        url = f"http://example.com/specifications/{i}"
+        dataservices += OASDataService(url, spec(i), IDENTIFIER).dataservices
+    print(f"{len(dataservices)} dataservices")
+
+    for graphs in [False, True]:
+        if graphs:
+            for dataservice in dataservices:
+                dataservice._to_graph()
+        print("with graphs built:" if graphs else "as converted:")
+        results = [
+            ("default", default_pickling(lambda: measure(dataservices))),
+            ("getstate", measure(dataservices)),
+        ]
+        for name, (size, encode, decode) in results:
+            print(
+                f"  {name:10} {size / len(dataservices):8.0f} bytes each  "
+                f"encode {len(dataservices) / encode:8.0f}/s  "
+                f"decode {len(dataservices) / decode:8.0f}/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
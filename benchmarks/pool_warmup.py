@@ -0,0 +1,80 @@
+"""Benchmark cold and warm conversion pools on many small specifications.
+
+A cold pool spawns workers that import rdflib, datacatalogtordf and
+concepttordf themselves; a warm pool forks them from a forkserver that
+has preloaded those modules. Both replace their workers every
+--tasks-per-worker tasks, as a harvest with memory hygiene would.
+
+Usage::
+
+    % python benchmarks/pool_warmup.py --specs 1000 --workers 4
+"""
+import argparse
+import time
+from typing import Any, Dict
+
+from oastodcat.pool import ConversionPool
+from oastodcat.server import convert_to_rdf
+
+SPEC = """
+openapi: 3.0.3
+info:
+  title: Spec {i}
+  version: 1.0.0
+servers:
+  - url: http://example.com/{i}
+paths:
+  /items:
+    get:
+      responses:
+        '200':
+          description: OK
+          content:
+            application/json: {{}}
+"""
+
+
+def run(pool: ConversionPool, specs: int) -> float:
+    """Converts specs small specifications, returns the elapsed seconds."""
+    start = time.perf_counter()
+    with pool:
+        tasks = (
+            (
+                f"http://example.com/specifications/{i}",
+                SPEC.format(i=i),
+                "http://example.com/dataservices/{id}",
+                "nt",
+            )
+            for i in range(specs)
+        )
+        for _, ok, payload in pool.imap_unordered(convert_to_rdf, tasks):
+            assert ok, payload  # noqa: S101
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--specs", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--tasks-per-worker", type=int, default=25)
+    args = parser.parse_args()
+
+    pools: Dict[str, Dict[str, Any]] = {
+        "cold (spawn, no preload)": dict(start_method="spawn", preload=()),
+        "warm (forkserver, preload)": dict(start_method="forkserver"),
+    }
+    for name, options in pools.items():
+        for tasks_per_worker in (args.tasks_per_worker, None):
+            pool = ConversionPool(
+                args.workers, max_tasks_per_worker=tasks_per_worker, **options
+            )
+            elapsed = run(pool, args.specs)
+            print(
+                f"{name:28} max_tasks_per_worker={str(tasks_per_worker):5} "
+                f"{elapsed:6.2f} s  {args.specs / elapsed:7.0f} specs/s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measure IdentifierRegistry throughput and size with many entries.
+
+Registers synthetic identifiers, one in every --collide-every colliding
+with an earlier one, then registers all of them again as a re-run would.
+
+Usage::
+
+    % python benchmarks/registry_scale.py --entries 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from oastodcat import create_identifier
+from oastodcat.registry import IdentifierRegistry
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--collide-every", type=int, default=1000)
+    args = parser.parse_args()
+
+    items = []
+    for i in range(args.entries):
+        title = f"Spec {i - 1 if i % args.collide_every == 1 else i}"
+        items.append(
+            (str(create_identifier(IDENTIFIER, title)), f"http://s.example.com/{i}")
+        )
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "identifiers.sqlite")
+        with IdentifierRegistry(path, "hash") as registry:
+            for label in ["first run", "re-run"]:
+                start = time.perf_counter()
+                for identifier, url in items:
+                    registry.register(identifier, url)
+                registry.commit()
+                seconds = time.perf_counter() - start
+                print(
+                    f"{label:10} {seconds:6.2f} s  "
+                    f"{seconds / args.entries * 1e6:5.2f} us/entry  "
+                    f"{len(registry.collisions)} collisions"
+                )
+            entries = len(registry)
+        size = os.path.getsize(path)
+        print(
+            f"{entries} entries  {size / 1024**2:.1f} MiB  {size / entries:.0f} B/entry"
+        )
+
+
+if __name__ == "__main__":
+    main()
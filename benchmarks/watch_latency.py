@@ -0,0 +1,99 @@
+"""Measure the latency from saving a spec to an updated watch output.
+
+Writes a tree of synthetic specifications, lets a CatalogWatcher convert
+it, then edits one file at a time and times how long it takes until the
+output file contains the edit.
+
+Usage::
+
+    % python benchmarks/watch_latency.py --specs 2000 --edits 20
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from oastodcat.watch import CatalogWatcher
+
+SPEC = """openapi: "3.0.3"
+info:
+  title: Spec {i} {version}
+  version: 1.0.0
+servers:
+  - url: http://example.com/{i}
+paths:
+  /items:
+    get:
+      responses:
+        "200":
+          content:
+            application/json: {{}}
+"""
+
+
+def main() -> None:
+    """Runs the measurement."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--specs", type=int, default=2000)
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--poll-interval", type=float, default=0.02)
+    parser.add_argument("--debounce", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        specs = os.path.join(tmpdir, "specs")
+        for i in range(args.specs):
+            directory = os.path.join(specs, str(i % 20))
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"{i}.yaml"), "w") as f:
+                f.write(SPEC.format(i=i, version="1.0.0"))
+        output = os.path.join(tmpdir, "catalog.nt")
+        watcher = CatalogWatcher(
+            specs,
+            "http://example.com/dataservices/{id}",
+            output,
+            poll_interval=args.poll_interval,
+            debounce=args.debounce,
+        )
+        start = time.perf_counter()
+        watcher.scan()
+        print(f"initial  {time.perf_counter() - start:6.2f} s for {args.specs} specs")
+
+        stop = threading.Event()
+        thread = threading.Thread(target=watcher.run, args=(stop,))
+        thread.start()
+        latencies = []
+        try:
+            for edit in range(args.edits):
+                i = edit * args.specs // args.edits
+                path = os.path.join(specs, str(i % 20), f"{i}.yaml")
+                version = f"2.0.{edit}"
+                written = os.stat(output).st_mtime_ns
+                start = time.perf_counter()
+                with open(path, "w") as f:
+                    f.write(SPEC.format(i=i, version=version))
+                while os.stat(output).st_mtime_ns == written:
+                    time.sleep(0.001)
+                latencies.append(time.perf_counter() - start)
+                with open(output, encoding="utf-8") as f:
+                    if f"Spec {i} {version}" not in f.read():
+                        raise RuntimeError(f"Edit of {path} not in output")
+                time.sleep(args.poll_interval * 3.7)
+        finally:
+            stop.set()
+            thread.join()
+
+    latencies.sort()
+    print(
+        f"save -> output  median {statistics.median(latencies) * 1000:5.1f} ms  "
+        f"p90 {latencies[int(len(latencies) * 0.9)] * 1000:5.1f} ms  "
+        f"max {latencies[-1] * 1000:5.1f} ms  "
+        f"(poll {args.poll_interval * 1000:.0f} ms, "
+        f"debounce {args.debounce * 1000:.0f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,18 @@
 
 Modules:
     oas_dataservice
+    batch
+    pool
+    canonical
+    aio
+    server
+    merge
+    index
+    registry
+    watch
+    jsonld
+    stats
+    quarantine
 """
 try:
     from importlib.metadata import version, PackageNotFoundError  # type: ignore
@@ -13,7 +25,14 @@ try:
 except PackageNotFoundError:  # pragma: no cover
     __version__ = "unknown"
 
+from .oas_dataservice import CatalogDefaults
+from .oas_dataservice import create_contact_identifier
 from .oas_dataservice import create_id
+from .oas_dataservice import create_identifier
+from .oas_dataservice import expand_server_url
+from .oas_dataservice import LimitExceededError
+from .oas_dataservice import MultiEndpointDataService
+from .oas_dataservice import normalize_specification
 from .oas_dataservice import NotSupportedOASError
 from .oas_dataservice import NotValidOASError
 from .oas_dataservice import OASDataService
@@ -0,0 +1,105 @@
+"""aio module for converting openAPI specifications from asyncio code.
+
+Conversion is CPU-bound and synchronous. The coroutines in this module run
+it in an executor, so that the event loop stays responsive. Pass a
+:class:`concurrent.futures.ProcessPoolExecutor` to keep the CPU work out
+of the event loop's process altogether, or a thread pool to avoid
+pickling. The loop's default executor is used if none is given.
+
+Example:
+    >>> from concurrent.futures import ProcessPoolExecutor
+    >>> from oastodcat.aio import aconvert_many
+    >>>
+    >>> async def harvest(specs):
+    >>>     with ProcessPoolExecutor() as executor:
+    >>>         async for result in aconvert_many(
+    >>>             specs, "http://example.com/dataservices/{id}", executor, 8
+    >>>         ):
+    >>>             print(result.url, result.error)
+"""
+import asyncio
+from concurrent.futures import Executor
+import functools
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from datacatalogtordf import DataService
+
+from .batch import BatchResult, convert, Specification
+
+
+async def aconvert(
+    url: str,
+    specification: Specification,
+    identifier: str,
+    executor: Optional[Executor] = None,
+    **options: Any,
+) -> List[DataService]:
+    """Converts a single specification to dataservices in an executor.
+
+    Args:
+        url (str): the url of the openAPI specification
+        specification (Specification): a dict, or YAML/JSON as str or bytes
+        identifier (str): the identifier template, containing {id}
+        executor (Optional[Executor]): the executor to run the conversion in
+        options (Any): keyword arguments passed on to OASDataService
+
+    Returns:
+        the dataservices created
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(convert, url, specification, identifier, **options),
+    )
+
+
+async def aconvert_many(
+    items: Iterable[Tuple[str, Specification]],
+    identifier: str,
+    executor: Optional[Executor] = None,
+    concurrency: int = 4,
+    **options: Any,
+) -> AsyncIterator[BatchResult]:
+    """Converts many specifications, yielding results as they complete.
+
+    At most concurrency conversions are in flight at a time. If the
+    consumer stops iterating, or the task is cancelled, no more are
+    started and those still queued in the executor are dropped. Those
+    already running cannot be interrupted: they finish in their thread or
+    process, and their results are discarded.
+
+    Args:
+        items (Iterable[Tuple[str, Specification]]): (url, specification) pairs
+        identifier (str): the identifier template, containing {id}
+        executor (Optional[Executor]): the executor to run the conversions in
+        concurrency (int): max number of conversions in flight
+        options (Any): keyword arguments passed on to OASDataService
+
+    Yields:
+        one BatchResult per item, in order of completion
+    """
+    pending: Dict[asyncio.Future, str] = {}
+    iterator = iter(items)
+    try:
+        while True:
+            for url, specification in iterator:
+                future = asyncio.ensure_future(
+                    aconvert(url, specification, identifier, executor, **options)
+                )
+                pending[future] = url
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                url = pending.pop(task)
+                try:
+                    result = BatchResult(url, dataservices=task.result())
+                except Exception as e:
+                    result = BatchResult(url, error=e)
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
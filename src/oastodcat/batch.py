@@ -0,0 +1,607 @@
+"""batch module for converting many openAPI specifications in parallel.
+
+Each specification is converted in a worker process of a
+:class:`~oastodcat.pool.ConversionPool`. A specification that fails, or
+that exceeds one of the per-item limits, is reported in its
+:class:`BatchResult` instead of aborting the run.
+
+Example:
+    >>> from oastodcat.batch import convert_many
+    >>>
+    >>> specs = [
+    >>>     ("http://example.com/specifications/1", "openapi: 3.0.3 ..."),
+    >>>     ("http://example.com/specifications/2", "openapi: 3.0.3 ..."),
+    >>> ]
+    >>> results = convert_many(
+    >>>     specs, "http://example.com/dataservices/{id}", timeout=60, max_depth=64
+    >>> )
+    >>> for result in results:
+    >>>     if result.error:
+    >>>         print(result.url, result.error)
+    >>> print(batch_report(results).dedup_ratio)
+
+Identical specifications published under several urls are converted once:
+the copies only get their url-dependent properties re-stamped. A Swagger
+2.0 specification without a host takes its servers from its url, so it
+is only deduped with copies on the same scheme and host.
+
+The largest specifications are submitted first, so that a few giants do
+not run alone at the end of a batch, and small ones may be sent to the
+workers in chunks, see :func:`schedule`.
+"""
+import copy
+import hashlib
+import json
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlparse
+
+from datacatalogtordf import DataService, URI
+import yaml
+
+from .index import CatalogIndex
+from .oas_dataservice import CatalogDefaults, NotValidOASError, OASDataService
+from .pool import ConversionPool
+from .quarantine import Quarantine
+from .registry import IdentifierCollisionError, IdentifierRegistry
+from .stats import OperationStatistics
+
+Specification = Union[dict, str, bytes]
+
+_JSON_KEYS = (str, int, float, bool, type(None))
+
+_SWAGGER_KEY = re.compile(rb"""["']?swagger["']?\s*:""")
+
+
+class BatchResult:
+    """The outcome of converting one specification in a batch.
+
+    Attributes:
+        url (str): the url of the openAPI specification
+        dataservices (List[DataService]): the dataservices created
+        error (Optional[Exception]): the error raised, None on success
+        digest (Optional[str]): the content hash of the specification
+        duplicate_of (Optional[str]): url of the identical specification
+            that was converted in place of this one
+        statistics (Optional[OperationStatistics]): the paths and operations
+            of the specification, if asked for with statistics=True
+        phase (Optional[str]): the phase that failed, "load", "convert",
+            "worker" or "register", see
+            :class:`~oastodcat.quarantine.FailureRecord`
+        elapsed (Optional[float]): seconds spent converting the
+            specification, None if its worker failed
+    """
+
+    __slots__ = (
+        "url",
+        "dataservices",
+        "error",
+        "digest",
+        "duplicate_of",
+        "statistics",
+        "phase",
+        "elapsed",
+    )
+
+    url: str
+    dataservices: List[DataService]
+    error: Optional[Exception]
+    digest: Optional[str]
+    duplicate_of: Optional[str]
+    statistics: Optional[OperationStatistics]
+    phase: Optional[str]
+    elapsed: Optional[float]
+
+    def __init__(
+        self,
+        url: str,
+        dataservices: Optional[List[DataService]] = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """Inits an object with default values."""
+        self.url = url
+        self.dataservices = dataservices if dataservices is not None else []
+        self.error = error
+        self.digest = None
+        self.duplicate_of = None
+        self.statistics = None
+        self.phase = None
+        self.elapsed = None
+
+
+class BatchReport:
+    """Summary of a batch run.
+
+    Attributes:
+        total (int): the number of specifications in the batch
+        converted (int): the number of conversions actually run
+        duplicates (int): the number of specifications served by another's
+            conversion
+        failed (int): the number of specifications that failed
+        failed_by_phase (Dict[str, int]): the number that failed per phase
+        dedup_ratio (float): duplicates / total
+        statistics (Optional[OperationStatistics]): the paths and operations
+            of all specifications that have statistics, None if none has
+    """
+
+    __slots__ = (
+        "total",
+        "converted",
+        "duplicates",
+        "failed",
+        "failed_by_phase",
+        "statistics",
+    )
+
+    total: int
+    converted: int
+    duplicates: int
+    failed: int
+    failed_by_phase: Dict[str, int]
+    statistics: Optional[OperationStatistics]
+
+    def __init__(
+        self,
+        total: int,
+        duplicates: int,
+        failed: int,
+        statistics: Optional[OperationStatistics] = None,
+        failed_by_phase: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Inits an object with default values."""
+        self.total = total
+        self.converted = total - duplicates
+        self.duplicates = duplicates
+        self.failed = failed
+        self.failed_by_phase = failed_by_phase or {}
+        self.statistics = statistics
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Get for dedup_ratio."""
+        return self.duplicates / self.total if self.total else 0.0
+
+
+def batch_report(results: List[BatchResult]) -> BatchReport:
+    """Summarises the results of a batch run.
+
+    Args:
+        results (List[BatchResult]): the results returned by convert_many
+
+    Returns:
+        a BatchReport
+    """
+    statistics = None
+    failed_by_phase: Dict[str, int] = {}
+    for result in results:
+        if result.statistics is not None:
+            statistics = statistics or OperationStatistics()
+            statistics.update(result.statistics)
+        if result.error and result.phase:
+            failed_by_phase[result.phase] = failed_by_phase.get(result.phase, 0) + 1
+    return BatchReport(
+        total=len(results),
+        duplicates=sum(1 for result in results if result.duplicate_of),
+        failed=sum(1 for result in results if result.error),
+        statistics=statistics,
+        failed_by_phase=failed_by_phase,
+    )
+
+
+def specification_digest(specification: Specification) -> str:
+    """Computes a content hash of a specification.
+
+    Text is hashed as is, a dict is hashed by its canonical JSON form. The
+    keys of a dict loaded from YAML may mix types, such as the status codes
+    200 and "default" of a responses object, and cannot be sorted as they
+    are, so the keys of such a dict are sorted by their string form.
+
+    Args:
+        specification (Specification): a dict, or YAML/JSON as str or bytes
+
+    Returns:
+        the sha256 hex digest
+
+    Raises:
+        ValueError: the dict contains a reference cycle
+        RecursionError: the dict is nested too deeply
+
+        # noqa: DAR402 ValueError RecursionError
+    """
+    return _digest_and_size(specification)[0]
+
+
+def load_specification(specification: Specification) -> dict:
+    """Loads a specification given as YAML or JSON text.
+
+    Args:
+        specification (Specification): a dict, or YAML/JSON as str or bytes
+
+    Returns:
+        the specification as a dict
+
+    Raises:
+        NotValidOASError: the text could not be parsed as an object
+    """
+    if isinstance(specification, dict):
+        return specification
+    try:
+        loaded = yaml.safe_load(specification)
+    except yaml.YAMLError as e:
+        raise NotValidOASError(f"Could not parse specification: {e}") from e
+    if not isinstance(loaded, dict):
+        raise NotValidOASError("Specification is not an object")
+    return loaded
+
+
+def convert(
+    url: str, specification: Specification, identifier: str, **options: Any
+) -> List[DataService]:
+    """Converts a single specification to dataservices.
+
+    Args:
+        url (str): the url of the openAPI specification
+        specification (Specification): a dict, or YAML/JSON as str or bytes
+        identifier (str): the identifier template, containing {id}
+        options (Any): keyword arguments passed on to OASDataService
+
+    Returns:
+        the dataservices created
+    """
+    oas_spec = OASDataService(
+        url, load_specification(specification), identifier, **options
+    )
+    return oas_spec.dataservices
+
+
+def convert_many(
+    items: Iterable[Tuple[str, Specification]],
+    identifier: str,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    max_rss: Optional[int] = None,
+    pool: Optional[ConversionPool] = None,
+    dedupe: bool = True,
+    index: Optional[CatalogIndex] = None,
+    registry: Optional[IdentifierRegistry] = None,
+    longest_first: bool = True,
+    chunk_cost: Optional[int] = None,
+    quarantine: Optional[Quarantine] = None,
+    **options: Any,
+) -> List[BatchResult]:
+    """Converts many specifications in parallel.
+
+    Args:
+        items (Iterable[Tuple[str, Specification]]): (url, specification) pairs
+        identifier (str): the identifier template, containing {id}
+        max_workers (Optional[int]): number of workers, defaults to cpu count
+        timeout (Optional[float]): max wall-clock seconds per pool task
+        max_rss (Optional[int]): max resident set size in bytes per worker
+        pool (Optional[ConversionPool]): a pool to use instead of a new one
+        dedupe (bool): convert identical specifications only once
+        index (Optional[CatalogIndex]): an index to add the dataservices to
+        registry (Optional[IdentifierRegistry]): a registry to check the
+            identifiers against, renaming them on collision. An identifier
+            it refuses fails its specification in the "register" phase
+        longest_first (bool): submit the largest specifications first
+        chunk_cost (Optional[int]): group small specifications into pool
+            tasks of up to this many bytes. A chunk shares one timeout, and
+            all of it fails if its worker is lost
+        quarantine (Optional[Quarantine]): a quarantine to add the
+            specifications that fail to, and release those that convert from
+        options (Any): keyword arguments passed on to OASDataService, such
+            as max_nodes, max_depth, server_variables, statistics and
+            defaults. The dataservices returned read the defaults given,
+            not the copies the workers converted with
+
+    Returns:
+        one BatchResult per item, in the order given
+    """
+    items = list(items)
+    results, pending, copies, sizes = _plan(items, dedupe, index)
+    indexes = list(copies)
+    costs = [0] * len(pending)
+    if longest_first or chunk_cost:
+        costs = [
+            specification_size(specification) if size is None else size
+            for size, (_, specification) in zip(sizes, pending)
+        ]
+    tasks = schedule(costs, longest_first, chunk_cost)
+    args = [([pending[i] for i in task], identifier, options) for task in tasks]
+    _pool = pool or ConversionPool(max_workers, timeout=timeout, max_rss=max_rss)
+    try:
+        for task, ok, payload in _pool.imap_unordered(convert_chunk, args):
+            for n, i in enumerate(tasks[task]):
+                outcome = payload[n] if ok else payload
+                _assign(results, indexes[i], copies, outcome, options.get("defaults"))
+    finally:
+        if pool is None:
+            _pool.close()
+
+    _record(results, index, registry)
+    if quarantine is not None:
+        for result, (_, specification) in zip(results, items):
+            if result.error is None:
+                quarantine.release(result.url)
+            else:
+                quarantine.add(
+                    result.url,
+                    specification,
+                    result.error,
+                    result.phase or "convert",
+                    result.elapsed,
+                )
+    return results
+
+
+def retry_quarantined(
+    quarantine: Quarantine, identifier: str, **kwargs: Any
+) -> List[BatchResult]:
+    """Converts the quarantined specifications again.
+
+    Those that convert are released from the quarantine, the others have
+    their failure records updated.
+
+    Args:
+        quarantine (Quarantine): the quarantine to retry
+        identifier (str): the identifier template, containing {id}
+        kwargs (Any): keyword arguments passed on to convert_many
+
+    Returns:
+        one BatchResult per quarantined specification, ordered by url
+    """
+    return convert_many(quarantine.items(), identifier, quarantine=quarantine, **kwargs)
+
+
+def convert_chunk(
+    items: Sequence[Tuple[str, Specification]], identifier: str, options: dict
+) -> List[BatchResult]:
+    """Converts several specifications in one pool task.
+
+    Any exception raised by a specification, including a KeyError or an
+    AttributeError on malformed input, is reported in its result.
+
+    Args:
+        items (Sequence[Tuple[str, Specification]]): (url, specification) pairs
+        identifier (str): the identifier template, containing {id}
+        options (dict): keyword arguments passed on to OASDataService
+
+    Returns:
+        one BatchResult per item, with its dataservices and statistics, or
+        its error and the phase that failed, and the time spent
+    """
+    results: List[BatchResult] = []
+    for url, specification in items:
+        result = BatchResult(url)
+        start = time.perf_counter()
+        phase = "load"
+        try:
+            loaded = load_specification(specification)
+            phase = "convert"
+            oas_spec = OASDataService(url, loaded, identifier, **options)
+        except Exception as e:
+            result.error, result.phase = e, phase
+        else:
+            result.dataservices = oas_spec.dataservices
+            result.statistics = oas_spec.statistics
+        result.elapsed = time.perf_counter() - start
+        results.append(result)
+    return results
+
+
+def specification_size(specification: Specification) -> int:
+    """Estimates the cost of converting a specification by its size.
+
+    Args:
+        specification (Specification): a dict, or YAML/JSON as str or bytes
+
+    Returns:
+        the size in bytes, of the compact JSON form for a dict, 0 for a dict
+        that has none, such as one with a reference cycle
+    """
+    if isinstance(specification, dict):
+        try:
+            return len(json.dumps(specification, separators=(",", ":"), default=str))
+        except (ValueError, RecursionError):
+            return 0
+    return len(specification)
+
+
+def schedule(
+    costs: Sequence[int], longest_first: bool = True, chunk_cost: Optional[int] = None
+) -> List[List[int]]:
+    """Orders items into pool tasks.
+
+    Starting the largest items first keeps a few giants from running alone
+    at the end of a batch while the other workers idle. With chunk_cost,
+    items following each other in that order are grouped into tasks of up
+    to chunk_cost, to save per-task overhead on small items. An item
+    larger than chunk_cost gets a task of its own.
+
+    Args:
+        costs (Sequence[int]): the estimated cost of each item
+        longest_first (bool): order items by cost, largest first, instead
+            of keeping their order
+        chunk_cost (Optional[int]): max total cost of a task of several items
+
+    Returns:
+        the tasks in order of submission, each a list of item indexes
+    """
+    order = list(range(len(costs)))
+    if longest_first:
+        order.sort(key=lambda i: -costs[i])
+    if chunk_cost is None:
+        return [[i] for i in order]
+
+    tasks: List[List[int]] = []
+    total = 0
+    for i in order:
+        if tasks and tasks[-1] and total + costs[i] <= chunk_cost:
+            tasks[-1].append(i)
+            total += costs[i]
+        else:
+            tasks.append([i])
+            total = costs[i]
+    return tasks
+
+
+def _plan(
+    items: Iterable[Tuple[str, Specification]],
+    dedupe: bool,
+    index: Optional[CatalogIndex],
+) -> Tuple[
+    List[BatchResult],
+    List[Tuple[str, Specification]],
+    Dict[int, List[int]],
+    List[Optional[int]],
+]:
+    """Creates results, items to convert, item -> duplicates and sizes."""
+    # The size of an item to convert is taken from the JSON serialized for
+    # its digest, None if no digest was needed, so no dict is serialized
+    # twice.
+    results: List[BatchResult] = []
+    pending: List[Tuple[str, Specification]] = []
+    copies: Dict[int, List[int]] = {}
+    sizes: List[Optional[int]] = []
+    first: Dict[str, int] = {}
+    for url, specification in items:
+        result = BatchResult(url)
+        size: Optional[int] = None
+        if dedupe or index is not None:
+            try:
+                result.digest, size = _digest_and_size(specification)
+            except (ValueError, RecursionError):
+                size = 0  # left to the conversion to report, without dedupe
+        if dedupe and result.digest is not None:
+            key = result.digest
+            if _servers_depend_on_url(specification):
+                location = urlparse(url)
+                key += f"\n{location.scheme}://{location.netloc}"
+            if key in first:
+                copies[first[key]].append(len(results))
+                result.duplicate_of = results[first[key]].url
+                results.append(result)
+                continue
+            first[key] = len(results)
+        copies[len(results)] = []
+        pending.append((url, specification))
+        sizes.append(size)
+        results.append(result)
+    return results, pending, copies, sizes
+
+
+def _assign(
+    results: List[BatchResult],
+    converted: int,
+    copies: Dict[int, List[int]],
+    outcome: Union[BatchResult, Exception],
+    defaults: Optional[CatalogDefaults] = None,
+) -> None:
+    """Sets the outcome of a conversion on its result and its duplicates'."""
+    if defaults is not None and not isinstance(outcome, Exception):
+        _reattach(outcome.dataservices, defaults)
+    for i in [converted, *copies[converted]]:
+        result = results[i]
+        if isinstance(outcome, Exception):
+            # The pool task failed as a whole:
+            result.error, result.phase = outcome, "worker"
+            continue
+        result.error, result.phase = outcome.error, outcome.phase
+        result.statistics, result.elapsed = outcome.statistics, outcome.elapsed
+        if i == converted:
+            result.dataservices = outcome.dataservices
+        else:
+            result.dataservices = _restamp(outcome.dataservices, result.url)
+
+
+def _reattach(dataservices: List[DataService], defaults: CatalogDefaults) -> None:
+    """Points dataservices converted in a worker back at the caller's defaults."""
+    # The worker got a copy of defaults, so values set on them later would
+    # not be seen. Those of the specification are kept, and fall back on
+    # the defaults again.
+    for dataservice in dataservices:
+        own = getattr(dataservice, "defaults", None)
+        if own is not None:
+            own.parent = defaults
+
+
+def _record(
+    results: List[BatchResult],
+    index: Optional[CatalogIndex],
+    registry: Optional[IdentifierRegistry],
+) -> None:
+    """Registers the identifiers, then adds the dataservices to the index."""
+    if registry is not None:
+        for result in results:
+            try:
+                for dataservice in result.dataservices:
+                    registry.register_dataservice(dataservice, result.url)
+            except IdentifierCollisionError as e:
+                result.dataservices = []
+                result.error, result.phase = e, "register"
+        registry.commit()
+    if index is not None:
+        for result in results:
+            if result.error is None:
+                index.add(result.url, result.dataservices, result.digest)
+
+
+def _servers_depend_on_url(specification: Specification) -> bool:
+    """Returns True for Swagger 2.0 without a host, or any Swagger text."""
+    # normalize_specification takes the servers of such a specification
+    # from its url. Text is not parsed here, so the check is conservative.
+    if isinstance(specification, dict):
+        swagger_2 = str(specification.get("swagger")) == "2.0"
+        return swagger_2 and not specification.get("host")
+    if isinstance(specification, str):
+        specification = specification.encode("utf-8")
+    return _SWAGGER_KEY.search(specification) is not None
+
+
+def _restamp(dataservices: List[DataService], url: str) -> List[DataService]:
+    """Copies dataservices, re-stamping the properties that depend on url."""
+    # The identifier is built from the title and the server url only, see
+    # create_identifier, so the copies share it with the original.
+    restamped = []
+    for dataservice in dataservices:
+        dataservice = copy.copy(dataservice)
+        dataservice.endpointDescription = URI(url)
+        restamped.append(dataservice)
+    return restamped
+
+
+def _digest_and_size(specification: Specification) -> Tuple[str, int]:
+    """Returns the digest of a specification, and its specification_size."""
+    if isinstance(specification, dict):
+        try:
+            text = _canonical_json(specification)
+        except TypeError:
+            text = _canonical_json(_sorted_by_str_keys(specification), sort_keys=False)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest(), len(text)
+    if isinstance(specification, str):
+        data = specification.encode("utf-8")
+    else:
+        data = specification
+    return hashlib.sha256(data).hexdigest(), len(specification)
+
+
+def _canonical_json(specification: object, sort_keys: bool = True) -> str:
+    """Returns the compact JSON form of a dict, with its keys sorted."""
+    return json.dumps(
+        specification, sort_keys=sort_keys, separators=(",", ":"), default=str
+    )
+
+
+def _sorted_by_str_keys(value: object) -> object:
+    """Copies dicts and lists, with dict keys ordered by their string form."""
+    if isinstance(value, dict):
+        items = [
+            (key if isinstance(key, _JSON_KEYS) else str(key), item)
+            for key, item in value.items()
+        ]
+        items.sort(key=lambda item: (str(item[0]), type(item[0]).__name__))
+        return {key: _sorted_by_str_keys(item) for key, item in items}
+    if isinstance(value, list):
+        return [_sorted_by_str_keys(item) for item in value]
+    return value
@@ -0,0 +1,117 @@
+"""canonical module for byte-stable rdf output.
+
+rdflib labels blank nodes at random, and neither the order of triples nor
+the labels are stable between runs. This module relabels blank nodes based
+on their content and the statements pointing at them, and emits sorted
+N-Triples. Identical input therefore gives identical bytes, and change
+detection becomes a hash compare instead of a graph isomorphism test.
+
+Blank nodes are assumed to form trees, as the contact points created by
+OASDataService do.
+
+Example:
+    >>> import hashlib
+    >>> from oastodcat.canonical import to_canonical_ntriples
+    >>>
+    >>> ntriples = to_canonical_ntriples(catalog)
+    >>> digest = hashlib.sha256(ntriples.encode()).hexdigest()
+"""
+from typing import Any, Dict, FrozenSet, List, Tuple, Union
+
+from rdflib import BNode, Graph
+from rdflib.term import Node
+
+from .oas_dataservice import create_id
+
+
+def canonical_graph(graph: Graph) -> Graph:
+    """Returns a copy of graph with content-derived blank node labels.
+
+    Args:
+        graph (Graph): the graph to relabel
+
+    Returns:
+        a new graph, isomorphic to graph
+    """
+    labels = _BNodeLabeler(graph)
+    canonical = Graph()
+    for prefix, namespace in graph.namespaces():
+        canonical.bind(prefix, namespace)
+    for s, p, o in graph:
+        canonical.add((labels.relabel(s), p, labels.relabel(o)))
+    return canonical
+
+
+def to_canonical_ntriples(source: Union[Graph, Any]) -> str:
+    """Serializes source as sorted N-Triples with stable blank node labels.
+
+    Args:
+        source (Union[Graph, Any]): a graph, or a datacatalogtordf resource
+            such as a Catalog or a DataService
+
+    Returns:
+        the N-Triples serialization, one triple per line in sorted order
+    """
+    graph = source if isinstance(source, Graph) else source._to_graph()
+    ntriples = canonical_graph(graph).serialize(format="nt")
+    if isinstance(ntriples, bytes):  # pragma: no cover
+        ntriples = ntriples.decode("utf-8")
+    lines = sorted(line for line in ntriples.splitlines() if line)
+    return "".join(line + "\n" for line in lines)
+
+
+class _BNodeLabeler:
+    """Computes content-derived labels for the blank nodes of a graph."""
+
+    __slots__ = ("_graph", "_content", "_labels")
+
+    _graph: Graph
+    _content: Dict[BNode, str]
+    _labels: Dict[BNode, BNode]
+
+    def __init__(self, graph: Graph) -> None:
+        self._graph = graph
+        self._content = {}
+        self._labels = {}
+
+    def relabel(self, node: Node) -> Node:
+        """Returns the canonical label of node if it is a blank node."""
+        if not isinstance(node, BNode):
+            return node
+        if node not in self._labels:
+            incoming = sorted(
+                f"{self._term(s, frozenset())[0]} {p.n3()}"
+                for s, p in self._graph.subject_predicates(node)
+            )
+            self._labels[node] = BNode(
+                "c" + _digest([self._hash(node, frozenset())[0], *incoming])
+            )
+        return self._labels[node]
+
+    def _hash(self, node: BNode, seen: FrozenSet[BNode]) -> Tuple[str, bool]:
+        """Hashes the statements about node, following nested blank nodes."""
+        # Also returns True if a cycle was cut on the way. Such a hash
+        # depends on where the walk entered the cycle, so it is not kept.
+        if node in self._content:
+            return self._content[node], False
+        if node in seen:
+            return "cycle", True
+        outgoing, cut = [], False
+        for p, o in self._graph.predicate_objects(node):
+            term, cycle = self._term(o, seen | {node})
+            outgoing.append(f"{p.n3()} {term}")
+            cut = cut or cycle
+        digest = _digest(sorted(outgoing))
+        if not cut:
+            self._content[node] = digest
+        return digest, cut
+
+    def _term(self, node: Node, seen: FrozenSet[BNode]) -> Tuple[str, bool]:
+        if isinstance(node, BNode):
+            digest, cut = self._hash(node, seen)
+            return "_:" + digest, cut
+        return node.n3(), False
+
+
+def _digest(lines: List[str]) -> str:
+    return create_id("\n".join(lines))
@@ -0,0 +1,176 @@
+"""index module for querying converted dataservices without parsing rdf.
+
+A :class:`CatalogIndex` is a small sqlite database mapping the properties
+of converted dataservices (media type, publisher, conformsTo, endpointURL
+and license) to their identifiers, and each identifier to the url and
+content hash of the specification it came from. It can be built as a
+by-product of :func:`~oastodcat.batch.convert_many`.
+
+Example:
+    >>> from oastodcat.batch import convert_many
+    >>> from oastodcat.index import CatalogIndex
+    >>>
+    >>> with CatalogIndex("catalog.sqlite") as index:
+    >>>     convert_many(specs, "http://example.com/dataservices/{id}", index=index)
+    >>>     index.identifiers("media_type", "application/xml")
+    >>>     index.source("http://example.com/dataservices/1")
+"""
+import os
+import sqlite3
+from typing import Any, Iterable, List, Optional, Tuple, Union
+
+from datacatalogtordf import DataService
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+MEDIA_TYPE_URL = "https://www.iana.org/assignments/media-types/"
+KINDS = ("media_type", "publisher", "conforms_to", "endpoint_url", "license")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS services (
+    identifier TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS facts (
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    PRIMARY KEY (kind, value, identifier)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS facts_by_identifier ON facts (identifier);
+"""
+
+
+class CatalogIndex:
+    """A persistent index over converted dataservices.
+
+    Attributes:
+        path (str): the path of the sqlite database
+    """
+
+    __slots__ = ("_path", "_connection")
+
+    _path: PathLike
+    _connection: sqlite3.Connection
+
+    def __init__(self, path: PathLike = ":memory:") -> None:
+        """Opens the index, creating it if needed.
+
+        Args:
+            path (PathLike): the path of the sqlite database
+        """
+        self._path = path
+        self._connection = sqlite3.connect(path)
+        # One transaction per add; WAL keeps those from syncing every time:
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def path(self) -> PathLike:
+        """Get for path."""
+        return self._path
+
+    def add(
+        self,
+        url: str,
+        dataservices: Iterable[DataService],
+        digest: Optional[str] = None,
+    ) -> None:
+        """Adds the dataservices converted from one specification.
+
+        Dataservices already in the index are replaced.
+
+        Args:
+            url (str): the url of the openAPI specification
+            dataservices (Iterable[DataService]): the dataservices created
+            digest (Optional[str]): the content hash of the specification
+        """
+        with self._connection:
+            for dataservice in dataservices:
+                identifier = str(dataservice.identifier)
+                self._connection.execute(
+                    "DELETE FROM facts WHERE identifier = ?", (identifier,)
+                )
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO services VALUES (?, ?, ?)",
+                    (identifier, url, digest),
+                )
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO facts VALUES (?, ?, ?)",
+                    ((kind, value, identifier) for kind, value in _facts(dataservice)),
+                )
+
+    def identifiers(self, kind: str, value: str) -> List[str]:
+        """Looks up the identifiers of dataservices with a property value.
+
+        Args:
+            kind (str): one of "media_type", "publisher", "conforms_to",
+                "endpoint_url" or "license"
+            value (str): the value. Media types may be given as
+                "application/xml" or as the full IANA url
+
+        Returns:
+            the identifiers, sorted
+
+        Raises:
+            ValueError: kind is unknown
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind}")
+        if kind == "media_type" and "://" not in value:
+            value = MEDIA_TYPE_URL + value
+        rows = self._connection.execute(
+            "SELECT identifier FROM facts WHERE kind = ? AND value = ? "
+            "ORDER BY identifier",
+            (kind, value),
+        )
+        return [identifier for identifier, in rows]
+
+    def source(self, identifier: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Looks up the specification a dataservice was converted from.
+
+        Args:
+            identifier (str): the identifier of the dataservice
+
+        Returns:
+            (url, digest) of the specification, None if not in the index
+        """
+        row = self._connection.execute(
+            "SELECT url, digest FROM services WHERE identifier = ?", (identifier,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def __len__(self) -> int:
+        """Returns the number of dataservices in the index."""
+        return self._connection.execute("SELECT COUNT(*) FROM services").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the database."""
+        self._connection.close()
+
+    def __enter__(self) -> "CatalogIndex":
+        """Enters the runtime context."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Exits the runtime context, closing the database."""
+        self.close()
+
+
+def _facts(dataservice: DataService) -> Iterable[Tuple[str, str]]:
+    """Yields the (kind, value) pairs of a dataservice."""
+    for media_type in getattr(dataservice, "media_types", None) or []:
+        yield "media_type", media_type
+    if getattr(dataservice, "publisher", None):
+        yield "publisher", dataservice.publisher
+    for conforms_to in getattr(dataservice, "conformsTo", None) or []:
+        yield "conforms_to", conforms_to
+    for url in getattr(dataservice, "endpoint_urls", None) or [
+        getattr(dataservice, "endpointURL", None)
+    ]:
+        if url:
+            yield "endpoint_url", url
+    if getattr(dataservice, "license", None):
+        yield "license", dataservice.license
@@ -0,0 +1,154 @@
+"""jsonld module for exporting dataservices as JSON Lines.
+
+Each dataservice becomes one compact JSON-LD document on a line of its
+own, ready for bulk ingestion in a search index. The documents are built
+straight from the DataService objects, without going through an rdflib
+graph, and are written one at a time, so memory use does not grow with
+the number of dataservices. Read as JSON-LD, a document gives the same
+triples as the dataservice's rdf.
+
+Example:
+    >>> from oastodcat.batch import convert_many
+    >>> from oastodcat.jsonld import write_jsonl
+    >>>
+    >>> results = convert_many(specs, "http://example.com/dataservices/{id}")
+    >>> with open("dataservices.jsonl", "w") as f:
+    >>>     write_jsonl((d for r in results for d in r.dataservices), f)
+"""
+import json
+from typing import Any, Dict, Iterable, Iterator, List, TextIO, Union
+
+from concepttordf import Contact
+from datacatalogtordf import DataService
+
+_LANGUAGE = {"@container": "@language"}
+_IRI = {"@type": "@id"}
+
+CONTEXT: Dict[str, Any] = {
+    "dcat": "http://www.w3.org/ns/dcat#",
+    "dct": "http://purl.org/dc/terms/",
+    "vcard": "http://www.w3.org/2006/vcard/ns#",
+    "title": {"@id": "dct:title", **_LANGUAGE},
+    "description": {"@id": "dct:description", **_LANGUAGE},
+    "contactPoint": {"@id": "dcat:contactPoint"},
+    "organizationName": {"@id": "vcard:hasOrganizationName", **_LANGUAGE},
+    "email": {"@id": "vcard:hasEmail", **_IRI},
+    "url": {"@id": "vcard:hasURL", **_IRI},
+    "license": {"@id": "dct:license", **_IRI},
+    "mediaType": {"@id": "dcat:mediaType", **_IRI},
+    "endpointURL": {"@id": "dcat:endpointURL", **_IRI},
+    "endpointDescription": {"@id": "dcat:endpointDescription", **_IRI},
+    "landingPage": {"@id": "dcat:landingPage", **_IRI},
+    "publisher": {"@id": "dct:publisher", **_IRI},
+    "conformsTo": {"@id": "dct:conformsTo", **_IRI},
+}
+
+
+def to_jsonld(
+    dataservice: DataService, context: Union[Dict[str, Any], str] = CONTEXT
+) -> Dict[str, Any]:
+    """Creates the compact JSON-LD document of a dataservice.
+
+    Multi-valued properties are always lists, and missing properties are
+    left out.
+
+    Args:
+        dataservice (DataService): the dataservice
+        context (Union[Dict[str, Any], str]): the context, or the url it is
+            published at, to keep each document short
+
+    Returns:
+        the document as a dict
+    """
+    document: Dict[str, Any] = {
+        "@context": context,
+        "@id": str(dataservice.identifier),
+        "@type": "dcat:DataService",
+    }
+    for key in ["title", "description"]:
+        if getattr(dataservice, key, None):
+            document[key] = dict(getattr(dataservice, key))
+    contact = getattr(dataservice, "contactpoint", None)
+    if contact is not None:
+        document["contactPoint"] = _contact(contact)
+    _add(document, "license", getattr(dataservice, "license", None))
+    _add(document, "mediaType", getattr(dataservice, "media_types", None))
+    _add(
+        document,
+        "endpointURL",
+        getattr(dataservice, "endpoint_urls", None)
+        or [getattr(dataservice, "endpointURL", None)],
+    )
+    _add(
+        document,
+        "endpointDescription",
+        getattr(dataservice, "endpointDescription", None),
+    )
+    _add(document, "landingPage", getattr(dataservice, "landing_page", None))
+    _add(document, "publisher", getattr(dataservice, "publisher", None))
+    _add(document, "conformsTo", getattr(dataservice, "conformsTo", None))
+    return document
+
+
+def iter_jsonl(
+    dataservices: Iterable[DataService], context: Union[Dict[str, Any], str] = CONTEXT
+) -> Iterator[str]:
+    """Yields the JSON Lines of dataservices, one at a time.
+
+    Args:
+        dataservices (Iterable[DataService]): the dataservices
+        context (Union[Dict[str, Any], str]): the context, or its url
+
+    Yields:
+        one compact JSON document per dataservice, ending in a newline
+    """
+    for dataservice in dataservices:
+        yield json.dumps(
+            to_jsonld(dataservice, context), ensure_ascii=False, separators=(",", ":")
+        ) + "\n"
+
+
+def write_jsonl(
+    dataservices: Iterable[DataService],
+    output: TextIO,
+    context: Union[Dict[str, Any], str] = CONTEXT,
+) -> int:
+    """Writes dataservices as JSON Lines.
+
+    Args:
+        dataservices (Iterable[DataService]): the dataservices
+        output (TextIO): the file to write to
+        context (Union[Dict[str, Any], str]): the context, or its url
+
+    Returns:
+        the number of documents written
+    """
+    count = 0
+    for line in iter_jsonl(dataservices, context):
+        output.write(line)
+        count += 1
+    return count
+
+
+# --
+def _contact(contact: Contact) -> Dict[str, Any]:
+    """Returns the JSON-LD node of a contact point."""
+    node: Dict[str, Any] = {"@type": "vcard:Organization"}
+    if getattr(contact, "identifier", None):
+        node["@id"] = str(contact.identifier)
+    if getattr(contact, "name", None):
+        node["organizationName"] = dict(contact.name)
+    if getattr(contact, "email", None):
+        node["email"] = "mailto:" + contact.email
+    _add(node, "url", getattr(contact, "url", None))
+    return node
+
+
+def _add(document: Dict[str, Any], key: str, value: object) -> None:
+    """Adds a value, or the non-empty values of a list, as str."""
+    if isinstance(value, list):
+        values: List[str] = [str(v) for v in value if v]
+        if values:
+            document[key] = values
+    elif value:
+        document[key] = str(value)
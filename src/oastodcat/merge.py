@@ -0,0 +1,141 @@
+"""merge module for combining N-Triples shards in bounded memory.
+
+When a batch runs in parallel, each worker may write its own shard of
+sorted N-Triples, as produced by
+:func:`~oastodcat.canonical.to_canonical_ntriples`. The functions in this
+module combine such shards into one file with a k-way merge that drops
+duplicate triples, holding only one line per open shard in memory.
+Since canonical blank node labels are derived from content, they mean the
+same thing in every shard.
+
+Example:
+    >>> from oastodcat.merge import merge_ntriples
+    >>>
+    >>> merge_ntriples(["shard-0.nt", "shard-1.nt"], "catalog.nt")
+"""
+import heapq
+import itertools
+import os
+import tempfile
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+def merge_ntriples(
+    shards: Sequence[PathLike],
+    output: PathLike,
+    max_open_files: int = 256,
+    tmpdir: Optional[PathLike] = None,
+) -> int:
+    """Merges sorted N-Triples shards into one sorted file without duplicates.
+
+    If there are more shards than max_open_files, they are merged in
+    several passes through temporary files.
+
+    Args:
+        shards (Sequence[PathLike]): paths of the sorted shards
+        output (PathLike): path of the merged file
+        max_open_files (int): max number of shards merged at a time
+        tmpdir (Optional[PathLike]): directory for temporary files
+
+    Returns:
+        the number of triples written
+
+    Raises:
+        ValueError: max_open_files is less than 2
+    """
+    if max_open_files < 2:
+        raise ValueError("max_open_files must be at least 2")
+    shards = list(shards)
+    temporaries: List[str] = []
+    try:
+        while len(shards) > max_open_files:
+            merged = []
+            for i in range(0, len(shards), max_open_files):
+                fd, path = tempfile.mkstemp(suffix=".nt", dir=tmpdir)
+                os.close(fd)
+                temporaries.append(path)
+                _merge_files(shards[i : i + max_open_files], path)
+                merged.append(path)
+            shards = merged
+        return _merge_files(shards, output)
+    finally:
+        for path in temporaries:
+            os.remove(path)
+
+
+def sort_ntriples(
+    source: PathLike,
+    output: PathLike,
+    max_lines: int = 1_000_000,
+    tmpdir: Optional[PathLike] = None,
+) -> int:
+    """Sorts an N-Triples file and drops duplicates, in bounded memory.
+
+    The file is sorted in runs of max_lines lines, which are then merged
+    with merge_ntriples.
+
+    Args:
+        source (PathLike): path of the N-Triples file
+        output (PathLike): path of the sorted file
+        max_lines (int): max number of lines held in memory
+        tmpdir (Optional[PathLike]): directory for temporary files
+
+    Returns:
+        the number of triples written
+    """
+    runs: List[str] = []
+    try:
+        with open(source, encoding="utf-8", newline="\n") as f:
+            while True:
+                chunk = list(itertools.islice(f, max_lines))
+                if not chunk:
+                    break
+                lines = sorted(_lines(chunk))
+                fd, path = tempfile.mkstemp(suffix=".nt", dir=tmpdir)
+                runs.append(path)
+                with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as run:
+                    run.writelines(lines)
+        return merge_ntriples(runs, output, tmpdir=tmpdir)
+    finally:
+        for path in runs:
+            os.remove(path)
+
+
+def merge_lines(iterables: Iterable[Iterable[str]]) -> Iterator[str]:
+    """Merges sorted iterables of lines, dropping duplicates.
+
+    Args:
+        iterables (Iterable[Iterable[str]]): sorted lines, ending in newline
+
+    Yields:
+        the distinct lines in sorted order
+    """
+    previous = None
+    for line in heapq.merge(*iterables):
+        if line != previous:
+            yield line
+            previous = line
+
+
+# --
+def _merge_files(paths: Sequence[PathLike], output: PathLike) -> int:
+    files = [open(path, encoding="utf-8", newline="\n") for path in paths]
+    count = 0
+    try:
+        with open(output, "w", encoding="utf-8", newline="\n") as out:
+            for line in merge_lines(_lines(f) for f in files):
+                out.write(line)
+                count += 1
+    finally:
+        for f in files:
+            f.close()
+    return count
+
+
+def _lines(lines: Iterable[str]) -> Iterator[str]:
+    """Yields the non-empty lines, each ending in a newline."""
+    for line in lines:
+        if line.strip():
+            yield line if line.endswith("\n") else line + "\n"
@@ -35,10 +35,22 @@ Example:
     True
 """
 import hashlib
-from typing import List, Optional
+import itertools
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
 
 from concepttordf import Contact
 from datacatalogtordf import DataService, URI
+from rdflib import Graph, Namespace, URIRef
+
+from .stats import OperationStatistics
+
+DCAT = Namespace("http://www.w3.org/ns/dcat#")
+SPDX_LICENSE_URL = "https://spdx.org/licenses/{id}.html"
+_METHODS = frozenset(
+    ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+)
+_SLOT_NAMES: Dict[type, List[str]] = {}
 
 
 class OASDataService:
@@ -52,6 +64,14 @@ class OASDataService:
         dataservices (List[DataService]): a list of dataservices created
         endpointdescription (str): The url of the openAPI specification
         identifier (str): the identifier template, should contain {id}
+        publisher (Optional[str]): the publisher of the dataservices that
+            have none of their own
+        conforms_to (List[str]): the conformsTo of the dataservices that
+            have none of their own
+        defaults (CatalogDefaults): the publisher and conformsTo, falling
+            back on the catalog defaults given
+        statistics (Optional[OperationStatistics]): the paths and operations
+            of the specification, if asked for
     """
 
     __slots__ = (
@@ -61,8 +81,15 @@ class OASDataService:
         "_endpointdescription",
         "_media_types",
         "_dataservice",
-        "_publisher",
-        "_conforms_to",
+        "_defaults",
+        "_max_nodes",
+        "_max_depth",
+        "_visited",
+        "_server_variables",
+        "_max_server_urls",
+        "_group_server_urls",
+        "_contact_identifier",
+        "_statistics",
     )
 
     # Types:
@@ -70,48 +97,108 @@ class OASDataService:
     _dataservices: List[DataService]
     _identifier: str
     _endpointdescription: URI
-    _media_types: List[str]
-    _publisher: str
-    _conforms_to: List[str]
-
-    def __init__(self, url: str, specification: dict, identifier: str) -> None:
+    _media_types: Set[str]
+    _defaults: "CatalogDefaults"
+    _max_nodes: Optional[int]
+    _max_depth: Optional[int]
+    _visited: int
+    _server_variables: Optional[str]
+    _max_server_urls: int
+    _group_server_urls: bool
+    _contact_identifier: Optional[str]
+    _statistics: Optional[OperationStatistics]
+
+    def __init__(
+        self,
+        url: str,
+        specification: dict,
+        identifier: str,
+        max_nodes: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        server_variables: Optional[str] = None,
+        max_server_urls: int = 16,
+        group_server_urls: bool = False,
+        contact_identifier: Optional[str] = None,
+        statistics: bool = False,
+        defaults: Optional["CatalogDefaults"] = None,
+    ) -> None:
         """Inits an object with default values and parses the specification.
 
         Args:
             url (str): the url of the openAPI specification
-            specification (dict): an openAPI specification as a dict
+            specification (dict): an openAPI 3.0 or 3.1, or a Swagger 2.0
+                specification as a dict
             identifier (str): the identifier template, containing {id}
+            max_nodes (Optional[int]): max number of objects visited per walk
+            max_depth (Optional[int]): max nesting depth visited per walk
+            server_variables (Optional[str]): expand server variables using
+                their "default", or their "enum" values. None keeps urls as is
+            max_server_urls (int): max number of urls expanded per server
+            group_server_urls (bool): one dataservice per server, with all of
+                its expanded urls as endpointURL
+            contact_identifier (Optional[str]): identifier template for
+                contact points, containing {id}. The id is derived from the
+                contact's content, so identical contacts share one node.
+                None gives each contact point its own blank node
+            statistics (bool): count the paths and operations, in the same
+                walk as the media types
+            defaults (Optional[CatalogDefaults]): the catalog defaults for
+                publisher and conformsTo, shared with other specifications
 
         Raises:
+            ValueError: server_variables is not None, "default" or "enum"
             NotSupportedOASError: We do not support this version of the specification
             NotValidOASError: The specification is not valid
             RequiredFieldMissingError: a required property is missing
+
+        # noqa: DAR402 NotSupportedOASError
         """
         super().__init__()
         if not (specification):
             raise NotValidOASError("Empty specification object")
 
-        if not specification["openapi"].startswith("3.0."):
-            raise NotSupportedOASError(
-                f'Version {specification["openapi"]}" is not supported'
-            )
+        specification = normalize_specification(specification, url)
         if len(identifier) == 0:
             raise RequiredFieldMissingError("Empty indentification attribute")
+        if server_variables not in (None, "default", "enum"):
+            raise ValueError(f"Unknown server_variables mode {server_variables}")
 
         self.identifier = identifier
         self.endpointdescription = url
         self.specification = specification
         self._dataservices: List[DataService] = []
-        self._media_types = []
+        self._media_types = set()
+        self._max_nodes = max_nodes
+        self._max_depth = max_depth
+        self._visited = 0
+        self._server_variables = server_variables
+        self._max_server_urls = max_server_urls
+        self._group_server_urls = group_server_urls
+        self._contact_identifier = contact_identifier
+        self._statistics = OperationStatistics() if statistics else None
+        self._defaults = CatalogDefaults(parent=defaults)
 
         # endpointURL
         if "servers" in specification:
             for server in specification["servers"]:
                 if "url" in server:
-                    self._create_dataservice(url=server["url"])
+                    self._create_server_dataservices(server)
         else:
             self._create_dataservice()
 
+    def __getstate__(self) -> dict:
+        """Returns the state to pickle, without the dataservice being parsed."""
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name != "_dataservice" and hasattr(self, name)
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores a pickled state."""
+        for name, value in state.items():
+            setattr(self, name, value)
+
     @property
     def identifier(self) -> str:
         """Get/set for identifier."""
@@ -140,60 +227,72 @@ class OASDataService:
         self._specification = specification
 
     @property
-    def publisher(self) -> str:
+    def publisher(self) -> Optional[str]:
         """Get/set for publisher."""
-        return self._publisher
+        return self._defaults.publisher
 
     @publisher.setter
     def publisher(self, publisher: str) -> None:
-        self._publisher = URI(publisher)
-        for dataservice in self._dataservices:
-            dataservice.publisher = publisher
+        self._defaults.publisher = publisher
 
     @property
     def conforms_to(self) -> List[str]:
         """Get/set for conforms_to."""
-        return self._conforms_to
+        return self._defaults.conforms_to
 
     @conforms_to.setter
     def conforms_to(self, conforms_to: List[str]) -> None:
-        self._conforms_to = conforms_to
-        for dataservice in self._dataservices:
-            dataservice.conformsTo = conforms_to
+        self._defaults.conforms_to = conforms_to
+
+    @property
+    def defaults(self) -> "CatalogDefaults":
+        """Get for defaults."""
+        return self._defaults
 
     @property
     def dataservices(self) -> List[DataService]:
         """Get for dataservices."""
         return self._dataservices
 
+    @property
+    def statistics(self) -> Optional[OperationStatistics]:
+        """Get for statistics."""
+        return self._statistics
+
     # --
-    def _create_dataservice(self, url: Optional[str] = None) -> None:
+    def _create_server_dataservices(self, server: dict) -> None:
+        """Creates the dataservices of a server object."""
+        if self._server_variables is None:
+            self._create_dataservice(url=server["url"])
+            return
+
+        urls = expand_server_url(
+            server, self._server_variables == "enum", self._max_server_urls
+        )
+        if self._group_server_urls:
+            self._create_dataservice(url=server["url"], endpoint_urls=urls)
+        else:
+            for url in urls:
+                self._create_dataservice(url=url)
+
+    def _create_dataservice(
+        self, url: Optional[str] = None, endpoint_urls: Optional[List[str]] = None
+    ) -> None:
         """Creates a dataservice instance and appends it to list of dataservices."""
-        self._dataservice = DataService()
-        if url:
-            self._dataservice.endpointURL = url
+        if endpoint_urls is None:
+            self._dataservice = _DataService(self._defaults)
+            if url:
+                self._dataservice.endpointURL = url
+        else:
+            self._dataservice = MultiEndpointDataService(self._defaults)
+            self._dataservice.endpoint_urls = endpoint_urls
         self._dataservice.endpointDescription = self.endpointdescription
 
-        try:
-            self._dataservice.publisher = self.publisher
-        except AttributeError:
-            pass
-
-        try:
-            self._dataservice.conformsTo = self.conforms_to
-        except AttributeError:
-            self.conforms_to: List[str] = []
-
         self._parse_specification()
 
-        # We may be given an identifier "template" ending with {id}.
-        # We create the identifier and url based on title and complete the identifer:
-        id = (
-            self._dataservice.title["en"]
-            if url is None
-            else self._dataservice.title["en"] + url
+        self._dataservice.identifier = create_identifier(
+            self.identifier, self._dataservice.title["en"], url
         )
-        self._dataservice.identifier = URI(self.identifier.format(id=create_id(id)))
 
         self.dataservices.append(self._dataservice)
 
@@ -229,13 +328,17 @@ class OASDataService:
     def _parse_contactpoint(self) -> None:
         """Parses the contact object."""
         if "contact" in self.specification["info"]:
-            contact = Contact()
+            contact = _Contact()
             if "name" in self.specification["info"]["contact"]:
                 contact.name = {"en": self.specification["info"]["contact"]["name"]}
             if "email" in self.specification["info"]["contact"]:
                 contact.email = self.specification["info"]["contact"]["email"]
             if "url" in self.specification["info"]["contact"]:
                 contact.url = self.specification["info"]["contact"]["url"]
+            if self._contact_identifier:
+                contact.identifier = create_contact_identifier(
+                    self._contact_identifier, contact
+                )
             self._dataservice.contactpoint = contact
 
     def _parse_license(self) -> None:
@@ -246,9 +349,11 @@ class OASDataService:
 
     def _parse_media_type(self) -> None:
         """Parses the media type objects."""
-        self._seek_media_types(self.specification, ["content"])
-        # Need to remove duplicates:
-        self._dataservice.media_types = list(set(self._media_types))
+        # They are the same for every server, so seek them only once:
+        if self._visited == 0:
+            self._seek_media_types(self.specification, ["content"])
+        # Sorted to keep the output stable:
+        self._dataservice.media_types = sorted(self._media_types)
 
     def _parse_external_docs(self) -> None:
         """Parses the externalDocs objects."""
@@ -257,9 +362,10 @@ class OASDataService:
                 self._dataservice.landing_page.append(
                     self.specification["externalDocs"]["url"]
                 )
+                self._dataservice.landing_page.sort()
 
     # --
-    def _seek_media_types(self, d: dict, key_list: List[str]) -> None:
+    def _seek_media_types(self, d: dict, key_list: List[str], depth: int = 0) -> None:
         """Helper method.
 
         Seeks for keys matching any of keys in key_list.
@@ -268,14 +374,454 @@ class OASDataService:
         Args:
             d (dict): the dict in which to searc
             key_list (List[str]): list of keys to search for
+            depth (int): the nesting depth of d
+
+        Raises:
+            LimitExceededError: the node-visit budget or max depth is exceeded
+
+        # noqa: DAR402 LimitExceededError
         """
-        _url = "https://www.iana.org/assignments/media-types/"
+        self._visit(depth)
         for k, v in d.items():
             if k in key_list:
-                for key in v.keys():
-                    self._media_types.append(_url + str(key))
+                self._add_media_types(v)
             if isinstance(v, dict):
-                self._seek_media_types(v, key_list)
+                if depth == 0 and k == "paths" and self._statistics is not None:
+                    self._seek_paths(v, key_list, depth + 1, self._statistics)
+                else:
+                    self._seek_media_types(v, key_list, depth + 1)
+
+    def _seek_paths(
+        self,
+        paths: dict,
+        key_list: List[str],
+        depth: int,
+        statistics: OperationStatistics,
+    ) -> None:
+        """Helper method.
+
+        Walks a paths object like _seek_media_types, and counts its path
+        items and operations on the way.
+
+        Args:
+            paths (dict): the paths object
+            key_list (List[str]): list of keys to search for
+            depth (int): the nesting depth of paths
+            statistics (OperationStatistics): the statistics to count in
+        """
+        self._visit(depth)
+        for path, path_item in paths.items():
+            if path in key_list:
+                self._add_media_types(path_item)
+            if not isinstance(path_item, dict):
+                continue
+            self._visit(depth + 1)
+            statistics.paths += 1
+            for method, operation in path_item.items():
+                if method in key_list:
+                    self._add_media_types(operation)
+                if isinstance(operation, dict):
+                    if method in _METHODS:
+                        statistics.add_operation(method, operation)
+                    self._seek_media_types(operation, key_list, depth + 2)
+
+    def _visit(self, depth: int) -> None:
+        """Helper method.
+
+        Counts a visited object against the limits.
+
+        Args:
+            depth (int): the nesting depth of the object
+
+        Raises:
+            LimitExceededError: the node-visit budget or max depth is exceeded
+        """
+        self._visited += 1
+        if self._max_nodes is not None and self._visited > self._max_nodes:
+            raise LimitExceededError(f"Node-visit budget of {self._max_nodes} exceeded")
+        if self._max_depth is not None and depth > self._max_depth:
+            raise LimitExceededError(f"Max nesting depth of {self._max_depth} exceeded")
+
+    def _add_media_types(self, content: dict) -> None:
+        """Adds the keys of a content object to self._media_types."""
+        _url = "https://www.iana.org/assignments/media-types/"
+        for key in content.keys():
+            self._media_types.add(_url + str(key))
+
+
+class CatalogDefaults:
+    """Publisher and conformsTo shared by many dataservices.
+
+    The values are validated once, when they are set, and read by each
+    dataservice only when its triples are emitted, unless it has values of
+    its own. Unset values fall back on those of the parent, so that an
+    OASDataService may set its own on top of defaults for a whole catalog.
+
+    Example:
+        >>> defaults = CatalogDefaults("https://example.com/publishers/1")
+        >>> oas_spec = OASDataService(url, oas, identifier, defaults=defaults)
+        >>> oas_spec.dataservices[0].publisher
+        'https://example.com/publishers/1'
+
+    Attributes:
+        publisher (Optional[str]): the publisher, None if unset
+        conforms_to (List[str]): the standards conformed to, empty if unset
+        parent (Optional[CatalogDefaults]): the defaults to fall back on
+    """
+
+    __slots__ = ("_publisher", "_conforms_to", "_parent")
+
+    _publisher: Optional[str]
+    _conforms_to: Optional[List[str]]
+    _parent: Optional["CatalogDefaults"]
+
+    def __init__(
+        self,
+        publisher: Optional[str] = None,
+        conforms_to: Optional[List[str]] = None,
+        parent: Optional["CatalogDefaults"] = None,
+    ) -> None:
+        """Inits an object, validating the values given.
+
+        Args:
+            publisher (Optional[str]): the uri of the publisher
+            conforms_to (Optional[List[str]]): the uris of the standards
+            parent (Optional[CatalogDefaults]): the defaults to fall back on
+        """
+        self._publisher = None
+        self._conforms_to = None
+        self._parent = parent
+        if publisher is not None:
+            self.publisher = publisher
+        if conforms_to is not None:
+            self.conforms_to = conforms_to
+
+    @property
+    def publisher(self) -> Optional[str]:
+        """Get/set for publisher."""
+        if self._publisher is None and self._parent is not None:
+            return self._parent.publisher
+        return self._publisher
+
+    @publisher.setter
+    def publisher(self, publisher: str) -> None:
+        # Validated, but kept as str: datacatalogtordf only emits a str.
+        URI(publisher)
+        self._publisher = publisher
+
+    @property
+    def conforms_to(self) -> List[str]:
+        """Get/set for conforms_to."""
+        if self._conforms_to is None:
+            return self._parent.conforms_to if self._parent is not None else []
+        return self._conforms_to
+
+    @conforms_to.setter
+    def conforms_to(self, conforms_to: List[str]) -> None:
+        for uri in conforms_to:
+            URI(uri)
+        self._conforms_to = conforms_to
+
+    @property
+    def parent(self) -> Optional["CatalogDefaults"]:
+        """Get/set for parent."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent: Optional["CatalogDefaults"]) -> None:
+        self._parent = parent
+
+
+class _DataService(DataService):
+    """A dcat:DataService that keeps the identifier of its contact point.
+
+    datacatalogtordf emits every contact point as a fresh blank node. When
+    the contact has an identifier, it is used as the node instead, so that
+    identical contacts collapse into one node in the graph.
+
+    publisher and conformsTo fall back on its CatalogDefaults, if it has
+    no values of its own, so they are read only when triples are emitted.
+
+    It pickles to its converted fields only. The rdflib graphs of the
+    dataservice and of its contact point are left out, since they are
+    large and slow to pickle, and are rebuilt by _to_graph.
+    """
+
+    def __init__(self, defaults: Optional[CatalogDefaults] = None) -> None:
+        """Inits an object with default values."""
+        self._defaults = defaults
+        super().__init__()
+        # datacatalogtordf may init conformsTo, which would hide the default:
+        self.__dict__.pop("_own_conforms_to", None)
+        # Set, so that reading the default does not raise AttributeError:
+        self._publisher: Optional[str] = None
+
+    @property
+    def defaults(self) -> Optional[CatalogDefaults]:
+        """Get for defaults."""
+        return self._defaults
+
+    @property
+    def publisher(self) -> Optional[str]:
+        """Get/set for publisher, falling back on the defaults."""
+        publisher = getattr(self, "_publisher", None)
+        if publisher is None and self._defaults is not None:
+            return self._defaults.publisher
+        return publisher
+
+    @publisher.setter
+    def publisher(self, publisher: str) -> None:
+        self._publisher = publisher
+
+    @property
+    def conformsTo(self) -> List[str]:  # noqa: N802
+        """Get/set for conformsTo, falling back on the defaults."""
+        conforms_to = self.__dict__.get("_own_conforms_to")
+        if conforms_to is None and self._defaults is not None:
+            return self._defaults.conforms_to
+        return conforms_to or []
+
+    @conformsTo.setter
+    def conformsTo(self, conforms_to: List[str]) -> None:  # noqa: N802
+        self.__dict__["_own_conforms_to"] = conforms_to
+
+    def __getstate__(self) -> dict:
+        """Returns the converted fields, without the graphs."""
+        state = {
+            name: getattr(self, name)
+            for name in _slot_names(type(self))
+            if name != "_g" and hasattr(self, name)
+        }
+        state.update(self.__dict__)
+        contact = state.get("_contactpoint")
+        if isinstance(contact, Contact):
+            state["_contactpoint"] = {
+                name: value for name, value in vars(contact).items() if name != "_g"
+            }
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the converted fields, with a new contact point."""
+        for name, value in state.items():
+            if name == "_contactpoint" and isinstance(value, dict):
+                contact = _Contact()
+                contact.__dict__.update(value)
+                value = contact
+            setattr(self, name, value)
+
+    def _contactpoint_to_graph(self) -> None:
+        contact: Contact = getattr(self, "contactpoint", None)
+        if not getattr(contact, "identifier", None):
+            super()._contactpoint_to_graph()
+            return
+        node = URIRef(contact.identifier)
+        for _s, p, o in contact._to_graph().triples((None, None, None)):
+            self._g.add((node, p, o))
+        self._g.add((URIRef(self.identifier), DCAT.contactPoint, node))
+
+
+class _Contact(Contact):
+    """A vcard contact that creates its graph when it is first used.
+
+    Creating an rdflib Graph takes a good share of the time spent creating
+    or unpickling a dataservice, and most contacts never emit their own.
+    """
+
+    def __init__(self) -> None:
+        """Inits an object without a graph."""
+
+    @property
+    def _g(self) -> Graph:
+        """Get for the graph, creating it if needed."""
+        graph = self.__dict__.get("_g")
+        if graph is None:
+            graph = self.__dict__["_g"] = Graph()
+        return graph
+
+
+class MultiEndpointDataService(_DataService):
+    """A dcat:DataService with more than one endpoint URL.
+
+    Attributes:
+        endpoint_urls (List[str]): the endpoint urls, the first one is also
+            available as endpointURL
+    """
+
+    _endpoint_urls: List[str]
+
+    @property
+    def endpoint_urls(self) -> List[str]:
+        """Get/set for endpoint_urls."""
+        return self._endpoint_urls
+
+    @endpoint_urls.setter
+    def endpoint_urls(self, endpoint_urls: List[str]) -> None:
+        self._endpoint_urls = [URI(url) for url in endpoint_urls]
+        self.endpointURL = self._endpoint_urls[0]
+
+    def _endpointURL_to_graph(self) -> None:  # noqa: N802
+        for url in self.endpoint_urls:
+            self._g.add((URIRef(self.identifier), DCAT.endpointURL, URIRef(url)))
+
+
+def _slot_names(cls: type) -> List[str]:
+    """Helper function listing the slots of cls and of its bases."""
+    names = _SLOT_NAMES.get(cls)
+    if names is None:
+        names = _SLOT_NAMES[cls] = [
+            name
+            for base in cls.__mro__
+            for name in base.__dict__.get("__slots__", ())
+            if name not in ("__dict__", "__weakref__")
+        ]
+    return names
+
+
+def expand_server_url(
+    server: dict, enum: bool = False, limit: Optional[int] = None
+) -> List[str]:
+    """Helper function to expand the variables of a server object.
+
+    The combination of default values comes first. With enum, the other
+    values of each variable follow, as the cartesian product of all
+    variables, cut off after limit urls.
+
+    Args:
+        server (dict): an openAPI server object
+        enum (bool): expand the enum values too, not only the default
+        limit (Optional[int]): max number of urls returned
+
+    Returns:
+        the expanded urls
+    """
+    variables = server.get("variables") or {}
+    names = [name for name in variables if "{" + name + "}" in server["url"]]
+    choices = []
+    for name in names:
+        values = [variables[name]["default"]] if "default" in variables[name] else []
+        if enum:
+            values += [v for v in variables[name].get("enum", []) if v not in values]
+        # A variable without values is left as it is:
+        choices.append(values or ["{" + name + "}"])
+
+    urls = []
+    for combination in itertools.islice(itertools.product(*choices), limit):
+        url = server["url"]
+        for name, value in zip(names, combination):
+            url = url.replace("{" + name + "}", str(value))
+        urls.append(url)
+    return urls
+
+
+def normalize_specification(specification: dict, url: Optional[str] = None) -> dict:
+    """Helper function to give a specification the shape of openAPI 3.0.
+
+    Only the fields the conversion reads are mapped, in one pass over the
+    top level and the operations. The rest of the document is shared with
+    the given one, not copied or rewritten, and the given one is left as
+    it is.
+
+    From Swagger 2.0, host, basePath and schemes become servers, falling
+    back on the host and scheme of url. produces and consumes, of each
+    operation or else of the document, become a content object at the top
+    level, where the media types are sought.
+
+    From openAPI 3.1, a license given by its SPDX identifier gets the url
+    of the SPDX license page. Media types are sought in webhooks as in
+    paths, and jsonSchemaDialect is not used.
+
+    Args:
+        specification (dict): an openAPI specification as a dict
+        url (Optional[str]): the url of the openAPI specification
+
+    Returns:
+        the specification in the shape of openAPI 3.0
+
+    Raises:
+        NotSupportedOASError: We do not support this version of the specification
+    """
+    if str(specification.get("swagger")) == "2.0":
+        return _normalize_swagger_2(specification, url)
+    version = str(specification.get("openapi", ""))
+    if version.startswith("3.0."):
+        return specification
+    if version.startswith("3.1."):
+        return _normalize_openapi_3_1(specification)
+    raise NotSupportedOASError(f'Version {version}" is not supported')
+
+
+def _normalize_swagger_2(specification: dict, url: Optional[str]) -> dict:
+    """Maps the servers and media types of a Swagger 2.0 specification."""
+    normalized = dict(specification)
+    location = urlparse(url or "")
+    host = specification.get("host") or location.netloc
+    if host:
+        base_path = specification.get("basePath", "/").rstrip("/")
+        schemes = specification.get("schemes") or [location.scheme or "https"]
+        normalized["servers"] = [
+            {"url": f"{scheme}://{host}{base_path}"} for scheme in schemes
+        ]
+
+    operations = [
+        operation
+        for path_item in (specification.get("paths") or {}).values()
+        if isinstance(path_item, dict)
+        for method, operation in path_item.items()
+        if method in _METHODS and isinstance(operation, dict)
+    ]
+    content: Dict[str, dict] = {}
+    for operation in operations or [{}]:
+        for key in ("produces", "consumes"):
+            for media_type in operation.get(key, specification.get(key)) or []:
+                content[media_type] = {}
+    normalized["content"] = content
+    return normalized
+
+
+def _normalize_openapi_3_1(specification: dict) -> dict:
+    """Maps the license of an openAPI 3.1 specification."""
+    info = specification.get("info") or {}
+    license = info.get("license") or {}
+    if "identifier" not in license or "url" in license:
+        return specification
+    url = SPDX_LICENSE_URL.format(id=license["identifier"])
+    return dict(specification, info=dict(info, license=dict(license, url=url)))
+
+
+def create_identifier(identifier: str, title: str, url: Optional[str] = None) -> URI:
+    """Helper function to create the identifier of a dataservice.
+
+    We may be given an identifier "template" ending with {id}.
+    We create the id based on title and url and complete the identifier.
+
+    Args:
+        identifier (str): the identifier template, containing {id}
+        title (str): the title of the dataservice
+        url (Optional[str]): the endpoint url of the dataservice, if any
+
+    Returns:
+        the identifier as a URI
+    """
+    id = title if url is None else title + url
+    return URI(identifier.format(id=create_id(id)))
+
+
+def create_contact_identifier(identifier: str, contact: Contact) -> URI:
+    """Helper function to create a content-derived identifier of a contact.
+
+    Args:
+        identifier (str): the identifier template, containing {id}
+        contact (Contact): the contact
+
+    Returns:
+        the identifier as a URI
+    """
+    content = [
+        str(sorted(getattr(contact, "name", {}).items())),
+        getattr(contact, "email", ""),
+        getattr(contact, "url", ""),
+    ]
+    return URI(identifier.format(id=create_id("\n".join(content))))
 
 
 def create_id(s: str) -> str:
@@ -300,6 +846,7 @@ class NotValidOASError(Error):
 
     def __init__(self, message: str) -> None:
         """Inits an object with default values."""
+        super().__init__(message)
         self.message = message
 
 
@@ -312,6 +859,7 @@ class NotSupportedOASError(Error):
 
     def __init__(self, message: str) -> None:
         """Inits an object with default values."""
+        super().__init__(message)
         self.message = message
 
 
@@ -324,4 +872,18 @@ class RequiredFieldMissingError(Error):
 
     def __init__(self, message: str) -> None:
         """Inits an object with default values."""
+        super().__init__(message)
+        self.message = message
+
+
+class LimitExceededError(Error):
+    """A resource limit was exceeded while converting the specification.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message: str) -> None:
+        """Inits an object with default values."""
+        super().__init__(message)
         self.message = message
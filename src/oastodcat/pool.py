@@ -0,0 +1,416 @@
+"""pool module for running conversions in supervised worker processes.
+
+This module contains a small process pool that, unlike
+:class:`concurrent.futures.ProcessPoolExecutor`, enforces per-task limits:
+a task running longer than ``timeout`` seconds, or a worker whose resident
+set size grows beyond ``max_rss`` bytes, is reported as a
+:class:`LimitExceededError`. The offending worker is terminated and replaced,
+so the remaining tasks are unaffected. A worker still over ``max_rss`` after
+its task has finished is replaced too, before it is handed another task.
+
+Workers are long-lived and handle many tasks each. Where the platform
+supports it they are forked from a forkserver that has already imported
+rdflib, datacatalogtordf and concepttordf, so a new worker is warm from
+the start. ``max_tasks_per_worker`` replaces workers after a number of
+tasks, which bounds the memory they can accumulate.
+
+Example:
+    >>> from oastodcat.pool import ConversionPool
+    >>>
+    >>> with ConversionPool(max_workers=2, timeout=10) as pool:
+    >>>     for index, ok, payload in pool.imap_unordered(pow, [(2, 3), (3, 2)]):
+    >>>         print(index, ok, payload)
+    >>>     print(pool.submit(pow, 2, 10).result())
+"""
+from concurrent.futures import as_completed, Future
+import multiprocessing
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import BaseContext
+from multiprocessing.process import BaseProcess
+import os
+import queue
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .oas_dataservice import Error, LimitExceededError
+
+# Imported once by the forkserver and inherited by every worker:
+PRELOAD_MODULES = (
+    "rdflib",
+    "rdflib.plugins.serializers.nt",
+    "rdflib.plugins.serializers.turtle",
+    "concepttordf",
+    "datacatalogtordf",
+    "yaml",
+    "oastodcat.batch",
+    "oastodcat.canonical",
+)
+
+
+class ConversionPool:
+    """A pool of long-lived worker processes with per-task limits.
+
+    Tasks are handed to the workers by a dispatcher thread, so submit may be
+    called from any thread.
+
+    Attributes:
+        max_workers (int): the number of worker processes
+        timeout (Optional[float]): max wall-clock seconds per task
+        max_rss (Optional[int]): max resident set size in bytes per worker
+        max_tasks_per_worker (Optional[int]): tasks a worker handles before
+            it is replaced
+    """
+
+    __slots__ = (
+        "_max_workers",
+        "_timeout",
+        "_max_rss",
+        "_max_tasks_per_worker",
+        "_poll_interval",
+        "_context",
+        "_workers",
+        "_queue",
+        "_lock",
+        "_dispatcher",
+    )
+
+    # Types:
+    _max_workers: int
+    _timeout: Optional[float]
+    _max_rss: Optional[int]
+    _max_tasks_per_worker: Optional[int]
+    _poll_interval: float
+    _workers: List["_Worker"]
+    _queue: "queue.Queue[Optional[Tuple[Future, Callable[..., Any], Tuple]]]"
+    _lock: threading.Lock
+    _dispatcher: Optional[threading.Thread]
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_rss: Optional[int] = None,
+        poll_interval: float = 0.05,
+        max_tasks_per_worker: Optional[int] = None,
+        start_method: Optional[str] = "forkserver",
+        preload: Sequence[str] = PRELOAD_MODULES,
+    ) -> None:
+        """Inits an object with default values.
+
+        Workers are started lazily, on the first submit, or by start.
+
+        Args:
+            max_workers (Optional[int]): number of workers, defaults to cpu count
+            timeout (Optional[float]): max wall-clock seconds per task
+            max_rss (Optional[int]): max resident set size in bytes per worker
+            poll_interval (float): seconds between limit checks
+            max_tasks_per_worker (Optional[int]): tasks a worker handles
+                before it is replaced, None for no limit
+            start_method (Optional[str]): the multiprocessing start method,
+                None for the platform default. "forkserver" falls back to the
+                default where it is not available
+            preload (Sequence[str]): modules the forkserver imports up front
+        """
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._timeout = timeout
+        self._max_rss = max_rss
+        self._max_tasks_per_worker = max_tasks_per_worker
+        self._poll_interval = poll_interval
+        if start_method not in multiprocessing.get_all_start_methods():
+            start_method = None
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == "forkserver":
+            self._context.set_forkserver_preload(list(preload))
+        self._workers = []
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._dispatcher = None
+
+    @property
+    def max_workers(self) -> int:
+        """Get for max_workers."""
+        return self._max_workers
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """Get for timeout."""
+        return self._timeout
+
+    @property
+    def max_rss(self) -> Optional[int]:
+        """Get for max_rss."""
+        return self._max_rss
+
+    @property
+    def max_tasks_per_worker(self) -> Optional[int]:
+        """Get for max_tasks_per_worker."""
+        return self._max_tasks_per_worker
+
+    def start(self) -> None:
+        """Starts the workers and the dispatcher, if not already running."""
+        with self._lock:
+            if self._dispatcher is None:
+                self._start_workers()
+                self._dispatcher = threading.Thread(target=self._run, daemon=True)
+                self._dispatcher.start()
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        """Schedules func(*args) to run in a worker.
+
+        Args:
+            func (Callable): a picklable, module level function
+            args (Any): the arguments to func
+
+        Returns:
+            a Future holding the return value, or the exception raised
+        """
+        self.start()
+        future: Future = Future()
+        self._queue.put((future, func, args))
+        return future
+
+    def imap_unordered(
+        self, func: Callable[..., Any], iterable: Iterable[Tuple]
+    ) -> Iterator[Tuple[int, bool, Any]]:
+        """Runs func on each tuple of arguments in iterable.
+
+        Args:
+            func (Callable): a picklable, module level function
+            iterable (Iterable[Tuple]): the argument tuples, one per task
+
+        Yields:
+            (index, ok, payload) in order of completion, where payload is the
+            return value if ok, otherwise the exception that was raised.
+        """
+        futures = {
+            self.submit(func, *args): index for index, args in enumerate(iterable)
+        }
+        try:
+            for future in as_completed(futures):
+                error = future.exception()
+                if error is None:
+                    yield futures[future], True, future.result()
+                else:
+                    yield futures[future], False, error
+        finally:
+            # The consumer may stop early; do not leave tasks behind.
+            for future in futures:
+                future.cancel()
+
+    def close(self) -> None:
+        """Stops the dispatcher and all workers, cancelling queued tasks."""
+        with self._lock:
+            if self._dispatcher is not None:
+                self._cancel_queued()
+                self._queue.put(None)
+                self._dispatcher.join()
+                self._dispatcher = None
+            for worker in self._workers:
+                worker.stop()
+            self._workers = []
+
+    def __enter__(self) -> "ConversionPool":
+        """Enters the runtime context."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Exits the runtime context, stopping all workers."""
+        self.close()
+
+    # --
+    def _start_workers(self) -> None:
+        while len(self._workers) < self._max_workers:
+            self._workers.append(_Worker(self._context))
+
+    def _run(self) -> None:
+        """The dispatcher loop, runs until close puts None on the queue."""
+        busy: Dict[Connection, _Worker] = {}
+        running = True
+        while running or busy:
+            if running:
+                running = self._dispatch(busy)
+            if busy:
+                self._collect(busy)
+        self._cancel_queued()
+
+    def _cancel_queued(self) -> None:
+        while True:
+            try:
+                task = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if task is not None:
+                task[0].cancel()
+
+    def _dispatch(self, busy: Dict[Connection, "_Worker"]) -> bool:
+        """Hands queued tasks to idle workers, returns False on shutdown."""
+        for worker in self._workers:
+            if worker.future is not None:
+                continue
+            try:
+                # Block only if there is nothing else to wait for:
+                task = self._queue.get(block=not busy, timeout=None)
+            except queue.Empty:
+                break
+            if task is None:
+                return False
+            future, func, args = task
+            if future.set_running_or_notify_cancel():
+                worker.submit(future, func, args)
+                busy[worker.conn] = worker
+        return True
+
+    def _collect(self, busy: Dict[Connection, "_Worker"]) -> None:
+        """Resolves finished tasks, and tasks whose worker exceeded a limit."""
+        for conn in wait(list(busy), timeout=self._poll_interval):
+            worker = busy.pop(conn)  # type: ignore
+            future = worker.future
+            try:
+                ok, payload = worker.receive()
+            except (EOFError, OSError):
+                ok, payload = False, WorkerLostError(
+                    f"Worker exited with code {worker.process.exitcode}"
+                )
+                self._replace(worker)
+            else:
+                # Memory kept by a finished task would count against the next:
+                if worker.tasks == self._max_tasks_per_worker or self._over_rss(worker):
+                    self._replace(worker, graceful=True)
+            _resolve(future, ok, payload)  # type: ignore
+
+        for conn, worker in list(busy.items()):
+            error = self._check_limits(worker)
+            if error is not None:
+                del busy[conn]
+                future = worker.future
+                self._replace(worker)
+                _resolve(future, False, error)  # type: ignore
+
+    def _replace(self, worker: "_Worker", graceful: bool = False) -> None:
+        if graceful:
+            worker.stop()
+        else:
+            worker.kill()
+        self._workers[self._workers.index(worker)] = _Worker(self._context)
+
+    def _check_limits(self, worker: "_Worker") -> Optional[Error]:
+        if self._timeout is not None:
+            if time.monotonic() - worker.started > self._timeout:
+                return LimitExceededError(f"Timeout of {self._timeout}s exceeded")
+        if self._over_rss(worker):
+            return LimitExceededError(f"RSS cap of {self._max_rss} bytes exceeded")
+        return None
+
+    def _over_rss(self, worker: "_Worker") -> bool:
+        return self._max_rss is not None and _rss(worker.process.pid) > self._max_rss
+
+
+class _Worker:
+    """A worker process and the pipe used to talk to it."""
+
+    __slots__ = ("process", "conn", "future", "started", "tasks")
+
+    process: BaseProcess
+    conn: Connection
+    future: Optional[Future]
+    started: float
+    tasks: int
+
+    def __init__(self, context: BaseContext) -> None:
+        self.conn, child_conn = context.Pipe()
+        # Process is set on each concrete context, not typed on BaseContext:
+        self.process = context.Process(  # type: ignore
+            target=_worker_main, args=(child_conn,), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.future = None
+        self.started = 0.0
+        self.tasks = 0
+
+    def submit(self, future: Future, func: Callable[..., Any], args: Tuple) -> None:
+        self.future = future
+        self.started = time.monotonic()
+        self.tasks += 1
+        self.conn.send((func, args))
+
+    def receive(self) -> Tuple[bool, Any]:
+        self.future = None
+        return self.conn.recv()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+def _resolve(future: Future, ok: bool, payload: object) -> None:
+    if ok:
+        future.set_result(payload)
+    else:
+        future.set_exception(cast(BaseException, payload))
+
+
+def _worker_main(conn: Connection) -> None:
+    """Runs tasks received on conn until told to stop."""
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            break
+        if task is None:
+            break
+        func, args = task
+        try:
+            result: Tuple[bool, Any] = (True, func(*args))
+        except Exception as e:
+            result = (False, e)
+        try:
+            conn.send(result)
+        except Exception as e:
+            # The result (or exception) could not be pickled:
+            conn.send((False, WorkerLostError(f"{type(e).__name__}: {e}")))
+
+
+def _rss(pid: Optional[int]) -> int:
+    """Returns the resident set size of process pid in bytes, 0 if unknown."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class WorkerLostError(Error):
+    """A worker process died or could not return its result.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message: str) -> None:
+        """Inits an object with default values."""
+        super().__init__(message)
+        self.message = message
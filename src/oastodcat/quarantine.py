@@ -0,0 +1,261 @@
+"""quarantine module for keeping the specifications that failed to convert.
+
+A :class:`Quarantine` is a directory holding, for each specification that
+failed in a batch, a copy of its input and a failure record in JSON: the
+url, the phase that failed, the error class and message, the time spent
+and the number of attempts. Pass it to
+:func:`~oastodcat.batch.convert_many` to quarantine the failures of a run,
+and retry only those later with :func:`~oastodcat.batch.retry_quarantined`.
+A specification that converts on retry is released from the quarantine.
+
+Example:
+    >>> from oastodcat.batch import convert_many, retry_quarantined
+    >>> from oastodcat.quarantine import Quarantine
+    >>>
+    >>> quarantine = Quarantine("quarantine")
+    >>> convert_many(specs, "http://example.com/dataservices/{id}",
+    >>>              quarantine=quarantine)
+    >>> for record in quarantine.records():
+    >>>     print(record.url, record.phase, record.error, record.message)
+    >>>
+    >>> # Once the provider has fixed its specifications:
+    >>> retry_quarantined(quarantine, "http://example.com/dataservices/{id}")
+"""
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .oas_dataservice import create_id
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+PHASES = ("load", "convert", "worker", "register")
+
+
+class FailureRecord:
+    """The record of a specification that failed to convert.
+
+    Attributes:
+        url (str): the url of the openAPI specification
+        phase (str): the phase that failed, "load" when parsing the text,
+            "convert" when converting it, "worker" when its pool task
+            timed out, exceeded the memory cap or lost its worker,
+            "register" when an identifier was refused by the registry
+        error (str): the class name of the error raised
+        message (str): the error message
+        elapsed (Optional[float]): seconds spent on the specification,
+            None if the failure was in the worker
+        attempts (int): the number of runs it failed in
+        failed_at (float): the time of the last failure, in seconds since
+            the epoch
+    """
+
+    __slots__ = (
+        "url",
+        "phase",
+        "error",
+        "message",
+        "elapsed",
+        "attempts",
+        "failed_at",
+    )
+
+    url: str
+    phase: str
+    error: str
+    message: str
+    elapsed: Optional[float]
+    attempts: int
+    failed_at: float
+
+    def __init__(
+        self,
+        url: str,
+        phase: str,
+        error: str,
+        message: str,
+        elapsed: Optional[float] = None,
+        attempts: int = 1,
+        failed_at: Optional[float] = None,
+    ) -> None:
+        """Inits an object with default values."""
+        self.url = url
+        self.phase = phase
+        self.error = error
+        self.message = message
+        self.elapsed = elapsed
+        self.attempts = attempts
+        self.failed_at = time.time() if failed_at is None else failed_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the record as a JSON-serializable dict.
+
+        Returns:
+            the attributes by name
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Quarantine:
+    """A directory of specifications that failed to convert.
+
+    Each specification is kept as two files named by a hash of its url:
+    the input as given, in <hash>.spec.json for a dict or <hash>.spec.txt
+    for text, and its failure record, in <hash>.record.json.
+
+    Attributes:
+        directory (Path): the quarantine directory
+    """
+
+    __slots__ = ("_directory",)
+
+    _directory: Path
+
+    def __init__(self, directory: PathLike) -> None:
+        """Inits an object, creating the directory if needed.
+
+        Args:
+            directory (PathLike): the quarantine directory
+        """
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def directory(self) -> Path:
+        """Get for directory."""
+        return self._directory
+
+    def add(
+        self,
+        url: str,
+        specification: Union[dict, str, bytes],
+        error: BaseException,
+        phase: str,
+        elapsed: Optional[float] = None,
+    ) -> FailureRecord:
+        """Quarantines a specification, or records another failure of it.
+
+        Args:
+            url (str): the url of the openAPI specification
+            specification (Union[dict, str, bytes]): the input as given
+            error (BaseException): the error raised
+            phase (str): the phase that failed, one of PHASES
+            elapsed (Optional[float]): seconds spent on the specification
+
+        Returns:
+            the failure record written
+
+        Raises:
+            ValueError: phase is not one of PHASES
+        """
+        if phase not in PHASES:
+            raise ValueError(f"Unknown phase {phase}")
+        previous = self.record(url)
+        record = FailureRecord(
+            url,
+            phase,
+            type(error).__name__,
+            str(error),
+            elapsed,
+            attempts=previous.attempts + 1 if previous else 1,
+        )
+        name = create_id(url)
+        if isinstance(specification, dict):
+            data = json.dumps(specification, default=str).encode("utf-8")
+            self._remove(name + ".spec.txt")
+            self._write(name + ".spec.json", data)
+        else:
+            if isinstance(specification, str):
+                specification = specification.encode("utf-8")
+            self._remove(name + ".spec.json")
+            self._write(name + ".spec.txt", specification)
+        data = json.dumps(record.to_dict()).encode("utf-8")
+        self._write(name + ".record.json", data)
+        return record
+
+    def release(self, url: str) -> bool:
+        """Removes a specification from the quarantine.
+
+        Args:
+            url (str): the url of the openAPI specification
+
+        Returns:
+            True if it was quarantined
+        """
+        name = create_id(url)
+        self._remove(name + ".spec.json")
+        self._remove(name + ".spec.txt")
+        return self._remove(name + ".record.json")
+
+    def record(self, url: str) -> Optional[FailureRecord]:
+        """Returns the failure record of a specification.
+
+        Args:
+            url (str): the url of the openAPI specification
+
+        Returns:
+            the record, None if the specification is not quarantined
+        """
+        return self._read_record(self._directory / (create_id(url) + ".record.json"))
+
+    def records(self) -> List[FailureRecord]:
+        """Returns the failure records, ordered by url.
+
+        Returns:
+            the records of all quarantined specifications
+        """
+        records = [
+            self._read_record(path) for path in self._directory.glob("*.record.json")
+        ]
+        return sorted(
+            (record for record in records if record is not None),
+            key=lambda record: record.url,
+        )
+
+    def items(self) -> List[Tuple[str, Union[dict, str, bytes]]]:
+        """Returns the quarantined specifications, ordered by url.
+
+        Returns:
+            (url, specification) pairs, the specification as it was given,
+            except that text is returned as bytes
+        """
+        items: List[Tuple[str, Union[dict, str, bytes]]] = []
+        for record in self.records():
+            path = self._directory / (create_id(record.url) + ".spec.json")
+            if path.exists():
+                items.append((record.url, json.loads(path.read_bytes())))
+            else:
+                items.append((record.url, path.with_suffix(".txt").read_bytes()))
+        return items
+
+    def __contains__(self, url: object) -> bool:
+        """Returns True if the specification with url is quarantined."""
+        return isinstance(url, str) and self.record(url) is not None
+
+    def __len__(self) -> int:
+        """Returns the number of quarantined specifications."""
+        return sum(1 for _ in self._directory.glob("*.record.json"))
+
+    # --
+    def _read_record(self, path: Path) -> Optional[FailureRecord]:
+        """Reads a failure record, None if there is none."""
+        try:
+            return FailureRecord(**json.loads(path.read_bytes()))
+        except FileNotFoundError:
+            return None
+
+    def _write(self, name: str, data: bytes) -> None:
+        """Writes a file atomically."""
+        tmp = self._directory / (name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, self._directory / name)
+
+    def _remove(self, name: str) -> bool:
+        """Removes a file, returns False if there was none."""
+        try:
+            (self._directory / name).unlink()
+        except FileNotFoundError:
+            return False
+        return True
@@ -0,0 +1,290 @@
+"""registry module for detecting identifier collisions across a catalog.
+
+The identifier of a dataservice is derived from its title and endpoint
+url only, so two different specifications with the same title and no
+servers get the same identifier. An :class:`IdentifierRegistry` records,
+in a small sqlite database, which (specification url, server url) each
+identifier was first given to. Registering an identifier that belongs to
+another source is a collision: it is reported, and the identifier is kept,
+renamed or refused, depending on the strategy:
+
+    "keep"
+        keep the identifier and only report the collision
+    "hash"
+        append a short hash of the specification and server url, so the
+        new identifier does not depend on the order specifications come in
+    "suffix"
+        append "-2", "-3", ... up to the first free identifier
+    "raise"
+        raise an IdentifierCollisionError
+
+Example:
+    >>> from oastodcat.batch import convert_many
+    >>> from oastodcat.registry import IdentifierRegistry
+    >>>
+    >>> with IdentifierRegistry("identifiers.sqlite", "hash") as registry:
+    >>>     convert_many(specs, "http://example.com/dataservices/{id}",
+    >>>                  registry=registry)
+    >>>     for collision in registry.collisions:
+    >>>         print(collision.url, collision.existing_url)
+"""
+import hashlib
+import os
+import sqlite3
+from typing import Any, List, Optional, Tuple, Union
+
+from datacatalogtordf import DataService, URI
+
+from .oas_dataservice import Error
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+STRATEGIES = ("keep", "hash", "suffix", "raise")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS identifiers (
+    key BLOB PRIMARY KEY,
+    url TEXT NOT NULL,
+    server_url TEXT
+) WITHOUT ROWID;
+"""
+
+
+class Collision:
+    """An identifier registered for a second source.
+
+    Attributes:
+        identifier (str): the identifier that collided
+        url (str): the url of the specification registering it
+        server_url (Optional[str]): the server url registering it
+        existing_url (str): the url of the specification it belongs to
+        existing_server_url (Optional[str]): the server url it belongs to
+        renamed_to (str): the identifier given instead, same as identifier
+            with the "keep" strategy
+    """
+
+    __slots__ = (
+        "identifier",
+        "url",
+        "server_url",
+        "existing_url",
+        "existing_server_url",
+        "renamed_to",
+    )
+
+    identifier: str
+    url: str
+    server_url: Optional[str]
+    existing_url: str
+    existing_server_url: Optional[str]
+    renamed_to: str
+
+    def __init__(
+        self,
+        identifier: str,
+        url: str,
+        server_url: Optional[str],
+        existing: Tuple[str, Optional[str]],
+    ) -> None:
+        """Inits an object with default values."""
+        self.identifier = identifier
+        self.url = url
+        self.server_url = server_url
+        self.existing_url, self.existing_server_url = existing
+        self.renamed_to = identifier
+
+
+class IdentifierRegistry:
+    """A persistent map of identifiers to the sources they were given to.
+
+    Identifiers are stored as 16 byte hashes, and each registration is a
+    single primary key lookup, so the registry stays small and fast with
+    millions of entries. Registrations are committed on commit and close.
+
+    Attributes:
+        path (PathLike): the path of the sqlite database
+        on_collision (str): the collision strategy
+        collisions (List[Collision]): the collisions found since opening
+    """
+
+    __slots__ = ("_path", "_on_collision", "_connection", "_collisions")
+
+    _path: PathLike
+    _on_collision: str
+    _connection: sqlite3.Connection
+    _collisions: List[Collision]
+
+    def __init__(self, path: PathLike = ":memory:", on_collision: str = "keep") -> None:
+        """Opens the registry, creating it if needed.
+
+        Args:
+            path (PathLike): the path of the sqlite database
+            on_collision (str): "keep", "hash", "suffix" or "raise"
+
+        Raises:
+            ValueError: on_collision is not a known strategy
+        """
+        if on_collision not in STRATEGIES:
+            raise ValueError(f"Unknown collision strategy {on_collision}")
+        self._path = path
+        self._on_collision = on_collision
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._collisions = []
+
+    @property
+    def path(self) -> PathLike:
+        """Get for path."""
+        return self._path
+
+    @property
+    def on_collision(self) -> str:
+        """Get for on_collision."""
+        return self._on_collision
+
+    @property
+    def collisions(self) -> List[Collision]:
+        """Get for collisions."""
+        return self._collisions
+
+    def register(
+        self, identifier: str, url: str, server_url: Optional[str] = None
+    ) -> str:
+        """Registers an identifier for a source.
+
+        Registering an identifier again for the same source is not a
+        collision, so a registry can be reused across runs.
+
+        Args:
+            identifier (str): the identifier of the dataservice
+            url (str): the url of the openAPI specification
+            server_url (Optional[str]): the endpoint url of the dataservice
+
+        Returns:
+            the identifier to use, renamed if it collided
+
+        Raises:
+            IdentifierCollisionError: it collided and on_collision is "raise"
+        """
+        existing = self._claim(identifier, url, server_url)
+        if existing is None or existing == (url, server_url):
+            return identifier
+
+        collision = Collision(identifier, url, server_url, existing)
+        if self._on_collision == "raise":
+            raise IdentifierCollisionError(
+                f"Identifier {identifier} of {url} already given to {existing[0]}"
+            )
+        if self._on_collision == "hash":
+            source = url if server_url is None else f"{url}\n{server_url}"
+            collision.renamed_to = self._rename(
+                f"{identifier}-{_key(source).hex()[:8]}", url, server_url
+            )
+        elif self._on_collision == "suffix":
+            collision.renamed_to = self._rename(identifier, url, server_url, 2)
+        self._collisions.append(collision)
+        return collision.renamed_to
+
+    def register_dataservice(self, dataservice: DataService, url: str) -> None:
+        """Registers the identifier of a dataservice, renaming it if needed.
+
+        Args:
+            dataservice (DataService): the dataservice
+            url (str): the url of the openAPI specification
+        """
+        endpoint_urls = getattr(dataservice, "endpoint_urls", None) or [
+            getattr(dataservice, "endpointURL", None)
+        ]
+        identifier = self.register(str(dataservice.identifier), url, endpoint_urls[0])
+        if identifier != dataservice.identifier:
+            dataservice.identifier = URI(identifier)
+
+    def lookup(self, identifier: str) -> Optional[Tuple[str, Optional[str]]]:
+        """Looks up the source an identifier was given to.
+
+        Args:
+            identifier (str): the identifier of the dataservice
+
+        Returns:
+            (url, server_url) of the source, None if not registered
+        """
+        row = self._connection.execute(
+            "SELECT url, server_url FROM identifiers WHERE key = ?",
+            (_key(identifier),),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def commit(self) -> None:
+        """Writes the registrations to disk."""
+        self._connection.commit()
+
+    def __contains__(self, identifier: object) -> bool:
+        """Returns True if the identifier is registered."""
+        return isinstance(identifier, str) and self.lookup(identifier) is not None
+
+    def __len__(self) -> int:
+        """Returns the number of identifiers registered."""
+        return self._connection.execute("SELECT COUNT(*) FROM identifiers").fetchone()[
+            0
+        ]
+
+    def close(self) -> None:
+        """Commits and closes the database."""
+        self._connection.commit()
+        self._connection.close()
+
+    def __enter__(self) -> "IdentifierRegistry":
+        """Enters the runtime context."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Exits the runtime context, committing and closing the database."""
+        self.close()
+
+    # --
+    def _claim(
+        self, identifier: str, url: str, server_url: Optional[str]
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """Registers identifier if free, else returns the source it has."""
+        key = _key(identifier)
+        cursor = self._connection.execute(
+            "INSERT OR IGNORE INTO identifiers VALUES (?, ?, ?)",
+            (key, url, server_url),
+        )
+        if cursor.rowcount:
+            return None
+        row = self._connection.execute(
+            "SELECT url, server_url FROM identifiers WHERE key = ?", (key,)
+        ).fetchone()
+        return (row[0], row[1])
+
+    def _rename(
+        self, identifier: str, url: str, server_url: Optional[str], n: int = 0
+    ) -> str:
+        """Returns the first free identifier, appending -n, -n+1, ... if n."""
+        while True:
+            candidate = f"{identifier}-{n}" if n else identifier
+            existing = self._claim(candidate, url, server_url)
+            if existing is None or existing == (url, server_url):
+                return candidate
+            n = max(n, 1) + 1
+
+
+def _key(s: str) -> bytes:
+    """Returns the 16 byte hash an identifier is stored by."""
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=16).digest()
+
+
+class IdentifierCollisionError(Error):
+    """An identifier was already given to another source.
+
+    Attributes:
+        message -- explanation of the error
+    """
+
+    def __init__(self, message: str) -> None:
+        """Inits an object with default values."""
+        super().__init__(message)
+        self.message = message
@@ -0,0 +1,296 @@
+"""server module for running the conversion as a local HTTP service.
+
+The service keeps a pre-warmed :class:`~oastodcat.pool.ConversionPool`, so
+clients do not pay the import and warm-up cost of rdflib for every call.
+
+Endpoints:
+    POST /convert?url=<spec url>&identifier=<template>[&format=turtle|nt]
+        The body is the openAPI specification as YAML or JSON. The response
+        is the dataservices as Turtle, or as canonical N-Triples.
+    GET /metrics
+        Request counters and latency histograms in the Prometheus text
+        format.
+
+A request is rejected with 503 when max_pending requests are already
+queued or running, and with 413 when its body is larger than max_body. A
+specification that fails to convert gets 400, or 422 when it exceeds a
+limit, and an error of the service itself gets 500.
+
+Example:
+    >>> from oastodcat.server import ConversionServer
+    >>>
+    >>> server = ConversionServer(("127.0.0.1", 8080), max_workers=4)
+    >>> server.serve_forever()
+
+Or from the command line::
+
+    % python -m oastodcat.server --port 8080 --workers 4
+"""
+import argparse
+import bisect
+from concurrent.futures import CancelledError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from rdflib import Graph
+
+from .batch import convert, Specification
+from .canonical import to_canonical_ntriples
+from .oas_dataservice import LimitExceededError
+from .pool import ConversionPool, WorkerLostError
+
+FORMATS = {"turtle": "text/turtle", "nt": "application/n-triples"}
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def convert_to_rdf(
+    url: str, specification: Specification, identifier: str, format: str = "turtle"
+) -> str:
+    """Converts a specification and serializes its dataservices.
+
+    Args:
+        url (str): the url of the openAPI specification
+        specification (Specification): a dict, or YAML/JSON as str or bytes
+        identifier (str): the identifier template, containing {id}
+        format (str): "turtle", or "nt" for canonical N-Triples
+
+    Returns:
+        the serialization as a str
+    """
+    graph = Graph()
+    for dataservice in convert(url, specification, identifier):
+        graph += dataservice._to_graph()
+    if format == "nt":
+        return to_canonical_ntriples(graph)
+    rdf = graph.serialize(format="turtle")
+    return rdf.decode("utf-8") if isinstance(rdf, bytes) else rdf
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """A threading HTTP server converting specifications in a worker pool.
+
+    Attributes:
+        pool (ConversionPool): the pool conversions run in
+        metrics (Metrics): the request metrics
+        max_pending (int): max number of requests queued or running
+        max_body (int): max request body size in bytes
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+        max_body: int = 16 * 1024**2,
+        timeout: Optional[float] = 60,
+        pool: Optional[ConversionPool] = None,
+    ) -> None:
+        """Inits the server and pre-warms the pool.
+
+        Args:
+            server_address (Tuple[str, int]): the (host, port) to bind to
+            max_workers (Optional[int]): number of workers, defaults to cpu count
+            max_pending (int): max number of requests queued or running
+            max_body (int): max request body size in bytes
+            timeout (Optional[float]): max wall-clock seconds per conversion
+            pool (Optional[ConversionPool]): a pool to use instead of a new one
+        """
+        super().__init__(server_address, _Handler)
+        self.pool = pool or ConversionPool(max_workers, timeout=timeout)
+        self.pool.start()
+        self.metrics = Metrics()
+        self.max_pending = max_pending
+        self.max_body = max_body
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def server_close(self) -> None:
+        """Closes the socket and stops the pool."""
+        super().server_close()
+        self.pool.close()
+
+
+class Metrics:
+    """Request counters and latency histograms, safe to update from threads."""
+
+    __slots__ = ("_lock", "_requests", "_latencies")
+
+    _requests: Dict[Tuple[str, int], int]
+    _latencies: Dict[str, List[float]]
+
+    def __init__(self) -> None:
+        """Inits an object with default values."""
+        self._lock = threading.Lock()
+        self._requests = {}
+        # Per endpoint: one count per bucket, then +Inf count and sum:
+        self._latencies = {}
+
+    def observe(self, endpoint: str, status: int, seconds: float) -> None:
+        """Records a request.
+
+        Args:
+            endpoint (str): the path of the request
+            status (int): the response status code
+            seconds (float): the time spent handling the request
+        """
+        with self._lock:
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            counts = self._latencies.setdefault(endpoint, [0.0] * (len(BUCKETS) + 2))
+            counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+            counts[-1] += seconds
+
+    def render(self) -> str:
+        """Renders the metrics in the Prometheus text format.
+
+        Returns:
+            the metrics as a str
+        """
+        lines = ["# TYPE oastodcat_requests_total counter"]
+        with self._lock:
+            for (endpoint, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f'oastodcat_requests_total{{endpoint="{endpoint}",'
+                    f'status="{status}"}} {count}'
+                )
+            lines.append("# TYPE oastodcat_request_seconds histogram")
+            for endpoint, counts in sorted(self._latencies.items()):
+                cumulative = 0.0
+                for bound, observed in zip((*BUCKETS, "+Inf"), counts):
+                    cumulative += observed
+                    lines.append(
+                        f'oastodcat_request_seconds_bucket{{endpoint="{endpoint}",'
+                        f'le="{bound}"}} {cumulative:.0f}'
+                    )
+                lines.append(
+                    f'oastodcat_request_seconds_sum{{endpoint="{endpoint}"}} '
+                    f"{counts[-1]:.6f}"
+                )
+                lines.append(
+                    f'oastodcat_request_seconds_count{{endpoint="{endpoint}"}} '
+                    f"{cumulative:.0f}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handles requests to a ConversionServer."""
+
+    server: ConversionServer
+
+    def do_GET(self) -> None:  # noqa: N802
+        if urlparse(self.path).path == "/metrics":
+            self._respond(HTTPStatus.OK, self.server.metrics.render(), "text/plain")
+        else:
+            self._respond(HTTPStatus.NOT_FOUND, "Not found\n")
+
+    def do_POST(self) -> None:  # noqa: N802
+        start = time.perf_counter()
+        status, body = HTTPStatus.INTERNAL_SERVER_ERROR, "Internal server error\n"
+        content_type = "text/plain"
+        try:
+            status, body, content_type = self._convert()
+        except Exception as e:
+            body = f"{type(e).__name__}: {e}\n"
+        finally:
+            # Before the response is sent, so a client reading /metrics right
+            # after it finds its request counted:
+            self.server.metrics.observe(
+                "/convert", int(status), time.perf_counter() - start
+            )
+        self._respond(status, body, content_type)
+
+    def _convert(self) -> Tuple[HTTPStatus, str, str]:
+        parsed = urlparse(self.path)
+        if parsed.path != "/convert":
+            return HTTPStatus.NOT_FOUND, "Not found\n", "text/plain"
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        if "url" not in query or "identifier" not in query:
+            return HTTPStatus.BAD_REQUEST, "url and identifier needed\n", "text/plain"
+        format = query.get("format", "turtle")
+        if format not in FORMATS:
+            return HTTPStatus.BAD_REQUEST, f"Unknown format {format}\n", "text/plain"
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            return HTTPStatus.BAD_REQUEST, "Invalid Content-Length\n", "text/plain"
+        if length > self.server.max_body:
+            self.close_connection = True
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Too large\n", "text/plain"
+        return self._run(query, self.rfile.read(length), format)
+
+    def _run(
+        self, query: Dict[str, str], body: bytes, format: str
+    ) -> Tuple[HTTPStatus, str, str]:
+        if not self.server._pending.acquire(blocking=False):
+            return HTTPStatus.SERVICE_UNAVAILABLE, "Queue is full\n", "text/plain"
+        try:
+            future = self.server.pool.submit(
+                convert_to_rdf, query["url"], body, query["identifier"], format
+            )
+            rdf = future.result()
+        except LimitExceededError as e:
+            return HTTPStatus.UNPROCESSABLE_ENTITY, f"{e}\n", "text/plain"
+        except (WorkerLostError, CancelledError) as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, f"{e}\n", "text/plain"
+        except Exception as e:
+            # Raised by the conversion, so caused by the specification:
+            message = f"{type(e).__name__}: {e}\n"
+            return HTTPStatus.BAD_REQUEST, message, "text/plain"
+        finally:
+            self.server._pending.release()
+        return HTTPStatus.OK, rdf, FORMATS[format]
+
+    def _respond(
+        self, status: HTTPStatus, body: str, content_type: str = "text/plain"
+    ) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Runs the server until interrupted.
+
+    Args:
+        argv (Optional[Sequence[str]]): the command line arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=64)
+    parser.add_argument("--max-body", type=int, default=16 * 1024**2)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args(argv)
+    server = ConversionServer(
+        (args.host, args.port),
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+        max_body=args.max_body,
+        timeout=args.timeout,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
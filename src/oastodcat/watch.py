@@ -0,0 +1,349 @@
+"""watch module for keeping a catalog in step with a directory of specs.
+
+A :class:`CatalogWatcher` polls a directory of openAPI specifications and
+re-converts only the files whose content changed. A file is converted once
+it has not changed for debounce seconds, so an editor saving in several
+writes triggers one conversion. The dataservices of each file are kept as
+canonical N-Triples, and the output file is rewritten from those chunks,
+so a change to one file costs one conversion and one write.
+
+A file that fails to convert keeps its last good dataservices in the
+catalog, and its error is reported in errors until it is fixed.
+
+Example:
+    >>> from oastodcat.watch import CatalogWatcher
+    >>>
+    >>> watcher = CatalogWatcher(
+    >>>     "specs", "http://example.com/dataservices/{id}", "catalog.nt"
+    >>> )
+    >>> watcher.run()
+
+Or from the command line::
+
+    % python -m oastodcat.watch specs catalog.nt --identifier <template>
+"""
+import argparse
+import copy
+import fnmatch
+import os
+from pathlib import Path
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from datacatalogtordf import Catalog, DataService
+from rdflib import Graph
+
+from .batch import convert, specification_digest
+from .canonical import to_canonical_ntriples
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+PATTERNS = ("*.yaml", "*.yml", "*.json")
+DCAT_SERVICE = "http://www.w3.org/ns/dcat#service"
+
+
+class CatalogWatcher:
+    """Converts the specifications in a directory, and keeps them converted.
+
+    Attributes:
+        directory (Path): the directory of specifications
+        output (Path): the N-Triples file written
+        catalog (Catalog): the catalog, with the dataservices of all files
+        errors (Dict[str, Exception]): the error of each file that failed
+            its last conversion, by path
+    """
+
+    __slots__ = (
+        "_directory",
+        "_identifier",
+        "_output",
+        "_catalog",
+        "_match",
+        "_poll_interval",
+        "_debounce",
+        "_base_url",
+        "_options",
+        "_stats",
+        "_pending",
+        "_digests",
+        "_dataservices",
+        "_chunks",
+        "_errors",
+        "_scanned",
+    )
+
+    _directory: Path
+    _identifier: str
+    _output: Path
+    _catalog: Catalog
+    _match: Callable[[str], Any]
+    _poll_interval: float
+    _debounce: float
+    _base_url: Optional[str]
+    _options: Dict[str, Any]
+    # Per path: last (mtime, size) seen, and since when, if not converted:
+    _stats: Dict[str, Tuple[int, int]]
+    _pending: Dict[str, float]
+    _digests: Dict[str, str]
+    _dataservices: Dict[str, List[DataService]]
+    _chunks: Dict[str, str]
+    _errors: Dict[str, Exception]
+    _scanned: bool
+
+    def __init__(
+        self,
+        directory: PathLike,
+        identifier: str,
+        output: PathLike,
+        catalog: Optional[Catalog] = None,
+        patterns: Sequence[str] = PATTERNS,
+        poll_interval: float = 0.02,
+        debounce: float = 0.05,
+        base_url: Optional[str] = None,
+        **options: Any,
+    ) -> None:
+        """Inits the watcher. No file is read until the first scan.
+
+        Args:
+            directory (PathLike): the directory of specifications
+            identifier (str): the identifier template, containing {id}
+            output (PathLike): the N-Triples file to write
+            catalog (Optional[Catalog]): the catalog the dataservices are
+                added to, by default one identified by the directory's url
+            patterns (Sequence[str]): glob patterns of specification files
+            poll_interval (float): seconds between scans of the directory
+            debounce (float): seconds a file must be unchanged before it is
+                converted
+            base_url (Optional[str]): url the relative paths of the files
+                are appended to, to give their urls. Defaults to file urls
+            options (Any): keyword arguments passed on to OASDataService
+        """
+        self._directory = Path(directory)
+        self._identifier = identifier
+        self._output = Path(output)
+        if catalog is None:
+            catalog = Catalog()
+            catalog.identifier = self._directory.resolve().as_uri()
+        self._catalog = catalog
+        self._match = re.compile(
+            "|".join(fnmatch.translate(pattern) for pattern in patterns)
+        ).match
+        self._poll_interval = poll_interval
+        self._debounce = debounce
+        self._base_url = base_url
+        self._options = options
+        self._stats = {}
+        self._pending = {}
+        self._digests = {}
+        self._dataservices = {}
+        self._chunks = {}
+        self._errors = {}
+        self._scanned = False
+
+    @property
+    def directory(self) -> Path:
+        """Get for directory."""
+        return self._directory
+
+    @property
+    def output(self) -> Path:
+        """Get for output."""
+        return self._output
+
+    @property
+    def catalog(self) -> Catalog:
+        """Get for catalog."""
+        return self._catalog
+
+    @property
+    def errors(self) -> Dict[str, Exception]:
+        """Get for errors."""
+        return self._errors
+
+    def scan(self, now: Optional[float] = None) -> List[str]:
+        """Scans the directory once, converting the files that are ready.
+
+        On the first scan every file is converted without waiting.
+
+        Args:
+            now (Optional[float]): the monotonic time of the scan
+
+        Returns:
+            the paths whose dataservices changed, sorted
+        """
+        now = time.monotonic() if now is None else now
+        first = not self._scanned
+        self._scanned = True
+        stats = self._stat_files()
+        for path, stat in stats.items():
+            if self._stats.get(path) != stat:
+                self._pending[path] = now
+        removed = [path for path in self._stats if path not in stats]
+        self._stats = stats
+
+        changed = []
+        for path in removed:
+            self._pending.pop(path, None)
+            self._errors.pop(path, None)
+            self._digests.pop(path, None)
+            if self._chunks.pop(path, None) is not None:
+                del self._dataservices[path]
+                changed.append(path)
+        return self._settle(now, first, changed)
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Scans the directory every poll_interval seconds until stopped.
+
+        Files found changed are converted as soon as their debounce time
+        is up, without waiting for the next scan.
+
+        Args:
+            stop (Optional[threading.Event]): set to stop watching
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.scan()
+            deadline = time.monotonic() + self._poll_interval
+            while self._pending:
+                ready = min(self._pending.values()) + self._debounce
+                if ready >= deadline or stop.wait(max(ready - time.monotonic(), 0)):
+                    break
+                self._settle(time.monotonic())
+            stop.wait(max(deadline - time.monotonic(), 0))
+
+    # --
+    def _settle(
+        self, now: float, first: bool = False, changed: Optional[List[str]] = None
+    ) -> List[str]:
+        """Converts the pending files that have not changed for debounce."""
+        changed = changed or []
+        for path, since in list(self._pending.items()):
+            if not first and now - since < self._debounce:
+                continue
+            stat = _stat(path)
+            if stat != self._stats[path] and not first:
+                # Written again since the scan: wait some more.
+                if stat is not None:
+                    self._stats[path] = stat
+                    self._pending[path] = now
+                continue
+            del self._pending[path]
+            if self._convert(path):
+                changed.append(path)
+        if changed or first:
+            self._write()
+        return sorted(changed)
+
+    def _stat_files(self) -> Dict[str, Tuple[int, int]]:
+        """Returns (mtime, size) of the specification files, by path."""
+        stats = {}
+        directories = [str(self._directory)]
+        while directories:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir():
+                        directories.append(entry.path)
+                    elif self._match(entry.name):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:  # pragma: no cover
+                            continue
+                        stats[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def _convert(self, path: str) -> bool:
+        """Converts a file if its content changed. Returns True if it did."""
+        try:
+            specification = Path(path).read_bytes()
+        except FileNotFoundError:  # pragma: no cover
+            return False
+        digest = specification_digest(specification)
+        if self._digests.get(path) == digest:
+            return False
+        self._digests[path] = digest
+        try:
+            dataservices = convert(
+                self._url(path), specification, self._identifier, **self._options
+            )
+        except Exception as e:
+            self._errors[path] = e
+            return False
+        self._errors.pop(path, None)
+
+        graph = Graph()
+        lines = []
+        for dataservice in dataservices:
+            graph += dataservice._to_graph()
+            lines.append(
+                f"<{self._catalog.identifier}> <{DCAT_SERVICE}> "
+                f"<{dataservice.identifier}> .\n"
+            )
+        self._dataservices[path] = dataservices
+        self._chunks[path] = "".join(lines) + to_canonical_ntriples(graph)
+        return True
+
+    def _url(self, path: str) -> str:
+        """Returns the url of a specification file."""
+        if self._base_url is None:
+            return Path(path).resolve().as_uri()
+        relative = Path(path).relative_to(self._directory).as_posix()
+        return self._base_url.rstrip("/") + "/" + relative
+
+    def _write(self) -> None:
+        """Updates the catalog and rewrites the output from the chunks."""
+        paths = sorted(self._chunks)
+        self._catalog.services = [
+            dataservice for path in paths for dataservice in self._dataservices[path]
+        ]
+        header = copy.copy(self._catalog)
+        header.services = []
+        tmp = self._output.with_name(self._output.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            f.write(to_canonical_ntriples(header))
+            f.writelines(self._chunks[path] for path in paths)
+        os.replace(tmp, self._output)
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    """Returns (mtime, size) of a file, None if it is gone."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Watches a directory until interrupted.
+
+    Args:
+        argv (Optional[Sequence[str]]): the command line arguments
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory")
+    parser.add_argument("output")
+    parser.add_argument("--identifier", required=True)
+    parser.add_argument("--base-url", default=None)
+    parser.add_argument("--poll-interval", type=float, default=0.02)
+    parser.add_argument("--debounce", type=float, default=0.05)
+    args = parser.parse_args(argv)
+    watcher = CatalogWatcher(
+        args.directory,
+        args.identifier,
+        args.output,
+        poll_interval=args.poll_interval,
+        debounce=args.debounce,
+        base_url=args.base_url,
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
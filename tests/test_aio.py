@@ -0,0 +1,113 @@
+"""Test cases for the aio module."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import List
+
+import pytest
+
+from oastodcat import NotValidOASError
+from oastodcat.aio import aconvert, aconvert_many
+from oastodcat.batch import BatchResult, convert
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+@pytest.fixture(scope="session")
+def minimal_spec() -> str:
+    """Helper for creating a minimal specification object."""
+    _minimal_spec = """
+                    openapi: 3.0.3
+                    info:
+                      title: Swagger Petstore
+                      version: 1.0.0
+                    paths: {}
+                    """
+    return _minimal_spec
+
+
+def _large_spec(paths: int) -> dict:
+    """Helper for creating a specification with many paths and servers."""
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Large", "version": "1.0.0"},
+        "servers": [{"url": f"http://example.com/{i}"} for i in range(5)],
+        "paths": {
+            f"/items/{i}": {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "description": "OK",
+                            "content": {"application/json": {"schema": {}}},
+                        }
+                    }
+                }
+            }
+            for i in range(paths)
+        },
+    }
+
+
+def test_aconvert(minimal_spec: str) -> None:
+    """It returns the dataservices."""
+    dataservices = asyncio.run(
+        aconvert("http://example.com/specifications/1", minimal_spec, IDENTIFIER)
+    )
+    assert len(dataservices) == 1
+
+
+def test_aconvert_many_streams_results(minimal_spec: str) -> None:
+    """It yields one result per item, including failures."""
+    items = [(f"http://example.com/specifications/{i}", minimal_spec) for i in range(5)]
+    items.append(("http://example.com/specifications/bad", "{}"))
+
+    async def collect() -> List[BatchResult]:
+        with ThreadPoolExecutor(2) as executor:
+            return [
+                result async for result in aconvert_many(items, IDENTIFIER, executor, 2)
+            ]
+
+    results = asyncio.run(collect())
+    assert sorted(result.url for result in results) == sorted(url for url, _ in items)
+    errors = [result for result in results if result.error is not None]
+    assert [result.url for result in errors] == [
+        "http://example.com/specifications/bad"
+    ]
+    assert isinstance(errors[0].error, NotValidOASError)
+
+
+def test_aconvert_many_cancels_pending(minimal_spec: str) -> None:
+    """It cancels conversions in flight when the consumer stops."""
+    items = [(f"http://example.com/specifications/{i}", minimal_spec) for i in range(9)]
+
+    async def first() -> BatchResult:
+        results = aconvert_many(items, IDENTIFIER, concurrency=3)
+        async for result in results:
+            await results.aclose()  # type: ignore
+            return result
+        raise AssertionError("no results")  # pragma: no cover
+
+    assert asyncio.run(first()).error is None
+
+
+def test_aconvert_does_not_block_event_loop() -> None:
+    """It keeps the event loop responsive while converting a large spec."""
+    spec = _large_spec(20000)
+    start = time.perf_counter()
+    convert("http://example.com/specifications/1", spec, IDENTIFIER)
+    blocking = time.perf_counter() - start
+
+    async def max_lag() -> float:
+        lag = 0.0
+        conversion = asyncio.ensure_future(
+            aconvert("http://example.com/specifications/1", spec, IDENTIFIER)
+        )
+        while not conversion.done():
+            tick = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, time.perf_counter() - tick - 0.001)
+        await conversion
+        return lag
+
+    lag = asyncio.run(max_lag())
+    assert lag < blocking / 4
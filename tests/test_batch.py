@@ -0,0 +1,364 @@
+"""Test cases for the batch module."""
+import datetime
+import json
+from typing import List, Optional, Tuple
+
+from datacatalogtordf import Catalog, DataService
+import pytest
+import yaml
+
+from oastodcat import (
+    batch,
+    CatalogDefaults,
+    LimitExceededError,
+    NotSupportedOASError,
+    NotValidOASError,
+)
+from oastodcat.batch import (
+    batch_report,
+    convert_chunk,
+    convert_many,
+    load_specification,
+    schedule,
+    Specification,
+    specification_digest,
+    specification_size,
+)
+from oastodcat.canonical import to_canonical_ntriples
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+@pytest.fixture(scope="session")
+def minimal_spec() -> str:
+    """Helper for creating a minimal specification object."""
+    _minimal_spec = """
+                    openapi: 3.0.3
+                    info:
+                      title: Swagger Petstore
+                      version: 1.0.0
+                    paths: {}
+                    """
+    return _minimal_spec
+
+
+def _nested_spec(depth: int) -> dict:
+    """Helper for creating a specification with deeply nested objects."""
+    leaf: dict = {}
+    node = leaf
+    for _ in range(depth):
+        node["nested"] = {}
+        node = node["nested"]
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Nested", "version": "1.0.0"},
+        "paths": {},
+        "components": {"schemas": leaf},
+    }
+
+
+def test_convert_many(minimal_spec: str) -> None:
+    """It returns one result per item, in the order given."""
+    items = [(f"http://example.com/specifications/{i}", minimal_spec) for i in range(3)]
+    results = convert_many(items, IDENTIFIER, max_workers=2)
+    assert [result.url for result in results] == [url for url, _ in items]
+    assert all(result.error is None for result in results)
+    assert all(len(result.dataservices) == 1 for result in results)
+
+
+def test_convert_many_reports_errors(minimal_spec: str) -> None:
+    """It reports failing items without aborting the run."""
+    items = [
+        ("http://example.com/specifications/1", "openapi: '2.0'\ninfo: {}"),
+        ("http://example.com/specifications/2", "{unclosed: ["),
+        ("http://example.com/specifications/3", "just a string"),
+        ("http://example.com/specifications/4", minimal_spec),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1)
+    assert isinstance(results[0].error, NotSupportedOASError)
+    assert isinstance(results[1].error, NotValidOASError)
+    assert isinstance(results[2].error, NotValidOASError)
+    assert results[3].error is None
+
+
+def test_convert_many_with_limits() -> None:
+    """It reports items exceeding the walker limits with LimitExceededError."""
+    items = [
+        ("http://example.com/specifications/1", _nested_spec(100)),
+        ("http://example.com/specifications/2", _nested_spec(5)),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1, max_depth=50)
+    assert isinstance(results[0].error, LimitExceededError)
+    assert results[1].error is None
+
+    results = convert_many(items, IDENTIFIER, max_workers=1, max_nodes=20)
+    assert isinstance(results[0].error, LimitExceededError)
+    assert results[1].error is None
+
+
+@pytest.mark.parametrize(
+    "longest_first, chunk_cost, expected",
+    [
+        (False, None, [[0], [1], [2], [3], [4]]),
+        (True, None, [[2], [0], [4], [1], [3]]),
+        (True, 6, [[2], [0], [4, 1], [3]]),
+        (False, 6, [[0], [1], [2], [3, 4]]),
+    ],
+)
+def test_schedule(longest_first: bool, chunk_cost: int, expected: list) -> None:
+    """It orders items longest first and chunks consecutive small ones."""
+    assert schedule([5, 2, 9, 1, 4], longest_first, chunk_cost) == expected
+
+
+def test_convert_many_in_chunks(minimal_spec: str) -> None:
+    """It reports each item of a chunk on its own."""
+    items = [
+        ("http://example.com/specifications/1", minimal_spec),
+        ("http://example.com/specifications/2", "{unclosed: ["),
+        ("http://example.com/specifications/3", minimal_spec.replace("1.0", "2.0")),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1, chunk_cost=10**6)
+    assert [result.url for result in results] == [url for url, _ in items]
+    assert results[0].error is None and len(results[0].dataservices) == 1
+    assert isinstance(results[1].error, NotValidOASError)
+    assert results[2].error is None and len(results[2].dataservices) == 1
+    # The same, converted in this process:
+    direct = convert_chunk(items, IDENTIFIER, {})
+    assert [result.phase for result in direct] == [None, "load", None]
+
+
+def test_specification_size() -> None:
+    """It sizes text by its length and dicts by their compact JSON."""
+    assert specification_size(b"openapi: 3.0.3") == 14
+    assert specification_size({"openapi": "3.0.3"}) == len('{"openapi":"3.0.3"}')
+
+
+def test_convert_many_sizes_specifications_by_their_digest(
+    minimal_spec: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """It takes the sizes from the JSON serialized for the digests."""
+    loaded = yaml.safe_load(minimal_spec)
+    items = [
+        ("http://example.com/specifications/1", loaded),
+        ("http://example.com/specifications/2", {**loaded, "x-size": "large"}),
+    ]
+    sizes = [specification_size(specification) for _, specification in items]
+    costs = []
+
+    def record(
+        costs_: List[int], longest_first: bool, chunk_cost: Optional[int]
+    ) -> List[List[int]]:
+        costs.extend(costs_)
+        return schedule(costs_, longest_first, chunk_cost)
+
+    def fail(specification: Specification) -> int:
+        raise AssertionError("Serialized again")
+
+    monkeypatch.setattr(batch, "schedule", record)
+    monkeypatch.setattr(batch, "specification_size", fail)
+    results = convert_many(items, IDENTIFIER, max_workers=1)
+    assert [result.error for result in results] == [None, None]
+    assert costs == sizes
+
+
+def test_load_specification_passes_dicts_through() -> None:
+    """It returns a dict as is."""
+    spec = {"openapi": "3.0.3"}
+    assert load_specification(spec) is spec
+
+
+@pytest.mark.parametrize("text", ["just a string", "[1, 2]", "{unclosed: ["])
+def test_load_specification_rejects_non_objects(text: str) -> None:
+    """It raises NotValidOASError for text that is not a YAML/JSON object."""
+    with pytest.raises(NotValidOASError):
+        load_specification(text)
+
+
+def test_convert_many_dedupes_identical_specs(minimal_spec: str) -> None:
+    """It converts identical specs once and re-stamps the copies."""
+    items = [
+        ("http://example.com/specifications/1", minimal_spec),
+        ("http://example.com/specifications/2", minimal_spec),
+        ("http://example.com/specifications/3", yaml.safe_load(minimal_spec)),
+        ("http://example.com/specifications/4", minimal_spec),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1)
+    assert [result.duplicate_of for result in results] == [
+        None,
+        "http://example.com/specifications/1",
+        None,
+        "http://example.com/specifications/1",
+    ]
+    expected = convert_many(items, IDENTIFIER, max_workers=1, dedupe=False)
+    for result, other in zip(results, expected):
+        assert result.error is None
+        assert to_canonical_ntriples(
+            _catalog(result.dataservices)
+        ) == to_canonical_ntriples(_catalog(other.dataservices))
+    assert results[0].dataservices[0] is not results[1].dataservices[0]
+
+    report = batch_report(results)
+    assert (report.total, report.converted, report.duplicates) == (4, 2, 2)
+    assert report.dedup_ratio == 0.5
+
+
+def test_convert_many_dedupes_mixed_key_types() -> None:
+    """It dedupes YAML-loaded dicts whose keys mix integers and strings."""
+    spec = yaml.safe_load(
+        """
+        openapi: 3.0.3
+        info:
+          title: Mixed keys
+          version: 1.0.0
+        paths:
+          /a:
+            get:
+              responses:
+                200:
+                  content:
+                    application/json: {}
+                default:
+                  content:
+                    text/plain: {}
+              tags: [pets, {name: admin}]
+        """
+    )
+    items: List[Tuple[str, Specification]] = [
+        ("http://example.com/specifications/1", spec),
+        ("http://example.com/specifications/2", spec),
+        ("http://example.com/specifications/3", dict(spec, paths={})),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1)
+    assert all(result.error is None for result in results)
+    assert [result.duplicate_of for result in results] == [
+        None,
+        "http://example.com/specifications/1",
+        None,
+    ]
+    dated = dict(spec, x={datetime.date(2024, 1, 1): 1, "a": 2})
+    assert specification_digest(dated) == specification_digest(dict(dated))
+
+
+@pytest.mark.parametrize("as_text", [False, True])
+def test_convert_many_dedupes_swagger_without_host_per_host(as_text: bool) -> None:
+    """It dedupes a spec taking its servers from its url only on one host."""
+    spec: dict = {
+        "swagger": "2.0",
+        "info": {"title": "No host", "version": "1.0.0"},
+        "basePath": "/v1",
+        "paths": {},
+    }
+    items: List[Tuple[str, Specification]] = [
+        (url, json.dumps(spec) if as_text else spec)
+        for url in [
+            "https://a.example.com/specifications/1",
+            "https://b.example.com/specifications/1",
+            "https://a.example.com/specifications/2",
+        ]
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1)
+    assert [result.duplicate_of for result in results] == [
+        None,
+        None,
+        "https://a.example.com/specifications/1",
+    ]
+    expected = convert_many(items, IDENTIFIER, max_workers=1, dedupe=False)
+    for result, other in zip(results, expected):
+        assert [s.identifier for s in result.dataservices] == [
+            s.identifier for s in other.dataservices
+        ]
+        assert [s.endpointURL for s in result.dataservices] == [
+            s.endpointURL for s in other.dataservices
+        ]
+    assert results[0].dataservices[0].endpointURL == "https://a.example.com/v1"
+    assert results[1].dataservices[0].endpointURL == "https://b.example.com/v1"
+
+    spec["host"] = "api.example.com"
+    items = [(url, json.dumps(spec) if as_text else spec) for url, _ in items]
+    results = convert_many(items, IDENTIFIER, max_workers=1)
+    assert results[1].duplicate_of == (None if as_text else items[0][0])
+
+
+def test_convert_many_without_digest() -> None:
+    """It converts a dict that has no JSON form without deduping it."""
+    spec = yaml.safe_load(
+        """
+        openapi: 3.0.3
+        info:
+          title: Cycle
+          version: 1.0.0
+        paths: {}
+        x-cycle: &cycle [*cycle]
+        """
+    )
+    items: List[Tuple[str, Specification]] = [
+        ("http://example.com/specifications/1", spec),
+        ("http://example.com/specifications/2", spec),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1, chunk_cost=10**6)
+    assert [result.digest for result in results] == [None, None]
+    assert [result.duplicate_of for result in results] == [None, None]
+    assert all(result.error is None for result in results)
+    assert specification_size(spec) == 0
+
+
+def test_convert_many_reads_defaults_given(minimal_spec: str) -> None:
+    """It points the dataservices at the defaults, not at a worker's copy."""
+    defaults = CatalogDefaults("http://example.com/publishers/1")
+    items = [(f"http://example.com/specifications/{i}", minimal_spec) for i in range(2)]
+    results = convert_many(items, IDENTIFIER, max_workers=1, defaults=defaults)
+    defaults.conforms_to = ["http://example.com/standards/1"]
+    for result in results:
+        [dataservice] = result.dataservices
+        assert dataservice.publisher == "http://example.com/publishers/1"
+        assert dataservice.conformsTo == ["http://example.com/standards/1"]
+
+
+def test_convert_many_dedupe_shares_errors() -> None:
+    """It reports the error of a failing spec for each of its copies."""
+    items = [
+        ("http://example.com/specifications/1", "{}"),
+        ("http://example.com/specifications/2", "{}"),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1)
+    assert all(isinstance(result.error, NotValidOASError) for result in results)
+    assert batch_report(results).failed == 2
+
+
+def test_convert_many_with_statistics() -> None:
+    """It gives statistics per result, and their sum in the report."""
+    spec: dict = {
+        "openapi": "3.0.3",
+        "info": {"title": "Statistics", "version": "1.0.0"},
+        "paths": {"/a": {"get": {"tags": ["a"]}, "put": {}}},
+    }
+    items: List[Tuple[str, Specification]] = [
+        ("http://example.com/specifications/1", spec),
+        ("http://example.com/specifications/2", spec),
+        ("http://example.com/specifications/3", "{}"),
+    ]
+    results = convert_many(items, IDENTIFIER, max_workers=1, statistics=True)
+    assert results[1].duplicate_of == "http://example.com/specifications/1"
+    assert [result.statistics is not None for result in results] == [
+        True,
+        True,
+        False,
+    ]
+    report = batch_report(results)
+    assert report.statistics is not None
+    assert (report.statistics.paths, report.statistics.operations) == (2, 4)
+    assert report.statistics.methods == {"get": 2, "put": 2}
+    assert report.statistics.tags == {"a": 2}
+    assert batch_report(convert_many(items[:1], IDENTIFIER)).statistics is None
+
+
+def test_batch_report_of_empty_batch() -> None:
+    """It returns a zero dedup ratio for an empty batch."""
+    assert batch_report(convert_many([], IDENTIFIER, max_workers=1)).dedup_ratio == 0
+
+
+def _catalog(dataservices: List[DataService]) -> Catalog:
+    catalog = Catalog()
+    catalog.identifier = "http://example.com/catalogs/1"
+    catalog.services.extend(dataservices)
+    return catalog
@@ -0,0 +1,116 @@
+"""Test cases for the canonical module."""
+from datacatalogtordf import Catalog
+import pytest
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+import yaml
+
+from oastodcat import OASDataService
+from oastodcat.canonical import canonical_graph, to_canonical_ntriples
+
+
+@pytest.fixture(scope="session")
+def spec_with_contact_and_media_types() -> str:
+    """Helper for creating a specification object with contact and media types."""
+    _spec = """
+            openapi: "3.0.3"
+            info:
+              title: Swagger Petstore
+              version: 1.0.0
+              contact:
+                name: Swagger API Team
+                email: apiteam@swagger.io
+            servers:
+              - url: http://test.petstore.swagger.io/v1
+              - url: http://petstore.swagger.io/v1
+            paths:
+              /pets:
+                get:
+                  responses:
+                    '200':
+                      description: A paged array of pets
+                      content:
+                        application/xml: {}
+                        application/json: {}
+                        text/csv: {}
+                        text/plain: {}
+            """
+    return _spec
+
+
+def _catalog(spec: str) -> Catalog:
+    catalog = Catalog()
+    catalog.identifier = "http://example.com/catalogs/1"
+    oas = yaml.safe_load(spec)
+    url = "http://example.com/specifications/1"
+    identifier = "http://example.com/dataservices/{id}"
+    for dataservice in OASDataService(url, oas, identifier).dataservices:
+        catalog.services.append(dataservice)
+    return catalog
+
+
+def test_media_types_are_sorted(spec_with_contact_and_media_types: str) -> None:
+    """It returns the media types in sorted order."""
+    oas = yaml.safe_load(spec_with_contact_and_media_types)
+    oas_spec = OASDataService("http://example.com/specifications/1", oas, "{id}")
+    for dataservice in oas_spec.dataservices:
+        assert dataservice.media_types == sorted(dataservice.media_types)
+
+
+def test_to_canonical_ntriples_is_byte_stable(
+    spec_with_contact_and_media_types: str,
+) -> None:
+    """It returns identical bytes for identical input."""
+    first = to_canonical_ntriples(_catalog(spec_with_contact_and_media_types))
+    second = to_canonical_ntriples(_catalog(spec_with_contact_and_media_types))
+    assert first == second
+    assert first.splitlines() == sorted(first.splitlines())
+
+
+def test_canonical_graph_is_isomorphic(
+    spec_with_contact_and_media_types: str,
+) -> None:
+    """It keeps one contact node per dataservice."""
+    catalog = _catalog(spec_with_contact_and_media_types)
+    g1 = Graph().parse(data=catalog.to_rdf(), format="turtle")
+    g2 = canonical_graph(g1)
+    assert isomorphic(g1, g2)
+    assert len({s for s in g2.subjects() if isinstance(s, BNode)}) == 2
+
+
+def test_canonical_labels_of_blank_node_cycles() -> None:
+    """It labels blank nodes referring to each other by their content."""
+    p, name = URIRef("http://example.com/p"), URIRef("http://example.com/name")
+    graphs = []
+    for a, b in [(BNode("a"), BNode("b")), (BNode("x"), BNode("y"))]:
+        g = Graph()
+        g.add((a, p, b))
+        g.add((b, p, a))
+        g.add((a, name, Literal("A")))
+        graphs.append(g)
+    assert to_canonical_ntriples(graphs[0]) == to_canonical_ntriples(graphs[1])
+    assert isomorphic(canonical_graph(graphs[0]), graphs[1])
+
+
+def test_canonical_labels_of_shared_blank_nodes() -> None:
+    """It labels a blank node referred to by several others once."""
+    p, name = URIRef("http://example.com/p"), URIRef("http://example.com/name")
+    g = Graph()
+    shared = BNode()
+    for label in ["A", "B"]:
+        node = BNode()
+        g.add((node, p, shared))
+        g.add((node, name, Literal(label)))
+    g.add((shared, name, Literal("C")))
+    assert isomorphic(canonical_graph(g), g)
+    nodes = canonical_graph(g).all_nodes()
+    assert len([node for node in nodes if isinstance(node, BNode)]) == 3
+
+
+def test_to_canonical_ntriples_accepts_graph(
+    spec_with_contact_and_media_types: str,
+) -> None:
+    """It returns the same output for a graph as for the resource."""
+    catalog = _catalog(spec_with_contact_and_media_types)
+    g = Graph().parse(data=catalog.to_rdf(), format="turtle")
+    assert to_canonical_ntriples(g) == to_canonical_ntriples(catalog)
@@ -0,0 +1,107 @@
+"""Test cases for the index module."""
+from pathlib import Path
+
+import pytest
+import yaml
+
+from oastodcat import OASDataService
+from oastodcat.batch import convert_many
+from oastodcat.index import CatalogIndex
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+@pytest.fixture(scope="session")
+def spec() -> str:
+    """Helper for creating a specification object."""
+    _spec = """
+            openapi: "3.0.3"
+            info:
+              title: Swagger Petstore
+              version: 1.0.0
+              license:
+                name: MIT
+                url: https://opensource.org/licenses/MIT
+            servers:
+              - url: http://petstore.swagger.io/v1
+            paths:
+              /pets:
+                get:
+                  responses:
+                    '200':
+                      description: A paged array of pets
+                      content:
+                        application/xml: {}
+                        application/json: {}
+            """
+    return _spec
+
+
+def test_index_lookups(spec: str) -> None:
+    """It maps properties to identifiers and identifiers to their source."""
+    oas_spec = OASDataService(
+        "http://example.com/specifications/1", yaml.safe_load(spec), IDENTIFIER
+    )
+    oas_spec.publisher = "http://example.com/publishers/1"
+    oas_spec.conforms_to = ["http://example.com/standards/1"]
+    identifier = str(oas_spec.dataservices[0].identifier)
+
+    with CatalogIndex() as index:
+        index.add("http://example.com/specifications/1", oas_spec.dataservices, "abc")
+        assert len(index) == 1
+        for kind, value in [
+            ("media_type", "application/xml"),
+            ("media_type", "https://www.iana.org/assignments/media-types/text/csv"),
+            ("publisher", "http://example.com/publishers/1"),
+            ("conforms_to", "http://example.com/standards/1"),
+            ("endpoint_url", "http://petstore.swagger.io/v1"),
+            ("license", "https://opensource.org/licenses/MIT"),
+        ]:
+            expected = [] if value.endswith("csv") else [identifier]
+            assert index.identifiers(kind, value) == expected
+        assert index.source(identifier) == (
+            "http://example.com/specifications/1",
+            "abc",
+        )
+        assert index.source("http://example.com/nothing") is None
+
+
+def test_index_replaces_dataservices(spec: str, tmp_path: Path) -> None:
+    """It replaces the facts of a dataservice that is added again."""
+    oas = yaml.safe_load(spec)
+    url = "http://example.com/specifications/1"
+    path = tmp_path / "index.sqlite"
+    with CatalogIndex(path) as index:
+        index.add(url, OASDataService(url, oas, IDENTIFIER).dataservices)
+        assert index.path == path
+
+    del oas["info"]["license"]
+    with CatalogIndex(path) as index:
+        index.add(url, OASDataService(url, oas, IDENTIFIER).dataservices)
+        assert len(index) == 1
+        assert index.identifiers("license", "https://opensource.org/licenses/MIT") == []
+
+
+def test_index_unknown_kind() -> None:
+    """It raises a ValueError."""
+    with CatalogIndex() as index:
+        with pytest.raises(ValueError):
+            index.identifiers("title", "Swagger Petstore")
+
+
+def test_convert_many_builds_index(spec: str) -> None:
+    """It adds the dataservices of successful items to the index."""
+    items = [
+        ("http://example.com/specifications/1", spec),
+        ("http://example.com/specifications/2", "{}"),
+    ]
+    with CatalogIndex() as index:
+        results = convert_many(
+            items, IDENTIFIER, max_workers=1, dedupe=False, index=index
+        )
+        [identifier] = index.identifiers("media_type", "application/json")
+        assert index.source(identifier) == (
+            "http://example.com/specifications/1",
+            results[0].digest,
+        )
+        assert len(index) == 1
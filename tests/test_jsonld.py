@@ -0,0 +1,101 @@
+"""Test cases for the jsonld module."""
+import io
+import json
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+import yaml
+
+from oastodcat import OASDataService
+from oastodcat.jsonld import iter_jsonl, to_jsonld, write_jsonl
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+SCHEMES = {"default": "https", "enum": ["http", "https"]}
+
+
+@pytest.fixture(scope="session")
+def spec() -> dict:
+    """Helper for creating a specification object."""
+    _spec = """
+            openapi: "3.0.3"
+            info:
+              title: Swagger Petstore
+              description: A sample API
+              version: 1.0.0
+              contact:
+                name: Swagger API Team
+                email: apiteam@swagger.io
+                url: http://swagger.io
+              license:
+                name: MIT
+                url: https://opensource.org/licenses/MIT
+            externalDocs:
+              url: http://petstore.swagger.io/docs
+            servers:
+              - url: http://petstore.swagger.io/v1
+              - url: http://petstore.swagger.io/v2
+            paths:
+              /pets:
+                get:
+                  responses:
+                    '200':
+                      description: A paged array of pets
+                      content:
+                        application/xml: {}
+                        application/json: {}
+            """
+    return yaml.safe_load(_spec)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"contact_identifier": "http://example.com/contacts/{id}"},
+        {"server_variables": "enum", "group_server_urls": True},
+    ],
+)
+def test_to_jsonld_gives_same_triples_as_rdf(spec: dict, options: dict) -> None:
+    """It gives a document with the same triples as the dataservice's rdf."""
+    if options.get("server_variables"):
+        spec = dict(spec, servers=[{"url": "{s}://a", "variables": {"s": SCHEMES}}])
+    oas_spec = OASDataService(
+        "http://example.com/specifications/1", spec, IDENTIFIER, **options
+    )
+    oas_spec.publisher = "http://example.com/publishers/1"
+    for dataservice in oas_spec.dataservices:
+        document = json.dumps(to_jsonld(dataservice))
+        graph = Graph().parse(data=document, format="json-ld")
+        assert isomorphic(graph, dataservice._to_graph())
+
+
+def test_to_jsonld_document(spec: dict) -> None:
+    """It uses short keys, lists for multi-valued properties and no empties."""
+    oas_spec = OASDataService("http://example.com/specifications/1", spec, IDENTIFIER)
+    oas_spec.conforms_to = ["http://example.com/standards/1"]
+    document = to_jsonld(oas_spec.dataservices[0], "http://example.com/context")
+    assert document["@context"] == "http://example.com/context"
+    assert document["title"] == {"en": "Swagger Petstore"}
+    assert document["contactPoint"]["email"] == "mailto:apiteam@swagger.io"
+    assert document["endpointURL"] == ["http://petstore.swagger.io/v1"]
+    assert document["mediaType"] == [
+        "https://www.iana.org/assignments/media-types/application/json",
+        "https://www.iana.org/assignments/media-types/application/xml",
+    ]
+    assert document["conformsTo"] == ["http://example.com/standards/1"]
+    assert "publisher" not in document
+
+
+def test_write_jsonl(spec: dict) -> None:
+    """It writes one compact document per line."""
+    oas_spec = OASDataService("http://example.com/specifications/1", spec, IDENTIFIER)
+    output = io.StringIO()
+    assert write_jsonl(iter(oas_spec.dataservices), output) == 2
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 2
+    assert [json.loads(line)["@id"] for line in lines] == [
+        str(dataservice.identifier) for dataservice in oas_spec.dataservices
+    ]
+    assert ", " not in lines[0]
+    assert list(iter_jsonl([])) == []
@@ -0,0 +1,113 @@
+"""Test cases for the memory use of the conversion."""
+import gc
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+import pytest
+
+from oastodcat import OASDataService
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+KiB = 1024
+
+
+def _spec(paths: int = 1, servers: int = 1, depth: int = 0) -> dict:
+    """Helper for creating a scaled specification object."""
+    response: dict = {"content": {"application/json": {}, "application/xml": {}}}
+    for _ in range(depth):
+        response = {"description": "nested", "schema": response}
+    return {
+        "openapi": "3.0.3",
+        "info": {
+            "title": "Scaled",
+            "version": "1.0.0",
+            "contact": {"name": "Team", "email": "team@example.com"},
+        },
+        "servers": [{"url": f"http://example.com/{i}"} for i in range(servers)],
+        "paths": {
+            f"/items/{i}": {"get": {"responses": {"200": response}}}
+            for i in range(paths)
+        },
+    }
+
+
+def _convert(specification: dict, graphs: bool = False) -> OASDataService:
+    """Helper converting a specification, and building its graphs."""
+    oas_spec = OASDataService(
+        "http://example.com/specifications/1", specification, IDENTIFIER
+    )
+    if graphs:
+        for dataservice in oas_spec.dataservices:
+            dataservice._to_graph()
+    return oas_spec
+
+
+def _measure(func: Callable[[], Any]) -> Tuple[int, int]:
+    """Helper returning peak and retained bytes allocated by func."""
+    func()  # warm up caches and imports
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def test_memory_does_not_grow_with_paths() -> None:
+    """It holds no per-path state, however many paths there are."""
+    small_spec, large_spec = _spec(paths=1), _spec(paths=5000)
+    small = _measure(lambda: _convert(small_spec))
+    large = _measure(lambda: _convert(large_spec))
+    assert large[0] <= small[0] + 4 * KiB
+    assert large[1] <= small[1] + 4 * KiB
+
+
+@pytest.mark.parametrize("servers", [1, 10, 100])
+def test_memory_per_server(servers: int) -> None:
+    """It retains a few KiB per dataservice, and tens of KiB with graphs."""
+    specification = _spec(servers=servers)
+    peak, retained = _measure(lambda: _convert(specification))
+    assert retained <= 16 * KiB + servers * 8 * KiB
+    assert peak <= 32 * KiB + servers * 8 * KiB
+
+    peak, retained = _measure(lambda: _convert(specification, True))
+    assert retained <= 32 * KiB + servers * 96 * KiB
+    assert peak <= 64 * KiB + servers * 96 * KiB
+
+
+def test_memory_per_nesting_level() -> None:
+    """It needs a bounded amount of stack per nesting level."""
+    # Both deeper than the 200 frames that Python < 3.11 keeps on a free
+    # list, so the difference is what the extra levels need on any version,
+    # with or without a tracer:
+    shallow, deep = _spec(depth=200), _spec(depth=400)
+    shallow_peak, shallow_retained = _measure(lambda: _convert(shallow))
+    deep_peak, deep_retained = _measure(lambda: _convert(deep))
+    assert deep_peak - shallow_peak <= 200 * KiB
+    assert deep_retained - shallow_retained <= 200 * 128
+
+
+def test_repeated_conversions_do_not_leak() -> None:
+    """It retains nothing between conversions in one process."""
+    specification = _spec(paths=50, servers=3, depth=5)
+
+    def convert_many(n: int) -> None:
+        for _ in range(n):
+            _convert(specification, True)
+
+    convert_many(10)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        convert_many(10)
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        convert_many(50)
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert after - before <= 4 * KiB
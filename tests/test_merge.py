@@ -0,0 +1,67 @@
+"""Test cases for the merge module."""
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from oastodcat.merge import merge_lines, merge_ntriples, sort_ntriples
+
+
+def _triple(i: int) -> str:
+    return f"<http://example.com/s/{i:04}> <http://example.com/p> _:o .\n"
+
+
+def _write(path: Path, lines: List[str]) -> Path:
+    path.write_text("".join(lines), encoding="utf-8")
+    return path
+
+
+def test_merge_ntriples(tmp_path: Path) -> None:
+    """It merges sorted shards and drops duplicate triples."""
+    shards = [
+        _write(tmp_path / "a.nt", [_triple(i) for i in range(0, 10, 2)]),
+        _write(tmp_path / "b.nt", [_triple(i) for i in range(0, 10, 3)]),
+        _write(tmp_path / "c.nt", []),
+    ]
+    count = merge_ntriples(shards, tmp_path / "out.nt")
+    expected = sorted({_triple(i) for i in [0, 2, 4, 6, 8, 3, 9]})
+    assert count == len(expected)
+    assert (tmp_path / "out.nt").read_text(encoding="utf-8") == "".join(expected)
+
+
+def test_merge_ntriples_in_passes(tmp_path: Path) -> None:
+    """It merges more shards than max_open_files through temporary files."""
+    shards = [
+        _write(tmp_path / f"{i}.nt", [_triple(i), _triple(i + 1)]) for i in range(9)
+    ]
+    count = merge_ntriples(shards, tmp_path / "out.nt", max_open_files=2)
+    assert count == 10
+    assert (tmp_path / "out.nt").read_text(encoding="utf-8") == "".join(
+        _triple(i) for i in range(10)
+    )
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [f"{i}.nt" for i in range(9)] + ["out.nt"]
+    )
+
+
+def test_merge_ntriples_with_too_few_files(tmp_path: Path) -> None:
+    """It raises a ValueError."""
+    with pytest.raises(ValueError):
+        merge_ntriples([], tmp_path / "out.nt", max_open_files=1)
+
+
+def test_sort_ntriples(tmp_path: Path) -> None:
+    """It sorts a file in runs and drops duplicates and blank lines."""
+    lines = [_triple(i % 7) for i in range(20, 0, -1)] + ["\n"]
+    lines[-2] = lines[-2].rstrip("\n")
+    source = _write(tmp_path / "in.nt", lines)
+    count = sort_ntriples(source, tmp_path / "out.nt", max_lines=3)
+    assert count == 7
+    assert (tmp_path / "out.nt").read_text(encoding="utf-8") == "".join(
+        _triple(i) for i in range(7)
+    )
+
+
+def test_merge_lines() -> None:
+    """It merges sorted iterables of lines."""
+    assert list(merge_lines([["a\n", "c\n"], ["a\n", "b\n"]])) == ["a\n", "b\n", "c\n"]
@@ -1,12 +1,18 @@
 """Test cases for the oas_dataservice module."""
-from datacatalogtordf import Catalog
+import pickle  # noqa: S403
+
+from datacatalogtordf import Catalog, InvalidURIError
 import pytest
 from pytest_mock import MockFixture
-from rdflib import Graph
+from rdflib import DCTERMS, Graph, URIRef
 from rdflib.compare import graph_diff, isomorphic
 import yaml
 
 from oastodcat import (
+    CatalogDefaults,
+    expand_server_url,
+    LimitExceededError,
+    normalize_specification,
     NotSupportedOASError,
     NotValidOASError,
     OASDataService,
@@ -151,6 +157,27 @@ def spec_with_external_docs() -> str:
     return _spec
 
 
+@pytest.fixture(scope="session")
+def spec_with_server_variables() -> str:
+    """Helper for creating a specification object with server variables."""
+    _spec = """
+            openapi: 3.0.3
+            info:
+              title: Swagger Petstore
+              version: 1.0.0
+            servers:
+              - url: https://{region}.petstore.swagger.io/{basePath}
+                variables:
+                  region:
+                    default: eu
+                    enum: [us, eu, ap]
+                  basePath:
+                    default: v1
+            paths: {}
+            """
+    return _spec
+
+
 def test_parse_empty_spec_should_raise_error() -> None:
     """It raises a NotValidOASError."""
     with pytest.raises(NotValidOASError):
@@ -647,6 +674,457 @@ def test_create_dataservice_with_conforms_to(minimal_spec: str) -> None:
     assert _isomorphic
 
 
+def test_parse_spec_exceeding_max_depth_should_raise_error(
+    spec_with_media_types: str,
+) -> None:
+    """It raises a LimitExceededError."""
+    with pytest.raises(LimitExceededError):
+        url = "http://example.com/specifications/1"
+        identifier = "http://example.com/dataservices/1"
+        oas = yaml.safe_load(spec_with_media_types)
+        OASDataService(url, oas, identifier, max_depth=3)
+
+
+def test_parse_spec_exceeding_max_nodes_should_raise_error(
+    spec_with_media_types: str,
+) -> None:
+    """It raises a LimitExceededError."""
+    with pytest.raises(LimitExceededError):
+        url = "http://example.com/specifications/1"
+        identifier = "http://example.com/dataservices/1"
+        oas = yaml.safe_load(spec_with_media_types)
+        OASDataService(url, oas, identifier, max_nodes=5)
+
+
+def test_parse_spec_within_limits(spec_with_media_types: str) -> None:
+    """It returns a dataservice when the spec is within the limits."""
+    url = "http://example.com/specifications/1"
+    identifier = "http://example.com/dataservices/1"
+    oas = yaml.safe_load(spec_with_media_types)
+    oas_spec = OASDataService(url, oas, identifier, max_nodes=1000, max_depth=20)
+    assert len(oas_spec.dataservices[0].media_types) == 2
+
+
+def test_parse_spec_with_server_variables_default(
+    spec_with_server_variables: str,
+) -> None:
+    """It returns a dataservice with the default values filled in."""
+    catalog = Catalog()
+    catalog.identifier = "http://example.com/catalogs/1"
+
+    url = "http://example.com/specifications/1"
+    oas = yaml.safe_load(spec_with_server_variables)
+    identifier = "http://example.com/dataservices/1"
+    oas_spec = OASDataService(url, oas, identifier, server_variables="default")
+    for dataservice in oas_spec.dataservices:
+        catalog.services.append(dataservice)
+
+    src = """
+        @prefix dct: <http://purl.org/dc/terms/> .
+        @prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        @prefix dcat: <http://www.w3.org/ns/dcat#> .
+
+        <http://example.com/catalogs/1> a dcat:Catalog ;
+            dcat:service <http://example.com/dataservices/1> .
+
+        <http://example.com/dataservices/1> a dcat:DataService ;
+            dct:title   "Swagger Petstore"@en ;
+            dcat:endpointURL   <https://eu.petstore.swagger.io/v1> ;
+            dcat:endpointDescription <http://example.com/specifications/1> ;
+        .
+        """
+
+    g1 = Graph().parse(data=catalog.to_rdf(), format="turtle")
+    g2 = Graph().parse(data=src, format="turtle")
+
+    _isomorphic = isomorphic(g1, g2)
+    if not _isomorphic:
+        _dump_diff(g1, g2)
+        pass
+    assert _isomorphic
+
+
+def test_parse_spec_with_server_variables_enum(
+    spec_with_server_variables: str,
+) -> None:
+    """It returns one dataservice per expanded url, up to the cap."""
+    url = "http://example.com/specifications/1"
+    oas = yaml.safe_load(spec_with_server_variables)
+    identifier = "http://example.com/dataservices/{id}"
+    oas_spec = OASDataService(url, oas, identifier, server_variables="enum")
+    assert [d.endpointURL for d in oas_spec.dataservices] == [
+        "https://eu.petstore.swagger.io/v1",
+        "https://us.petstore.swagger.io/v1",
+        "https://ap.petstore.swagger.io/v1",
+    ]
+    assert len({d.identifier for d in oas_spec.dataservices}) == 3
+
+    oas_spec = OASDataService(
+        url, oas, identifier, server_variables="enum", max_server_urls=2
+    )
+    assert len(oas_spec.dataservices) == 2
+
+
+def test_parse_spec_with_grouped_server_urls(
+    spec_with_server_variables: str,
+) -> None:
+    """It returns one dataservice with several endpoint URLs."""
+    catalog = Catalog()
+    catalog.identifier = "http://example.com/catalogs/1"
+
+    url = "http://example.com/specifications/1"
+    oas = yaml.safe_load(spec_with_server_variables)
+    identifier = "http://example.com/dataservices/1"
+    oas_spec = OASDataService(
+        url, oas, identifier, server_variables="enum", group_server_urls=True
+    )
+    for dataservice in oas_spec.dataservices:
+        catalog.services.append(dataservice)
+
+    src = """
+        @prefix dct: <http://purl.org/dc/terms/> .
+        @prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        @prefix dcat: <http://www.w3.org/ns/dcat#> .
+
+        <http://example.com/catalogs/1> a dcat:Catalog ;
+            dcat:service <http://example.com/dataservices/1> .
+
+        <http://example.com/dataservices/1> a dcat:DataService ;
+            dct:title   "Swagger Petstore"@en ;
+            dcat:endpointURL   <https://eu.petstore.swagger.io/v1> ,
+                               <https://us.petstore.swagger.io/v1> ,
+                               <https://ap.petstore.swagger.io/v1> ;
+            dcat:endpointDescription <http://example.com/specifications/1> ;
+        .
+        """
+
+    g1 = Graph().parse(data=catalog.to_rdf(), format="turtle")
+    g2 = Graph().parse(data=src, format="turtle")
+
+    _isomorphic = isomorphic(g1, g2)
+    if not _isomorphic:
+        _dump_diff(g1, g2)
+        pass
+    assert _isomorphic
+
+
+def test_expand_server_url_without_values() -> None:
+    """It leaves variables without values as they are."""
+    server = {"url": "https://{a}.example.com/{b}", "variables": {"a": {}}}
+    assert expand_server_url(server, enum=True) == ["https://{a}.example.com/{b}"]
+
+
+def test_parse_spec_with_unknown_server_variables_mode_should_raise_error(
+    minimal_spec: str,
+) -> None:
+    """It raises a ValueError."""
+    with pytest.raises(ValueError):
+        url = "http://example.com/specifications/1"
+        oas = yaml.safe_load(minimal_spec)
+        OASDataService(url, oas, "{id}", server_variables="all")
+
+
+def test_parse_spec_with_shared_contact(spec_with_multiple_servers: str) -> None:
+    """It returns dataservices sharing one contact node."""
+    catalog = Catalog()
+    catalog.identifier = "http://example.com/catalogs/1"
+
+    url = "http://example.com/specifications/1"
+    oas = yaml.safe_load(spec_with_multiple_servers)
+    oas["info"]["contact"] = {"name": "Swagger API Team", "email": "a@example.com"}
+    identifier = "http://example.com/dataservices/{id}"
+    oas_spec = OASDataService(
+        url, oas, identifier, contact_identifier="http://example.com/contacts/{id}"
+    )
+    for dataservice in oas_spec.dataservices:
+        catalog.services.append(dataservice)
+    contact = oas_spec.dataservices[0].contactpoint.identifier
+    assert contact == oas_spec.dataservices[1].contactpoint.identifier
+
+    src = f"""
+        @prefix dct: <http://purl.org/dc/terms/> .
+        @prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        @prefix dcat: <http://www.w3.org/ns/dcat#> .
+        @prefix vcard: <http://www.w3.org/2006/vcard/ns#> .
+
+        <http://example.com/catalogs/1> a dcat:Catalog ;
+            dcat:service <{oas_spec.dataservices[0].identifier}> ,
+                         <{oas_spec.dataservices[1].identifier}> .
+
+        <{oas_spec.dataservices[0].identifier}> a dcat:DataService ;
+            dct:title   "Swagger Petstore"@en ;
+            dcat:contactPoint <{contact}> ;
+            dcat:endpointURL   <http://test.petstore.swagger.io/v1> ;
+            dcat:endpointDescription <http://example.com/specifications/1> ;
+        .
+
+        <{oas_spec.dataservices[1].identifier}> a dcat:DataService ;
+            dct:title   "Swagger Petstore"@en ;
+            dcat:contactPoint <{contact}> ;
+            dcat:endpointURL   <http://petstore.swagger.io/v1> ;
+            dcat:endpointDescription <http://example.com/specifications/1> ;
+        .
+
+        <{contact}> a vcard:Organization ;
+            vcard:hasOrganizationName "Swagger API Team"@en ;
+            vcard:hasEmail <mailto:a@example.com> ;
+        .
+        """
+
+    g1 = Graph().parse(data=catalog.to_rdf(), format="turtle")
+    g2 = Graph().parse(data=src, format="turtle")
+
+    _isomorphic = isomorphic(g1, g2)
+    if not _isomorphic:
+        _dump_diff(g1, g2)
+        pass
+    assert _isomorphic
+
+
+def test_contact_identifier_is_derived_from_content(minimal_spec: str) -> None:
+    """It gives identical contacts the same identifier, others a new one."""
+    url = "http://example.com/specifications/1"
+    template = "http://example.com/contacts/{id}"
+    identifiers = []
+    for contact in (
+        {"name": "Team"},
+        {"name": "Team"},
+        {"name": "Team", "url": "https://example.com"},
+    ):
+        oas = yaml.safe_load(minimal_spec)
+        oas["info"]["contact"] = contact
+        oas_spec = OASDataService(url, oas, "{id}", contact_identifier=template)
+        identifiers.append(oas_spec.dataservices[0].contactpoint.identifier)
+    assert identifiers[0] == identifiers[1] != identifiers[2]
+
+
+@pytest.fixture(scope="session")
+def swagger_spec() -> str:
+    """Helper for creating a Swagger 2.0 specification object."""
+    _swagger_spec = """
+            swagger: "2.0"
+            info:
+              title: Swagger Petstore
+              version: 1.0.0
+              license:
+                name: MIT
+                url: https://opensource.org/licenses/MIT
+            host: petstore.swagger.io
+            basePath: /v1/
+            schemes: [http, https]
+            produces: [application/json]
+            paths:
+              /pets:
+                get:
+                  produces: [application/xml]
+                  responses:
+                    '200':
+                      description: A paged array of pets
+                post:
+                  consumes: [text/csv]
+                  responses:
+                    '201':
+                      description: Null response
+            """
+    return _swagger_spec
+
+
+def test_parse_swagger_2_spec(swagger_spec: str) -> None:
+    """It maps host, basePath, schemes, produces and consumes."""
+    oas = yaml.safe_load(swagger_spec)
+    oas_spec = OASDataService("http://example.com/specifications/1", oas, "{id}")
+    assert [d.endpointURL for d in oas_spec.dataservices] == [
+        "http://petstore.swagger.io/v1",
+        "https://petstore.swagger.io/v1",
+    ]
+    media_type = "https://www.iana.org/assignments/media-types/"
+    # get overrides the document's produces, post inherits it:
+    assert oas_spec.dataservices[0].media_types == [
+        media_type + "application/json",
+        media_type + "application/xml",
+        media_type + "text/csv",
+    ]
+    assert oas_spec.dataservices[0].license == "https://opensource.org/licenses/MIT"
+    assert "servers" not in oas and "content" not in oas
+
+
+def test_parse_swagger_2_spec_without_host(swagger_spec: str) -> None:
+    """It falls back on the host and scheme of the specification's url."""
+    oas = yaml.safe_load(swagger_spec)
+    del oas["host"], oas["schemes"], oas["paths"]
+    normalized = normalize_specification(oas, "http://example.com/specs/1")
+    assert normalized["servers"] == [{"url": "http://example.com/v1"}]
+    assert normalized["content"] == {"application/json": {}}
+    assert "servers" not in normalize_specification(oas)
+
+
+def test_parse_openapi_3_1_spec() -> None:
+    """It maps SPDX licenses and seeks media types in webhooks."""
+    oas_3_1 = """
+            openapi: 3.1.0
+            jsonSchemaDialect: https://spec.openapis.org/oas/3.1/dialect/base
+            info:
+              title: Webhook Example
+              version: 1.0.0
+              license:
+                name: Apache 2.0
+                identifier: Apache-2.0
+            webhooks:
+              newPet:
+                post:
+                  requestBody:
+                    content:
+                      application/json: {}
+                  responses:
+                    '200':
+                      description: OK
+            """
+    oas = yaml.safe_load(oas_3_1)
+    oas_spec = OASDataService("http://example.com/specifications/1", oas, "{id}")
+    dataservice = oas_spec.dataservices[0]
+    assert dataservice.license == "https://spdx.org/licenses/Apache-2.0.html"
+    assert dataservice.media_types == [
+        "https://www.iana.org/assignments/media-types/application/json"
+    ]
+    assert "url" not in oas["info"]["license"]
+
+
+@pytest.mark.parametrize(
+    "license",
+    [
+        {"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+        {"name": "MIT", "identifier": "MIT", "url": "https://example.com/MIT"},
+    ],
+)
+def test_normalize_leaves_3_1_spec_with_license_url_as_is(license: dict) -> None:
+    """It returns an openAPI 3.1 specification whose license has a url itself."""
+    oas = {
+        "openapi": "3.1.0",
+        "info": {"title": "License", "version": "1.0.0", "license": license},
+        "paths": {},
+    }
+    assert normalize_specification(oas) is oas
+
+
+def test_normalize_leaves_3_0_spec_as_is(minimal_spec: str) -> None:
+    """It returns an openAPI 3.0 specification itself."""
+    oas = yaml.safe_load(minimal_spec)
+    assert normalize_specification(oas) is oas
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {
+            "server_variables": "default",
+            "contact_identifier": "http://example.com/contacts/{id}",
+        },
+        {"server_variables": "enum", "group_server_urls": True},
+    ],
+)
+def test_pickle_round_trip(
+    spec_with_server_variables: str, minimal_spec: str, options: dict
+) -> None:
+    """It pickles every converted field, and no graph."""
+    oas = yaml.safe_load(spec_with_server_variables)
+    oas["info"] = yaml.safe_load(minimal_spec)["info"]
+    oas["info"]["contact"] = {"name": "Team", "email": "team@example.com"}
+    oas_spec = OASDataService(
+        "http://example.com/specifications/1", oas, "http://example.com/{id}", **options
+    )
+    oas_spec.publisher = "http://example.com/publishers/1"
+    dataservice = oas_spec.dataservices[0]
+    size = len(pickle.dumps(dataservice))
+    graph = dataservice._to_graph()
+    assert len(pickle.dumps(dataservice)) == size
+
+    restored = pickle.loads(pickle.dumps(oas_spec))  # noqa: S301
+    assert restored.specification == oas_spec.specification
+    assert restored.publisher == oas_spec.publisher
+    assert len(restored.dataservices) == len(oas_spec.dataservices)
+    assert type(restored.dataservices[0]) is type(dataservice)
+    state, restored_state = (
+        dataservice.__getstate__(),
+        restored.dataservices[0].__getstate__(),
+    )
+    assert restored_state.pop("_defaults") is restored.defaults
+    assert state.pop("_defaults") is oas_spec.defaults
+    assert restored_state == state
+    assert restored.dataservices[0].publisher == "http://example.com/publishers/1"
+    assert isomorphic(restored.dataservices[0]._to_graph(), graph)
+
+
+def test_catalog_defaults_are_applied_when_emitted(
+    spec_with_multiple_servers: str,
+) -> None:
+    """It gives the same triples as setting publisher on every dataservice."""
+    url = "http://example.com/specifications/1"
+    oas = yaml.safe_load(spec_with_multiple_servers)
+    defaults = CatalogDefaults()
+    oas_spec = OASDataService(url, oas, "http://example.com/{id}", defaults=defaults)
+    expected = OASDataService(url, oas, "http://example.com/{id}")
+    for dataservice in expected.dataservices:
+        dataservice.publisher = "http://example.com/publishers/1"
+        dataservice.conformsTo = ["http://example.com/standards/1"]
+
+    # Set after the conversion, and read when the triples are emitted:
+    defaults.publisher = "http://example.com/publishers/1"
+    defaults.conforms_to = ["http://example.com/standards/1"]
+    publisher = URIRef("http://example.com/publishers/1")
+    for dataservice, other in zip(oas_spec.dataservices, expected.dataservices):
+        assert dataservice.conformsTo == ["http://example.com/standards/1"]
+        # datacatalogtordf 2 emits a publisher only if its type is str:
+        assert type(dataservice.publisher) is str
+        graph = dataservice._to_graph()
+        assert (None, DCTERMS.publisher, publisher) in graph
+        assert isomorphic(graph, other._to_graph())
+
+
+def test_catalog_defaults_can_be_overridden(minimal_spec: str) -> None:
+    """It prefers the values of a dataservice, then of its specification."""
+    url = "http://example.com/specifications/1"
+    oas = yaml.safe_load(minimal_spec)
+    defaults = CatalogDefaults(
+        "http://example.com/publishers/1", ["http://example.com/standards/1"]
+    )
+    first = OASDataService(url, oas, "http://example.com/{id}", defaults=defaults)
+    second = OASDataService(url, oas, "http://example.com/{id}", defaults=defaults)
+    second.publisher = "http://example.com/publishers/2"
+    assert second.conforms_to == ["http://example.com/standards/1"]
+    assert first.dataservices[0].publisher == "http://example.com/publishers/1"
+    assert second.dataservices[0].publisher == "http://example.com/publishers/2"
+
+    first.dataservices[0].publisher = "http://example.com/publishers/3"
+    first.dataservices[0].conformsTo = []
+    assert first.publisher == "http://example.com/publishers/1"
+    assert first.dataservices[0].publisher == "http://example.com/publishers/3"
+    assert first.dataservices[0].conformsTo == []
+    assert OASDataService(url, oas, "http://example.com/{id}").publisher is None
+
+
+def test_catalog_defaults_fall_back_on_parent() -> None:
+    """It falls back on the values of its parent, value by value."""
+    parent = CatalogDefaults(
+        "http://example.com/publishers/1", ["http://example.com/standards/1"]
+    )
+    defaults = CatalogDefaults(conforms_to=[], parent=parent)
+    assert defaults.parent is parent
+    assert defaults.publisher == "http://example.com/publishers/1"
+    assert defaults.conforms_to == []
+    assert CatalogDefaults().parent is None
+
+
+def test_catalog_defaults_are_validated_once() -> None:
+    """It raises an InvalidURIError when the defaults are set."""
+    with pytest.raises(InvalidURIError):
+        CatalogDefaults("not a uri")
+    with pytest.raises(InvalidURIError):
+        CatalogDefaults(conforms_to=["http://example.com/1", "not a uri"])
+
+
 # ---------------------------------------------------------------------- #
 # Utils for displaying debug information
 
@@ -0,0 +1,191 @@
+"""Test cases for the pool module."""
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+import pickle  # noqa: S403
+import threading
+import time
+from typing import Callable, List
+
+import pytest
+
+from oastodcat import LimitExceededError, NotValidOASError
+from oastodcat.pool import _rss, _worker_main, ConversionPool, WorkerLostError
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _raise(message: str) -> None:
+    raise NotValidOASError(message)
+
+
+def _allocate(size: int) -> int:
+    block = bytearray(size)
+    time.sleep(5)
+    return len(block)
+
+
+_KEPT: List[bytes] = []
+
+
+def _keep(size: int) -> int:
+    _KEPT.append(b"x" * size)
+    return size
+
+
+def _pid() -> int:
+    import os
+
+    return os.getpid()
+
+
+def _unpicklable() -> Callable[[], None]:
+    return lambda: None
+
+
+def _exit(code: int) -> None:
+    import os
+
+    os._exit(code)
+
+
+def test_limits() -> None:
+    """It exposes its limits, without starting any worker."""
+    pool = ConversionPool(
+        max_workers=3, timeout=1.5, max_rss=1024, max_tasks_per_worker=10
+    )
+    assert (pool.max_workers, pool.timeout) == (3, 1.5)
+    assert (pool.max_rss, pool.max_tasks_per_worker) == (1024, 10)
+    pool.close()
+
+
+def test_imap_unordered_returns_all_results() -> None:
+    """It yields one outcome per task."""
+    with ConversionPool(max_workers=2) as pool:
+        outcomes = sorted(pool.imap_unordered(_square, [(i,) for i in range(5)]))
+    assert outcomes == [(i, True, i * i) for i in range(5)]
+
+
+def test_errors_are_returned_not_raised() -> None:
+    """It returns the exception raised in the worker."""
+    with ConversionPool(max_workers=1) as pool:
+        [(index, ok, error)] = list(pool.imap_unordered(_raise, [("bad",)]))
+    assert (index, ok) == (0, False)
+    assert isinstance(error, NotValidOASError)
+    assert error.message == "bad"
+
+
+def test_timeout_replaces_worker() -> None:
+    """It reports a LimitExceededError and carries on with a new worker."""
+    with ConversionPool(max_workers=1, timeout=0.5) as pool:
+        outcomes = dict(
+            (index, payload)
+            for index, _, payload in pool.imap_unordered(_sleep, [(30,), (0,)])
+        )
+    assert isinstance(outcomes[0], LimitExceededError)
+    assert outcomes[1] == 0
+
+
+def test_max_rss_replaces_worker() -> None:
+    """It reports a LimitExceededError when a worker grows too large."""
+    with ConversionPool(max_workers=1, max_rss=400 * 1024**2) as pool:
+        outcomes = list(pool.imap_unordered(_allocate, [(500 * 1024**2,)]))
+    assert isinstance(outcomes[0][2], LimitExceededError)
+
+
+def test_max_rss_after_task_replaces_worker() -> None:
+    """It replaces a worker that keeps too much memory after a task."""
+    with ConversionPool(
+        max_workers=1, max_rss=200 * 1024**2, poll_interval=5
+    ) as pool:
+        pid = pool.submit(_pid).result()
+        assert pool.submit(_keep, 300 * 1024**2).result() == 300 * 1024**2
+        assert pool.submit(_pid).result() != pid
+
+
+def test_dead_worker_is_reported() -> None:
+    """It reports a WorkerLostError when a worker dies."""
+    with ConversionPool(max_workers=1) as pool:
+        outcomes = dict(
+            (index, payload)
+            for index, _, payload in pool.imap_unordered(_exit, [(1,), (0,)])
+        )
+    assert isinstance(outcomes[0], WorkerLostError)
+    assert isinstance(outcomes[1], WorkerLostError)
+
+
+def test_worker_main() -> None:
+    """It runs tasks until told to stop, or until the pipe is closed."""
+    for stop in [True, False]:
+        conn, child_conn = multiprocessing.Pipe()
+        thread = threading.Thread(target=_worker_main, args=(child_conn,))
+        thread.start()
+        conn.send((_square, (3,)))
+        assert conn.recv() == (True, 9)
+        conn.send((_raise, ("bad",)))
+        ok, error = conn.recv()
+        assert not ok and isinstance(error, NotValidOASError)
+        conn.send((_unpicklable, ()))
+        ok, error = conn.recv()
+        assert not ok and isinstance(error, WorkerLostError)
+        if stop:
+            conn.send(None)
+        else:
+            conn.close()
+        thread.join()
+
+
+def test_stopped_worker_can_be_stopped_again() -> None:
+    """It stops a worker whose pipe is already closed."""
+    with ConversionPool(max_workers=1) as pool:
+        pool.start()
+        worker = pool._workers[0]  # type: ignore
+        worker.stop()
+        worker.stop()
+        assert not worker.process.is_alive()
+    assert _rss(None) == 0
+
+
+@pytest.mark.parametrize("error", [LimitExceededError("x"), WorkerLostError("x")])
+def test_errors_are_picklable(error: Exception) -> None:
+    """It round trips errors through pickle."""
+    assert str(pickle.loads(pickle.dumps(error))) == "x"  # noqa: S301
+
+
+def test_submit_from_threads() -> None:
+    """It resolves futures submitted from several threads."""
+    with ConversionPool(max_workers=2) as pool:
+        with ThreadPoolExecutor(4) as executor:
+            futures = list(executor.map(lambda i: pool.submit(_square, i), range(8)))
+        assert [future.result() for future in futures] == [i * i for i in range(8)]
+
+
+def test_close_cancels_queued_tasks() -> None:
+    """It cancels tasks that have not started when the pool is closed."""
+    pool = ConversionPool(max_workers=1)
+    running = pool.submit(_sleep, 0.5)
+    queued = [pool.submit(_sleep, 0) for _ in range(3)]
+    time.sleep(0.1)
+    pool.close()
+    assert running.result() == 0.5
+    assert all(future.cancelled() for future in queued)
+
+
+def test_max_tasks_per_worker_replaces_worker() -> None:
+    """It replaces a worker after max_tasks_per_worker tasks."""
+    with ConversionPool(max_workers=1, max_tasks_per_worker=2) as pool:
+        pids = [pid for _, _, pid in pool.imap_unordered(_pid, [()] * 4)]
+    assert len(set(pids)) == 2
+
+
+@pytest.mark.parametrize("start_method", [None, "spawn", "unknown"])
+def test_start_methods(start_method: str) -> None:
+    """It runs tasks with any start method, falling back to the default."""
+    with ConversionPool(max_workers=1, start_method=start_method) as pool:
+        assert pool.submit(_square, 3).result() == 9
@@ -0,0 +1,123 @@
+"""Test cases for the quarantine module."""
+from pathlib import Path
+from typing import List, Tuple
+
+import pytest
+
+from oastodcat.batch import (
+    batch_report,
+    convert_many,
+    retry_quarantined,
+    Specification,
+)
+from oastodcat.pool import ConversionPool
+from oastodcat.quarantine import Quarantine
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+MINIMAL_SPEC = """
+openapi: 3.0.3
+info:
+  title: Swagger Petstore
+  version: 1.0.0
+paths: {}
+"""
+
+
+def _large_spec(paths: int) -> dict:
+    """Helper for creating a specification that is slow to convert."""
+    return {
+        "openapi": "3.0.3",
+        "info": {"title": "Large", "version": "1.0.0"},
+        "paths": {
+            f"/items/{i}": {"get": {"responses": {"200": {"content": {"a/b": {}}}}}}
+            for i in range(paths)
+        },
+    }
+
+
+def test_convert_many_quarantines_failures(tmp_path: Path) -> None:
+    """It writes each failing input and its failure record."""
+    items: List[Tuple[str, Specification]] = [
+        ("http://example.com/specifications/1", MINIMAL_SPEC),
+        ("http://example.com/specifications/2", "{unclosed: ["),
+        ("http://example.com/specifications/3", {"openapi": "2.0", "info": {}}),
+        ("http://example.com/specifications/4", {"openapi": "3.0.3", "paths": {}}),
+    ]
+    quarantine = Quarantine(tmp_path / "quarantine")
+    results = convert_many(items, IDENTIFIER, max_workers=1, quarantine=quarantine)
+    assert [result.phase for result in results] == [None, "load", "convert", "convert"]
+    assert all(result.elapsed is not None for result in results)
+
+    records = quarantine.records()
+    assert [record.url for record in records] == [url for url, _ in items[1:]]
+    assert [(record.phase, record.error) for record in records] == [
+        ("load", "NotValidOASError"),
+        ("convert", "NotSupportedOASError"),
+        ("convert", "KeyError"),
+    ]
+    assert records[2].message == "'info'"
+    assert all(record.attempts == 1 for record in records)
+    assert all(record.elapsed is not None for record in records)
+    assert quarantine.items() == [
+        (items[1][0], b"{unclosed: ["),
+        items[2],
+        items[3],
+    ]
+    assert len(quarantine) == 3
+    assert items[0][0] not in quarantine
+    assert batch_report(results).failed_by_phase == {"load": 1, "convert": 2}
+
+
+def test_retry_quarantined(tmp_path: Path) -> None:
+    """It retries only the quarantined items, and releases those that convert."""
+    items: List[Tuple[str, Specification]] = [
+        ("http://example.com/specifications/1", MINIMAL_SPEC),
+        ("http://example.com/specifications/2", _large_spec(10)),
+        ("http://example.com/specifications/3", "{unclosed: ["),
+    ]
+    quarantine = Quarantine(tmp_path)
+    convert_many(items, IDENTIFIER, max_workers=1, max_nodes=10, quarantine=quarantine)
+    assert [record.url for record in quarantine.records()] == [
+        url for url, _ in items[1:]
+    ]
+
+    results = retry_quarantined(quarantine, IDENTIFIER, max_workers=1)
+    assert [result.url for result in results] == [url for url, _ in items[1:]]
+    assert results[0].error is None and len(results[0].dataservices) == 1
+    assert [record.url for record in quarantine.records()] == [items[2][0]]
+    assert quarantine.records()[0].attempts == 2
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_quarantine_worker_failures(tmp_path: Path) -> None:
+    """It records a timed out item as a failure of its worker."""
+    quarantine = Quarantine(tmp_path)
+    with ConversionPool(max_workers=1, timeout=0.01) as pool:
+        results = convert_many(
+            [("http://example.com/specifications/1", _large_spec(20000))],
+            IDENTIFIER,
+            pool=pool,
+            quarantine=quarantine,
+        )
+    assert results[0].phase == "worker"
+    record = quarantine.records()[0]
+    assert (record.phase, record.error) == ("worker", "LimitExceededError")
+    assert record.elapsed is None
+
+
+def test_quarantine_replaces_input(tmp_path: Path) -> None:
+    """It keeps the last input of a specification, and rejects unknown phases."""
+    quarantine = Quarantine(tmp_path)
+    assert quarantine.directory == tmp_path
+    url = "http://example.com/specifications/1"
+    quarantine.add(url, "text", ValueError("text"), "load")
+    quarantine.add(url, {"openapi": "3.0.3"}, KeyError("info"), "convert", 0.5)
+    assert quarantine.items() == [(url, {"openapi": "3.0.3"})]
+    record = quarantine.record(url)
+    assert record is not None
+    assert (record.attempts, record.elapsed) == (2, 0.5)
+    with pytest.raises(ValueError):
+        quarantine.add(url, "text", ValueError("text"), "unknown")
+    assert quarantine.release(url)
+    assert not quarantine.release(url)
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,131 @@
+"""Test cases for the registry module."""
+from pathlib import Path
+
+import pytest
+
+from oastodcat.batch import batch_report, convert_many
+from oastodcat.quarantine import Quarantine
+from oastodcat.registry import IdentifierCollisionError, IdentifierRegistry
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+@pytest.fixture(scope="session")
+def spec() -> str:
+    """Helper for creating a specification object without servers."""
+    _spec = """
+            openapi: "3.0.3"
+            info:
+              title: Swagger Petstore
+              version: 1.0.0
+            paths: {}
+            """
+    return _spec
+
+
+def test_register_same_source_is_not_a_collision() -> None:
+    """It accepts an identifier registered again for the same source."""
+    with IdentifierRegistry() as registry:
+        assert registry.register("http://a/1", "http://s/1") == "http://a/1"
+        assert registry.register("http://a/1", "http://s/1") == "http://a/1"
+        assert registry.register("http://a/2", "http://s/1", "http://x") == (
+            "http://a/2"
+        )
+        assert len(registry) == 2
+        assert "http://a/1" in registry
+        assert registry.lookup("http://a/2") == ("http://s/1", "http://x")
+        assert registry.lookup("http://a/3") is None
+        assert registry.collisions == []
+
+
+@pytest.mark.parametrize(
+    "on_collision, expected",
+    [
+        ("keep", ["http://a/1", "http://a/1", "http://a/1"]),
+        ("suffix", ["http://a/1", "http://a/1-2", "http://a/1-3"]),
+    ],
+)
+def test_register_collision(on_collision: str, expected: list) -> None:
+    """It reports collisions and renames according to the strategy."""
+    with IdentifierRegistry(on_collision=on_collision) as registry:
+        identifiers = [
+            registry.register("http://a/1", f"http://s/{i}") for i in range(3)
+        ]
+        assert identifiers == expected
+        assert [c.url for c in registry.collisions] == ["http://s/1", "http://s/2"]
+        assert registry.collisions[0].existing_url == "http://s/0"
+        assert registry.collisions[1].renamed_to == expected[2]
+        # Registering again is stable:
+        assert registry.register("http://a/1", "http://s/2") == expected[2]
+
+
+def test_register_collision_hash_does_not_depend_on_order() -> None:
+    """It renames by a hash of the source, whatever the order."""
+    renamed = []
+    for order in [["http://s/0", "http://s/1"], ["http://s/2", "http://s/1"]]:
+        with IdentifierRegistry(on_collision="hash") as registry:
+            renamed.append([registry.register("http://a/1", url) for url in order])
+    assert renamed[0][1] == renamed[1][1]
+    assert renamed[0][1].startswith("http://a/1-")
+
+
+def test_register_collision_raise() -> None:
+    """It raises IdentifierCollisionError with the raise strategy."""
+    with IdentifierRegistry(on_collision="raise") as registry:
+        registry.register("http://a/1", "http://s/0")
+        with pytest.raises(IdentifierCollisionError):
+            registry.register("http://a/1", "http://s/1")
+
+
+def test_unknown_strategy() -> None:
+    """It raises ValueError on an unknown strategy."""
+    with pytest.raises(ValueError):
+        IdentifierRegistry(on_collision="ignore")
+
+
+def test_registry_persists(tmp_path: Path) -> None:
+    """It keeps registrations on disk across openings."""
+    path = tmp_path / "identifiers.sqlite"
+    with IdentifierRegistry(path) as registry:
+        assert (registry.path, registry.on_collision) == (path, "keep")
+        registry.register("http://a/1", "http://s/0")
+    with IdentifierRegistry(path, "suffix") as registry:
+        assert registry.lookup("http://a/1") == ("http://s/0", None)
+        assert registry.register("http://a/1", "http://s/1") == "http://a/1-2"
+
+
+def test_convert_many_renames_colliding_identifiers(spec: str) -> None:
+    """It gives different specs with the same title different identifiers."""
+    other = spec.replace("version: 1.0.0", "version: 2.0.0")
+    items = [("http://s/1", spec), ("http://s/2", other), ("http://s/3", spec)]
+    with IdentifierRegistry(on_collision="suffix") as registry:
+        results = convert_many(items, IDENTIFIER, max_workers=1, registry=registry)
+        identifiers = [str(r.dataservices[0].identifier) for r in results]
+        assert identifiers[1] == identifiers[0] + "-2"
+        # A copy of a spec under another url is another source, too:
+        assert identifiers[2] == identifiers[0] + "-3"
+        assert results[2].duplicate_of == "http://s/1"
+        assert [c.url for c in registry.collisions] == ["http://s/2", "http://s/3"]
+        assert registry.lookup(identifiers[1]) == ("http://s/2", None)
+
+
+def test_convert_many_reports_refused_identifiers(spec: str, tmp_path: Path) -> None:
+    """It fails a spec whose identifier is refused, and goes on with the rest."""
+    other = spec.replace("version: 1.0.0", "version: 2.0.0")
+    items = [
+        ("http://s/1", spec),
+        ("http://s/2", other),
+        ("http://s/3", "{unclosed: ["),
+    ]
+    quarantine = Quarantine(tmp_path)
+    with IdentifierRegistry(on_collision="raise") as registry:
+        results = convert_many(
+            items, IDENTIFIER, max_workers=1, registry=registry, quarantine=quarantine
+        )
+        assert results[0].error is None and len(results[0].dataservices) == 1
+        assert isinstance(results[1].error, IdentifierCollisionError)
+        assert (results[1].phase, results[1].dataservices) == ("register", [])
+        assert results[2].phase == "load"
+        assert len(registry) == 1
+    assert [record.phase for record in quarantine.records()] == ["register", "load"]
+    assert batch_report(results).failed_by_phase == {"register": 1, "load": 1}
@@ -0,0 +1,228 @@
+"""Test cases for the server module."""
+from concurrent.futures import Future
+from http.client import HTTPConnection
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import pytest
+from rdflib import Graph
+
+from oastodcat.pool import ConversionPool, WorkerLostError
+from oastodcat.server import _Handler, ConversionServer, convert_to_rdf, main
+
+MINIMAL_SPEC = b"""
+openapi: 3.0.3
+info:
+  title: Swagger Petstore
+  version: 1.0.0
+servers:
+  - url: http://petstore.swagger.io/v1
+paths: {}
+"""
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def server() -> Iterator[ConversionServer]:
+    """Helper for running a server on a free localhost port."""
+    pool = ConversionPool(max_workers=1, timeout=2)
+    _server = ConversionServer(
+        ("127.0.0.1", 0), max_pending=1, max_body=1024, pool=pool
+    )
+    thread = threading.Thread(target=_server.serve_forever, daemon=True)
+    thread.start()
+    yield _server
+    _server.shutdown()
+    _server.server_close()
+
+
+def _post(
+    server: ConversionServer, body: bytes, **query: str
+) -> Tuple[int, str, Optional[str]]:
+    url = f"http://127.0.0.1:{server.server_port}/convert?{urlencode(query)}"
+    try:
+        with urlopen(url, data=body) as response:  # noqa: S310
+            return (
+                response.status,
+                response.read().decode(),
+                response.headers["Content-Type"],
+            )
+    except HTTPError as e:
+        return e.code, e.read().decode(), None
+
+
+def _get(server: ConversionServer, path: str) -> Tuple[int, str]:
+    try:
+        url = f"http://127.0.0.1:{server.server_port}{path}"
+        with urlopen(url) as response:  # noqa: S310
+            return response.status, response.read().decode()
+    except HTTPError as e:
+        return e.code, e.read().decode()
+
+
+QUERY = {
+    "url": "http://example.com/specifications/1",
+    "identifier": "http://example.com/dataservices/{id}",
+}
+
+
+def test_convert_to_turtle(server: ConversionServer) -> None:
+    """It returns the dataservices as turtle."""
+    status, body, content_type = _post(server, MINIMAL_SPEC, **QUERY)
+    assert status == 200
+    assert content_type == "text/turtle; charset=utf-8"
+    g = Graph().parse(data=body, format="turtle")
+    assert len(g) == 4
+
+
+def test_convert_to_ntriples(server: ConversionServer) -> None:
+    """It returns the dataservices as canonical N-Triples."""
+    status, first, _ = _post(server, MINIMAL_SPEC, format="nt", **QUERY)
+    _, second, _ = _post(server, MINIMAL_SPEC, format="nt", **QUERY)
+    assert status == 200
+    assert first == second
+    assert len(first.splitlines()) == 4
+
+
+@pytest.mark.parametrize(
+    "body, query, expected",
+    [
+        (b"{}", QUERY, 400),
+        (MINIMAL_SPEC, {"url": QUERY["url"]}, 400),
+        (MINIMAL_SPEC, {**QUERY, "format": "xml"}, 400),
+        (b"x" * 2048, QUERY, 413),
+    ],
+)
+def test_bad_requests(
+    server: ConversionServer, body: bytes, query: dict, expected: int
+) -> None:
+    """It rejects bad requests."""
+    status, _, _ = _post(server, body, **query)
+    assert status == expected
+
+
+def test_conversion_error_returns_400(server: ConversionServer) -> None:
+    """It returns 400 for any error raised by the conversion."""
+    spec = MINIMAL_SPEC.replace(b"petstore.swagger.io", b"{region}.api.no")
+    status, body, _ = _post(server, spec, **QUERY)
+    assert status == 400
+    assert body.startswith("InvalidURIError")
+    assert 'endpoint="/convert",status="400"} 1' in _get(server, "/metrics")[1]
+
+
+def test_invalid_content_length_returns_400(server: ConversionServer) -> None:
+    """It returns 400 for a Content-Length that is not a positive number."""
+    for length in ["ten", "-1"]:
+        connection = HTTPConnection("127.0.0.1", server.server_port)
+        connection.putrequest("POST", f"/convert?{urlencode(QUERY)}")
+        connection.putheader("Content-Length", length)
+        connection.endheaders()
+        assert connection.getresponse().status == 400
+        connection.close()
+
+
+def test_unexpected_error_returns_500(
+    server: ConversionServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """It returns 500, and counts the request, when the handler fails."""
+
+    def fail(self: object) -> None:
+        raise RuntimeError("Broken")
+
+    monkeypatch.setattr(_Handler, "_convert", fail)
+    status, body, _ = _post(server, MINIMAL_SPEC, **QUERY)
+    assert (status, body) == (500, "RuntimeError: Broken\n")
+    assert 'endpoint="/convert",status="500"} 1' in _get(server, "/metrics")[1]
+
+
+def test_lost_worker_returns_500(
+    server: ConversionServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """It returns 500 when the worker running the conversion is lost."""
+
+    def submit(self: ConversionPool, *args: object) -> Future:
+        future: Future = Future()
+        future.set_exception(WorkerLostError("Worker exited with code -9"))
+        return future
+
+    monkeypatch.setattr(ConversionPool, "submit", submit)
+    status, body, _ = _post(server, MINIMAL_SPEC, **QUERY)
+    assert (status, body) == (500, "Worker exited with code -9\n")
+
+
+def test_convert_to_rdf() -> None:
+    """It serializes the dataservices as turtle, or canonical N-Triples."""
+    url, identifier = QUERY["url"], QUERY["identifier"]
+    turtle = convert_to_rdf(url, MINIMAL_SPEC, identifier)
+    nt = convert_to_rdf(url, MINIMAL_SPEC, identifier, format="nt")
+    assert len(Graph().parse(data=turtle, format="turtle")) == 4
+    assert len(nt.splitlines()) == 4
+
+
+def test_unknown_paths(server: ConversionServer) -> None:
+    """It returns 404 for unknown paths."""
+    assert _get(server, "/nothing")[0] == 404
+    with pytest.raises(HTTPError) as e:
+        urlopen(f"http://127.0.0.1:{server.server_port}/other", data=b"")  # noqa: S310
+    assert e.value.code == 404
+
+
+def test_full_queue_returns_503(server: ConversionServer) -> None:
+    """It rejects requests when max_pending requests are in flight."""
+    # Keep the only worker busy, so the first request waits in the queue:
+    server.pool.submit(_sleep, 1)
+    waiting = threading.Thread(target=_post, args=(server, MINIMAL_SPEC), kwargs=QUERY)
+    waiting.start()
+    while server._pending._value:  # type: ignore
+        time.sleep(0.01)
+    status, _, _ = _post(server, MINIMAL_SPEC, **QUERY)
+    waiting.join()
+    assert status == 503
+
+
+def test_timeout_returns_422() -> None:
+    """It returns 422 when a conversion exceeds a limit."""
+    pool = ConversionPool(max_workers=1, timeout=0.01, poll_interval=0.005)
+    server = ConversionServer(("127.0.0.1", 0), pool=pool)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        spec = b"openapi: 3.0.3\ninfo: {title: t}\npaths:\n" + b"".join(
+            b"  /p%d: {get: {responses: {'200': {content: {a/b: {}}}}}}\n" % i
+            for i in range(20000)
+        )
+        status, _, _ = _post(server, spec, **QUERY)
+        assert status == 422
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_metrics(server: ConversionServer) -> None:
+    """It returns request counters and latency histograms."""
+    _post(server, MINIMAL_SPEC, **QUERY)
+    _post(server, b"{}", **QUERY)
+    status, metrics = _get(server, "/metrics")
+    assert status == 200
+    assert 'oastodcat_requests_total{endpoint="/convert",status="200"} 1' in metrics
+    assert 'oastodcat_requests_total{endpoint="/convert",status="400"} 1' in metrics
+    assert 'oastodcat_request_seconds_bucket{endpoint="/convert",le="+Inf"} 2' in (
+        metrics
+    )
+    assert 'oastodcat_request_seconds_count{endpoint="/convert"} 2' in metrics
+
+
+def test_main_runs_server(monkeypatch: pytest.MonkeyPatch) -> None:
+    """It builds a server from the command line arguments."""
+    monkeypatch.setattr(
+        ConversionServer, "serve_forever", lambda self: None, raising=True
+    )
+    main(["--port", "0", "--workers", "1"])
@@ -0,0 +1,139 @@
+"""Test cases for the stats module."""
+import pytest
+import yaml
+
+from oastodcat import LimitExceededError, OASDataService
+from oastodcat.stats import OperationStatistics
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+@pytest.fixture(scope="session")
+def spec() -> dict:
+    """Helper for creating a specification object with operations."""
+    _spec = """
+            openapi: 3.0.3
+            info:
+              title: Swagger Petstore
+              version: 1.0.0
+            servers:
+              - url: http://petstore.swagger.io/v1
+              - url: http://petstore.swagger.io/v2
+            paths:
+              /pets:
+                summary: Pets
+                parameters: []
+                get:
+                  operationId: listPets
+                  tags: [pets]
+                  responses:
+                    '200':
+                      description: A paged array of pets
+                      content:
+                        application/json: {}
+                post:
+                  tags: [pets, admin]
+                  requestBody:
+                    content:
+                      application/xml: {}
+                  responses:
+                    '201':
+                      description: Null response
+              /pets/{petId}:
+                get:
+                  operationId: showPetById
+                  responses:
+                    '200':
+                      description: Expected response to a valid request
+            components:
+              schemas:
+                get:
+                  operationId: notAnOperation
+            """
+    return yaml.safe_load(_spec)
+
+
+def test_statistics_are_collected_in_the_media_type_walk(spec: dict) -> None:
+    """It counts path items and operations, and the media types are unchanged."""
+    url = "http://example.com/specifications/1"
+    oas_spec = OASDataService(url, spec, IDENTIFIER, statistics=True)
+    statistics = oas_spec.statistics
+    assert statistics is not None
+    assert (statistics.paths, statistics.operations) == (2, 3)
+    assert statistics.methods == {"get": 2, "post": 1}
+    assert statistics.tags == {"pets": 2, "admin": 1}
+    assert statistics.operation_ids == ["listPets", "showPetById"]
+    assert statistics.missing_operation_ids == 1
+
+    without = OASDataService(url, spec, IDENTIFIER)
+    assert without.statistics is None
+    assert [d.media_types for d in oas_spec.dataservices] == [
+        d.media_types for d in without.dataservices
+    ]
+
+
+def test_statistics_visit_the_same_nodes(spec: dict) -> None:
+    """It counts the same nodes against the budget as without statistics."""
+    url = "http://example.com/specifications/1"
+    for statistics in [False, True]:
+        OASDataService(url, spec, IDENTIFIER, max_nodes=22, statistics=statistics)
+        with pytest.raises(LimitExceededError):
+            OASDataService(url, spec, IDENTIFIER, max_nodes=21, statistics=statistics)
+
+
+def test_statistics_of_malformed_operations() -> None:
+    """It skips tags that are not names, and paths that are not objects."""
+    spec = {
+        "openapi": "3.0.3",
+        "info": {"title": "Malformed", "version": "1.0.0"},
+        "paths": {"/a": None, "/b": {"get": {"tags": [{"name": "x"}]}}},
+    }
+    oas_spec = OASDataService("http://example.com/1", spec, IDENTIFIER, statistics=True)
+    assert oas_spec.statistics is not None
+    assert (oas_spec.statistics.paths, oas_spec.statistics.operations) == (1, 1)
+    assert oas_spec.statistics.tags == {}
+
+
+def test_update() -> None:
+    """It adds the counts of another statistics."""
+    statistics, other = OperationStatistics(), OperationStatistics()
+    statistics.add_operation("get", {"operationId": "a", "tags": ["x"]})
+    other.paths = 1
+    other.add_operation("get", {"tags": ["x", "y"]})
+    statistics.update(other)
+    assert (statistics.paths, statistics.operations) == (1, 2)
+    assert statistics.methods == {"get": 2}
+    assert statistics.tags == {"x": 2, "y": 1}
+    assert statistics.operation_ids == ["a"]
+
+
+def test_statistics_with_content_at_path_level() -> None:
+    """It finds media types in content of paths and path items, as without."""
+    spec = {
+        "openapi": "3.0.3",
+        "info": {"title": "Content", "version": "1.0.0"},
+        "paths": {
+            "content": {"text/csv": {}},
+            "/a": {"content": {"text/plain": {}}, "get": {}},
+        },
+    }
+    url = "http://example.com/specifications/1"
+    oas_spec = OASDataService(url, spec, IDENTIFIER, statistics=True)
+    assert oas_spec.statistics is not None
+    assert oas_spec.statistics.operations == 1
+    without = OASDataService(url, spec, IDENTIFIER)
+    assert len(oas_spec.dataservices[0].media_types) == 2
+    assert oas_spec.dataservices[0].media_types == without.dataservices[0].media_types
+
+
+@pytest.mark.parametrize("limits", [{"max_nodes": 1}, {"max_depth": 0}])
+def test_statistics_limits_on_paths(limits: dict) -> None:
+    """It counts the paths object itself against the limits."""
+    spec = {
+        "paths": {"/a": {"get": {}}},
+        "openapi": "3.0.3",
+        "info": {"title": "Limits", "version": "1.0.0"},
+    }
+    url = "http://example.com/specifications/1"
+    with pytest.raises(LimitExceededError):
+        OASDataService(url, spec, IDENTIFIER, statistics=True, **limits)
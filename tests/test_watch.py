@@ -0,0 +1,188 @@
+"""Test cases for the watch module."""
+import os
+from pathlib import Path
+import threading
+import time
+
+import pytest
+
+from oastodcat.watch import CatalogWatcher, main
+
+IDENTIFIER = "http://example.com/dataservices/{id}"
+
+
+@pytest.fixture(scope="session")
+def spec() -> str:
+    """Helper for creating a specification object."""
+    _spec = """
+            openapi: "3.0.3"
+            info:
+              title: Swagger Petstore
+              version: 1.0.0
+            servers:
+              - url: http://petstore.swagger.io/v1
+            paths: {}
+            """
+    return _spec
+
+
+def _write(path: Path, text: str) -> None:
+    """Writes text and moves the modification time on."""
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_scan_converts_changed_files_only(tmp_path: Path, spec: str) -> None:
+    """It converts every file first, then only files whose content changed."""
+    specs = tmp_path / "specs"
+    specs.mkdir()
+    for i in range(3):
+        _write(specs / f"{i}.yaml", spec.replace("Petstore", f"Petstore {i}"))
+    (specs / "README.md").write_text("not a spec")
+    output = tmp_path / "catalog.nt"
+    watcher = CatalogWatcher(
+        specs, IDENTIFIER, output, debounce=1, base_url="http://example.com/specs"
+    )
+
+    assert len(watcher.scan(now=0)) == 3
+    assert len(watcher.catalog.services) == 3
+    assert output.read_text().count("Petstore ") == 3
+    assert "http://example.com/specs/0.yaml" in output.read_text()
+
+    # Touched without a change, and changed but not yet settled:
+    os.utime(specs / "0.yaml", ns=(0, 0))
+    _write(specs / "1.yaml", spec.replace("Petstore", "Petshop"))
+    assert watcher.scan(now=10) == []
+    assert watcher.scan(now=10.5) == []
+    assert watcher.scan(now=11) == [str(specs / "1.yaml")]
+    assert "Petshop" in output.read_text()
+    assert "Petstore 1" not in output.read_text()
+
+    (specs / "2.yaml").unlink()
+    assert watcher.scan(now=20) == [str(specs / "2.yaml")]
+    assert len(watcher.catalog.services) == 2
+    assert "Petstore 2" not in output.read_text()
+
+
+def test_scan_keeps_last_good_conversion(tmp_path: Path, spec: str) -> None:
+    """It reports a failing file and keeps its last good dataservices."""
+    _write(tmp_path / "spec.yaml", spec)
+    output = tmp_path / "catalog.nt"
+    watcher = CatalogWatcher(tmp_path, IDENTIFIER, output, debounce=0)
+    watcher.scan()
+    before = output.read_text()
+
+    _write(tmp_path / "spec.yaml", "openapi: [")
+    assert watcher.scan() == []
+    assert str(tmp_path / "spec.yaml") in watcher.errors
+    assert output.read_text() == before
+
+    _write(tmp_path / "spec.yaml", spec.replace("Petstore", "Petshop"))
+    assert watcher.scan() == [str(tmp_path / "spec.yaml")]
+    assert watcher.errors == {}
+
+
+def test_output_is_byte_stable(tmp_path: Path, spec: str) -> None:
+    """It writes the same bytes for the same tree."""
+    for i in range(3):
+        _write(tmp_path / f"{i}.json", spec.replace("Petstore", f"Petstore {i}"))
+    outputs = []
+    for name in ["a.nt", "b.nt"]:
+        CatalogWatcher(
+            tmp_path, IDENTIFIER, tmp_path / name, patterns=["*.json"]
+        ).scan()
+        outputs.append((tmp_path / name).read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+def test_scan_walks_subdirectories_and_skips_dotfiles(
+    tmp_path: Path, spec: str
+) -> None:
+    """It converts files in subdirectories, but not hidden ones."""
+    (tmp_path / "sub").mkdir()
+    (tmp_path / ".git").mkdir()
+    _write(tmp_path / "sub" / "spec.yaml", spec)
+    _write(tmp_path / ".git" / "spec.yaml", spec)
+    _write(tmp_path / ".spec.yaml", spec)
+    output = tmp_path / "catalog.nt"
+    watcher = CatalogWatcher(tmp_path, IDENTIFIER, output)
+    assert (watcher.directory, watcher.output) == (tmp_path, output)
+    assert watcher.scan() == [str(tmp_path / "sub" / "spec.yaml")]
+
+
+def test_scan_waits_for_files_written_again(tmp_path: Path, spec: str) -> None:
+    """It waits for a file written again, or removed, since it was scanned."""
+    path = tmp_path / "spec.yaml"
+    _write(path, spec)
+    watcher = CatalogWatcher(tmp_path, IDENTIFIER, tmp_path / "catalog.nt")
+    watcher.scan(now=0)
+
+    _write(path, spec.replace("Petstore", "Petshop"))
+    assert watcher.scan(now=10) == []
+    _write(path, spec.replace("Petstore", "Petsitter"))
+    assert watcher._settle(now=11) == []
+    assert watcher._settle(now=12) == [str(path)]
+    assert "Petsitter" in (tmp_path / "catalog.nt").read_text()
+
+    _write(path, spec)
+    assert watcher.scan(now=20) == []
+    path.unlink()
+    assert watcher._settle(now=21) == []
+    assert watcher.scan(now=30) == [str(path)]
+    assert watcher.catalog.services == []
+
+
+def test_run_until_stopped(tmp_path: Path, spec: str) -> None:
+    """It picks up a new file while running, once it has settled."""
+    output = tmp_path / "catalog.nt"
+    watcher = CatalogWatcher(
+        tmp_path, IDENTIFIER, output, poll_interval=0.2, debounce=0.01
+    )
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    try:
+        # Written after the first scan, so it is converted between scans:
+        while not output.exists():
+            time.sleep(0.01)
+        _write(tmp_path / "spec.yaml", spec)
+        deadline = time.monotonic() + 10
+        while len(watcher.catalog.services) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(watcher.catalog.services) == 1
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_run_scans_again_before_settling(tmp_path: Path, spec: str) -> None:
+    """It scans again, rather than waiting for a file that settles later."""
+    output = tmp_path / "catalog.nt"
+    watcher = CatalogWatcher(
+        tmp_path, IDENTIFIER, output, poll_interval=0.01, debounce=30
+    )
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    try:
+        while not output.exists():
+            time.sleep(0.01)
+        _write(tmp_path / "spec.yaml", spec)
+        time.sleep(0.1)
+        assert watcher.catalog.services == []
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_main_requires_identifier(tmp_path: Path) -> None:
+    """It exits with a usage error without --identifier."""
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), str(tmp_path / "catalog.nt")])
+
+
+def test_main_runs_watcher(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It builds a watcher from the command line arguments."""
+    monkeypatch.setattr(CatalogWatcher, "run", lambda self: None)
+    main([str(tmp_path), str(tmp_path / "catalog.nt"), "--identifier", IDENTIFIER])